@@ -0,0 +1,7 @@
+"""
+TaskFlow benchmarks.
+
+Run from the backend directory:
+
+    uv run python -m bench --help
+"""
@@ -0,0 +1,58 @@
+"""
+Command line entry point: ``uv run python -m bench [options]``.
+
+Examples:
+    uv run python -m bench
+    uv run python -m bench --tasks 100000 --requests 20000 --concurrency 64
+    uv run python -m bench --backends sqlite --mix filter=80,update=20
+    uv run python -m bench --backends sqlite-baseline,sqlite
+    uv run python -m bench --url http://localhost:8000 --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from .load import DEFAULT_MIX, parse_mix, run_benchmark
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="TaskFlow API load benchmark")
+    parser.add_argument("--backends", default="memory,sqlite",
+                        help="comma-separated storage backends to run in-process (memory, sqlite, sqlite-baseline, sqlite-cached)")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--tasks", type=int, default=10_000, help="tasks seeded before measuring")
+    parser.add_argument("--requests", type=int, default=5_000, help="requests measured per backend")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight at once")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="operation weights, e.g. create=10,list=25,filter=30,get=15,update=15,delete=5")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same workload)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    report = asyncio.run(run_benchmark(
+        backends=[b.strip() for b in args.backends.split(",") if b.strip()],
+        tasks=args.tasks,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mix=mix,
+        seed=args.seed,
+        url=args.url,
+    ))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Load benchmark: throughput and latency of the TaskFlow API.
+
+Seeds N tasks, then drives a weighted mix of create / list / filter / get /
+update / delete requests at a given concurrency and reports requests/sec and
+p50/p95/p99 latencies per operation as JSON.
+
+By default the app runs in-process (httpx ASGI transport, no network) once
+per storage backend: the in-memory store and SQLite (async engines on a
+temporary file, with the production profile of database.py). The
+``sqlite-baseline`` backend is the same file with a plain engine (default
+pragmas, no reader/writer split), to measure what the profile brings;
+``sqlite-cached`` puts the read cache (CachedTaskRepository) in front of it.
+With ``url`` it targets an already running server instead.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+OPERATIONS = ("create", "list", "filter", "get", "update", "delete")
+
+DEFAULT_MIX = {"create": 10, "list": 25, "filter": 30, "get": 15, "update": 15, "delete": 5}
+
+STATUSES = ("todo", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high")
+
+BACKENDS = ("memory", "sqlite", "sqlite-baseline", "sqlite-cached")
+
+# Seeded tasks are spread over this many assignees
+ASSIGNEES = 50
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse ``create=10,list=30,...`` into operation weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Latency statistics in milliseconds."""
+    values = sorted(d * 1000 for d in durations)
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 0.50), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "p99": round(percentile(values, 0.99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def random_task(rng: random.Random, index: int) -> dict:
+    return {
+        "title": f"Benchmark task {index}",
+        "description": "Generated by the load benchmark",
+        "status": rng.choice(STATUSES),
+        "priority": rng.choice(PRIORITIES),
+        "assignee": f"user{rng.randrange(ASSIGNEES)}@example.com",
+    }
+
+
+class Workload:
+    """Shared state of one benchmark run: live task IDs and measurements."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, int], seed: int):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.task_ids: List[int] = []
+        self.durations: Dict[str, List[float]] = {name: [] for name in self.names}
+        self.errors: Dict[str, int] = {name: 0 for name in self.names}
+
+    async def seed(self, count: int) -> None:
+        """Create ``count`` tasks through the batch endpoint."""
+        for start in range(0, count, 1000):
+            batch = [random_task(self.rng, i) for i in range(start, min(count, start + 1000))]
+            response = await self.client.post("/tasks/batch", json=batch)
+            response.raise_for_status()
+            self.task_ids.extend(r["id"] for r in response.json()["results"] if r["status"] == 201)
+
+    def pick_id(self) -> int:
+        return self.rng.choice(self.task_ids) if self.task_ids else 1
+
+    async def request(self, name: str) -> None:
+        rng = self.rng
+        started = time.perf_counter()
+        if name == "create":
+            response = await self.client.post("/tasks", json=random_task(rng, len(self.task_ids)))
+            if response.status_code == 201:
+                self.task_ids.append(response.json()["id"])
+        elif name == "list":
+            response = await self.client.get("/tasks/page", params={"limit": 50})
+        elif name == "filter":
+            response = await self.client.get("/tasks", params={
+                "status": rng.choice(STATUSES),
+                "assignee": f"user{rng.randrange(ASSIGNEES)}@example.com",
+            })
+        elif name == "get":
+            response = await self.client.get(f"/tasks/{self.pick_id()}")
+        elif name == "update":
+            response = await self.client.put(f"/tasks/{self.pick_id()}", json={"status": rng.choice(STATUSES)})
+        else:
+            task_id = self.pick_id()
+            if task_id in self.task_ids:
+                self.task_ids.remove(task_id)
+            response = await self.client.delete(f"/tasks/{task_id}")
+        self.durations[name].append(time.perf_counter() - started)
+        # 404s can happen when a concurrent worker deleted the task first
+        if response.status_code >= 400 and response.status_code != 404:
+            self.errors[name] += 1
+
+    async def run(self, total: int, concurrency: int) -> float:
+        """Send ``total`` requests from ``concurrency`` workers; return wall time."""
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await self.request(self.rng.choices(self.names, self.weights)[0])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, wall_time: float) -> dict:
+        all_durations = [d for values in self.durations.values() for d in values]
+        return {
+            "requests": len(all_durations),
+            "duration_s": round(wall_time, 3),
+            "requests_per_s": round(len(all_durations) / wall_time, 1) if wall_time else 0.0,
+            "errors": sum(self.errors.values()),
+            "latency_ms": {
+                "all": summarize(all_durations),
+                **{name: summarize(values) for name, values in self.durations.items()},
+            },
+        }
+
+
+async def run_against(client: httpx.AsyncClient, tasks: int, requests: int,
+                      concurrency: int, mix: Dict[str, int], seed: int) -> dict:
+    workload = Workload(client, mix, seed)
+    await workload.seed(tasks)
+    return workload.report(await workload.run(requests, concurrency))
+
+
+async def run_in_process(backend: str, tasks: int, requests: int,
+                         concurrency: int, mix: Dict[str, int], seed: int) -> dict:
+    """Benchmark the app in-process with the given storage backend."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.app import create_app
+    from src.database import make_engines
+    from src.repository import AsyncSQLTaskRepository, CachedTaskRepository, InMemoryTaskRepository
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        if backend == "memory":
+            repo = InMemoryTaskRepository()
+        elif backend in ("sqlite", "sqlite-cached"):
+            writer, reader = make_engines(url, asynchronous=True)
+            repo = AsyncSQLTaskRepository(
+                async_sessionmaker(writer, expire_on_commit=False),
+                read_session_factory=async_sessionmaker(reader, expire_on_commit=False),
+            )
+            if backend == "sqlite-cached":
+                repo = CachedTaskRepository(repo, maxsize=tasks)
+        elif backend == "sqlite-baseline":
+            engine = create_async_engine(url)
+            repo = AsyncSQLTaskRepository(async_sessionmaker(engine, expire_on_commit=False))
+        else:
+            raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+
+        # An application of its own: the one of src.app is left untouched
+        app = create_app(repo)
+        try:
+            await repo.initialize()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await run_against(client, tasks, requests, concurrency, mix, seed)
+        finally:
+            await repo.close()
+
+
+async def run_benchmark(backends: List[str], tasks: int = 10_000, requests: int = 5_000,
+                        concurrency: int = 32, mix: Optional[Dict[str, int]] = None,
+                        seed: int = 42, url: Optional[str] = None) -> dict:
+    """Run the load benchmark and return the JSON-serializable report."""
+    mix = mix or DEFAULT_MIX
+    # Per-request INFO logs would dominate the measurements
+    for name in ("taskflow", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    results = {}
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            results[url] = await run_against(client, tasks, requests, concurrency, mix, seed)
+    else:
+        for backend in backends:
+            results[backend] = await run_in_process(backend, tasks, requests, concurrency, mix, seed)
+
+    return {
+        "benchmark": "load",
+        "config": {
+            "tasks": tasks,
+            "requests": requests,
+            "concurrency": concurrency,
+            "mix": mix,
+            "seed": seed,
+        },
+        "results": results,
+    }
@@ -0,0 +1,78 @@
+"""
+Memory benchmark: bytes held per task by the in-memory store.
+
+Fills a ``TaskStore`` with N realistic tasks, once with pydantic ``Task``
+objects and once with compact records, and reports the memory allocated per
+task (tracemalloc: the tasks themselves plus the indexes and sort keys).
+
+    uv run python -m bench.memory --tasks 200000
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+from src.schemas import Task, TaskPriority, TaskStatus
+from src.store import TaskStore
+
+ASSIGNEES = 200
+
+
+def make_task(rng: random.Random, task_id: int, now: datetime) -> Task:
+    created_at = now + timedelta(microseconds=rng.randrange(10**12))
+    return Task(
+        id=task_id,
+        title=f"Task {task_id}: prepare the weekly report",
+        description="Collect the numbers and share them with the team" if rng.random() < 0.5 else None,
+        status=rng.choice(list(TaskStatus)),
+        priority=rng.choice(list(TaskPriority)),
+        # Built per task, as when it comes from a JSON body
+        assignee="".join(["user", str(rng.randrange(ASSIGNEES)), "@example.com"]) if rng.random() < 0.8 else None,
+        due_date=created_at + timedelta(days=7) if rng.random() < 0.3 else None,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def measure(tasks: int, compact: bool, seed: int) -> float:
+    """Bytes allocated per task once ``tasks`` tasks are stored."""
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+    gc.collect()
+    tracemalloc.start()
+    store = TaskStore(compact=compact)
+    for task_id in range(1, tasks + 1):
+        store.add(make_task(rng, task_id, now))
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return allocated / tasks
+
+
+def run_memory_benchmark(tasks: int = 100_000, seed: int = 42) -> dict:
+    pydantic = measure(tasks, compact=False, seed=seed)
+    compact = measure(tasks, compact=True, seed=seed)
+    return {
+        "benchmark": "memory",
+        "config": {"tasks": tasks, "seed": seed, "python": sys.version.split()[0]},
+        "bytes_per_task": {"pydantic": round(pydantic), "compact": round(compact)},
+        "reduction": round(1 - compact / pydantic, 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.memory", description="TaskFlow store memory benchmark")
+    parser.add_argument("--tasks", type=int, default=100_000, help="tasks stored")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args(argv)
+    print(json.dumps(run_memory_benchmark(args.tasks, args.seed), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Cold start benchmark: time from a fresh interpreter to the first response.
+
+Each run starts a new Python process (nothing cached in ``sys.modules``)
+that imports ``src.app``, runs its startup (lifespan) and serves a first
+GET /tasks in-process. Reported per backend, median of the runs:
+
+- ``import_ms``: ``import src.app``
+- ``startup_ms``: storage initialization (tables and migrations with SQL)
+- ``first_request_ms``: the first GET /tasks (connections are opened here)
+- ``total_ms``: the three above - what a user waits for after a scale to zero
+- ``process_ms``: the whole child process, interpreter start included
+
+``--budget-ms`` makes the command fail when a backend's ``total_ms`` exceeds
+it, to catch cold start regressions in CI.
+
+    uv run python -m bench.startup --runs 5 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+BACKENDS = ("memory", "sqlite")
+
+# Import + startup + first request allowed per backend by default (ms)
+DEFAULT_BUDGET_MS = 1500
+
+# Modules that only the SQL backends need; reported when loaded by the import
+DATABASE_MODULES = ("sqlalchemy", "aiosqlite", "asyncpg", "psycopg2")
+
+# Runs in the child process; prints its measures as JSON
+CHILD = """
+import json, sys, time
+
+started = time.perf_counter()
+import src.app as app_module
+imported = time.perf_counter()
+loaded = [name for name in {modules!r} if name in sys.modules]
+
+import asyncio
+import httpx
+
+async def serve_first_request():
+    app = app_module.app
+    before_startup = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/tasks")
+        served = time.perf_counter()
+    response.raise_for_status()
+    return ready - before_startup, served - ready
+
+startup, first_request = asyncio.run(serve_first_request())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": startup * 1000,
+    "first_request_ms": first_request * 1000,
+    "loaded_at_import": loaded,
+}}))
+"""
+
+
+def measure_once(backend: str) -> dict:
+    """Measures of one cold start of ``backend`` in a new interpreter."""
+    env = {key: value for key, value in os.environ.items()
+           if key not in ("DATABASE_URL", "TASKFLOW_DATA_DIR", "TASKFLOW_READ_CACHE_SIZE")}
+    with tempfile.TemporaryDirectory() as directory:
+        if backend == "sqlite":
+            env["DATABASE_URL"] = f"sqlite:///{Path(directory) / 'taskflow.db'}"
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD.format(modules=DATABASE_MODULES)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        process_ms = (time.perf_counter() - started) * 1000
+    measures = json.loads(result.stdout.strip().splitlines()[-1])
+    measures["total_ms"] = measures["import_ms"] + measures["startup_ms"] + measures["first_request_ms"]
+    measures["process_ms"] = process_ms
+    return measures
+
+
+def run_startup_benchmark(backends: List[str], runs: int = 5, budget_ms: Optional[float] = None) -> dict:
+    results: Dict[str, dict] = {}
+    for backend in backends:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+        samples = [measure_once(backend) for _ in range(runs)]
+        result = {
+            key: round(statistics.median(sample[key] for sample in samples), 1)
+            for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms", "process_ms")
+        }
+        result["loaded_at_import"] = samples[-1]["loaded_at_import"]
+        if budget_ms is not None:
+            result["within_budget"] = result["total_ms"] <= budget_ms
+        results[backend] = result
+    return {
+        "benchmark": "startup",
+        "config": {"runs": runs, "budget_ms": budget_ms, "python": sys.version.split()[0]},
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description="TaskFlow cold start benchmark")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends (memory, sqlite)")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per backend (the median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail when import + startup + first request takes longer (0: no check)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_startup_benchmark(
+            [b.strip() for b in args.backends.split(",") if b.strip()],
+            runs=args.runs,
+            budget_ms=args.budget_ms or None,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(json.dumps(report, indent=2))
+    return 0 if all(r.get("within_budget", True) for r in report["results"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
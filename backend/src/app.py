@@ -4,18 +4,43 @@ TaskFlow Backend - FastAPI Task Management Service
 A RESTful API for task management with TDD approach.
 
 ATELIER 1 & 2: Uses in-memory storage for simplicity
-ATELIER 3: Will introduce PostgreSQL database (see migration guide)
+ATELIER 3: Uses PostgreSQL/SQLite when DATABASE_URL is set (see repository.py)
+
+``create_app()`` builds an application around the endpoints of ``router``,
+with its own ``AppState`` (repository, caches, change feed, metrics);
+``app`` is the instance served by ``uvicorn src.app:app``. Importing this
+module stays cheap: the SQL backend, its driver and its engines are only
+loaded when DATABASE_URL is set, and connect on the first query.
 """
 
-from typing import List, Optional, Dict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from enum import Enum
-from fastapi import FastAPI, HTTPException
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Body, Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 import logging
 import os
 
+from .conditional import cache_headers, etag_matches, not_modified, store_etag, task_etag
+from .events import ChangeFeed, parse_last_event_id
+from .export import MEDIA_TYPES, ExportFormat, encode_export
+from .importer import import_tasks
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, RequestMetrics, render
+from .pagination import (
+    InvalidCursor, TaskOrder, decode_cursor, decode_search_cursor, encode_search_cursor, split_page,
+)
+from .query import DateRange, TaskSort
+from .repository import TaskRepository, create_repository
+from .schemas import (
+    BatchItemResult, BatchResponse, ImportReport, Task, TaskBatchUpdate, TaskCreate,
+    TaskChanges, TaskPage, TaskPriority, TaskStats, TaskStatus, TaskUpdate, validation_errors,
+)
+from .search import tokenize
+from .serialization import RawJSONResponse, TaskJSONCache, changes_body, page_body
+from .singleflight import DEFAULT_MAX_BYTES, SingleFlight
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,125 +50,171 @@ logger = logging.getLogger("taskflow")
 
 
 # =============================================================================
-# ENUMS & MODELS
+# STORAGE
 # =============================================================================
 
-class TaskStatus(str, Enum):
-    """Task status enum - simpler than SQLAlchemy version."""
-    TODO = "todo"
-    IN_PROGRESS = "in_progress"
-    DONE = "done"
-
-
-class TaskPriority(str, Enum):
-    """Task priority enum - simpler than SQLAlchemy version."""
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
+class AppState:
+    """
+    What one application owns: its repository - in-memory store (Atelier
+    1 & 2) or PostgreSQL/SQLite (Atelier 3) depending on DATABASE_URL, see
+    repository.py - the caches in front of it, its change feed and its
+    metrics. Built by create_app(); endpoints get it with ``Depends(app_state)``.
+    """
 
+    def __init__(self, repo: TaskRepository):
+        self.repo = repo
+        # JSON bytes of recently served tasks, reused by the read endpoints
+        self.json_cache = TaskJSONCache(maxsize=int(os.getenv("TASK_JSON_CACHE_SIZE", "10000")))
+        # Request latency histograms, served by GET /metrics
+        self.metrics = RequestMetrics()
+        # Identical concurrent GET /tasks requests, computed once per store version
+        self.list_flights = SingleFlight(
+            max_bytes=int(os.getenv("TASKFLOW_LIST_CACHE_BYTES", str(DEFAULT_MAX_BYTES))))
+        # Task changes of every worker, streamed by GET /tasks/events
+        self.change_feed = ChangeFeed(
+            self.load_changes, repo.version,
+            maxlen=int(os.getenv("TASKFLOW_EVENT_BUFFER", "1000")),
+            poll=float(os.getenv("TASKFLOW_EVENT_POLL", "1")),
+        )
+
+    async def load_changes(self, since: int) -> Tuple[int, bool, bytes]:
+        """Delta of the store after version ``since``, as GET /tasks/changes sends it."""
+        changes = await self.repo.changes(since)
+        body = changes_body(changes.version, changes.reset, self.json_cache.dumps_list(changes.changed),
+                            changes.deleted)
+        return changes.version, changes.reset, body
+
+    def tasks_saved(self, tasks: List[Task]) -> None:
+        """Refresh the cached JSON of created/updated tasks and wake the change feed."""
+        for task in tasks:
+            self.json_cache.invalidate(task.id)
+        self.change_feed.notify()
+
+    def task_deleted(self, task_id: int) -> None:
+        self.json_cache.invalidate(task_id)
+        self.change_feed.notify()
+
+    async def clear(self) -> None:
+        """Clear all tasks - useful for testing."""
+        await self.repo.clear()
+        self.json_cache.clear()
+        self.list_flights.clear()
+        self.change_feed.notify()
+
+
+def app_state(request: Request) -> AppState:
+    """Dependency: the state of the application serving the request."""
+    return request.app.state.taskflow
 
-class TaskCreate(BaseModel):
-    """Model for creating a new task."""
-    title: str = Field(..., min_length=1, max_length=200, description="Task title")
-    description: Optional[str] = Field(None, max_length=1000, description="Task description")
-    status: TaskStatus = Field(default=TaskStatus.TODO, description="Task status")
-    priority: TaskPriority = Field(default=TaskPriority.MEDIUM, description="Task priority")
-    assignee: Optional[str] = Field(None, max_length=100, description="Assigned user")
-    due_date: Optional[datetime] = Field(None, description="Due date")
 
+# =============================================================================
+# VALIDATION HELPERS
+# =============================================================================
 
-class TaskUpdate(BaseModel):
-    """Model for updating a task - all fields optional for partial updates."""
-    title: Optional[str] = Field(None, min_length=1, max_length=200)
-    description: Optional[str] = Field(None, max_length=1000)
-    status: Optional[TaskStatus] = None
-    priority: Optional[TaskPriority] = None
-    assignee: Optional[str] = Field(None, max_length=100)
-    due_date: Optional[datetime] = None
+# Largest number of items accepted by the /tasks/batch endpoints
+MAX_BATCH_SIZE = 1000
 
 
-class Task(TaskCreate):
-    """Model for a task with ID and timestamps."""
-    id: int  # Integer ID instead of UUID string - simpler!
-    created_at: datetime
-    updated_at: datetime
+def title_error(title: Optional[str]) -> Optional[str]:
+    """Return an error message if the title is blank."""
+    if not title or not title.strip():
+        return "Title cannot be empty"
+    return None
 
 
-# =============================================================================
-# IN-MEMORY STORAGE (for Atelier 1 & 2)
-# =============================================================================
-
-# Simple dictionary to store tasks
-# In Atelier 3, this will be replaced with PostgreSQL database
-tasks_db: Dict[int, Task] = {}
-next_id = 1
+def update_error(update_data: Dict[str, Any]) -> Optional[str]:
+    """Return an error message if a partial update is not acceptable."""
+    if "title" in update_data:
+        error = title_error(update_data["title"])
+        if error:
+            return error
+    # status and priority are required on a task - they can change, not vanish
+    for field in ("status", "priority"):
+        if field in update_data and update_data[field] is None:
+            return f"{field.capitalize()} cannot be null"
+    return None
 
 
-def get_next_id() -> int:
-    """Get next available task ID."""
-    global next_id
-    current_id = next_id
-    next_id += 1
-    return current_id
+def check_batch_size(items: List[Any]) -> None:
+    """Reject empty and oversized batches as a whole."""
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch cannot be empty")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large ({len(items)} items, max {MAX_BATCH_SIZE})",
+        )
 
 
-def clear_tasks():
-    """Clear all tasks - useful for testing."""
-    global tasks_db, next_id
-    tasks_db = {}
-    next_id = 1
+def batch_response(results: List[BatchItemResult]) -> BatchResponse:
+    succeeded = sum(1 for r in results if r.status < 400)
+    return BatchResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
 
 
 # =============================================================================
 # FASTAPI APP
 # =============================================================================
 
-app = FastAPI(
-    title="TaskFlow API",
-    description="Simple task management API for learning unit testing and CI/CD",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
+# Endpoints of the API, mounted by create_app()
+router = APIRouter()
 
-# =============================================================================
-# CORS CONFIGURATION (ATELIER 3 - Production)
-# =============================================================================
 
-# Get CORS origins from environment variable
-# Default: localhost for development
-cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
-cors_origins = [origin.strip() for origin in cors_origins_str.split(",")]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,  # Allowed origins (frontend URLs)
-    allow_credentials=True,
-    allow_methods=["*"],  # Allow all HTTP methods (GET, POST, PUT, DELETE, etc.)
-    allow_headers=["*"],  # Allow all headers
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the storage backend (creates tables when using a database), then release it."""
+    state: AppState = app.state.taskflow
+    logger.info("🚀 TaskFlow backend starting up...")
+    await state.repo.initialize()
+    yield
+    logger.info("🛑 TaskFlow backend shutting down...")
+    await state.repo.close()
 
-logger.info(f"🌐 CORS enabled for origins: {cors_origins}")
 
+def create_app(repo: Optional[TaskRepository] = None) -> FastAPI:
+    """
+    Build a TaskFlow application: middleware, endpoints, storage lifecycle
+    and its own state - ``repo``, or the repository selected by
+    configuration (see create_repository).
+    """
+    state = AppState(repo if repo is not None else create_repository())
+    app = FastAPI(
+        title="TaskFlow API",
+        description="Simple task management API for learning unit testing and CI/CD",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
+    app.state.taskflow = state
+
+    # CORS (Atelier 3 - production): origins from the environment,
+    # localhost by default for development
+    cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
+    cors_origins = [origin.strip() for origin in cors_origins_str.split(",")]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,  # Allowed origins (frontend URLs)
+        allow_credentials=True,
+        allow_methods=["*"],  # Allow all HTTP methods (GET, POST, PUT, DELETE, etc.)
+        allow_headers=["*"],  # Allow all headers
+        expose_headers=["ETag"],  # Let the frontend read validators for conditional GETs
+    )
 
-@app.on_event("startup")
-def startup():
-    """Simple startup - just log a message."""
-    logger.info("🚀 TaskFlow backend starting up...")
-    logger.info("Using in-memory storage (no database)")
+    logger.info(f"🌐 CORS enabled for origins: {cors_origins}")
 
+    # Time every request (added last so it is the outermost middleware)
+    app.add_middleware(MetricsMiddleware, metrics=state.metrics)
 
-@app.on_event("shutdown")
-def shutdown():
-    """Simple shutdown - just log a message."""
-    logger.info("🛑 TaskFlow backend shutting down...")
+    app.include_router(router)
+    return app
 
 
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
 
-@app.get("/")
+@router.get("/")
 async def root():
     """API root endpoint."""
     return {
@@ -153,20 +224,58 @@ async def root():
     }
 
 
-@app.get("/health")
-async def health_check():
+@router.get("/health")
+async def health_check(state: AppState = Depends(app_state)):
     """Simple health check endpoint."""
     return {
         "status": "healthy",
-        "tasks_count": len(tasks_db)
+        "tasks_count": await state.repo.count()
     }
 
 
-@app.get("/tasks", response_model=List[Task])
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(state: AppState = Depends(app_state)):
+    """Prometheus metrics: request latencies, store size, index and cache counters."""
+    lookups = state.repo.index_lookups()
+    cache = state.repo.cache_lookups()
+    gauges = [
+        ("taskflow_tasks", "gauge", "Number of stored tasks.",
+         [({}, await state.repo.count())]),
+        ("taskflow_store_index_lookups_total", "counter",
+         "In-memory index lookups per filter field (miss = no task has the value).",
+         [({"field": field, "result": result}, count)
+          for field, (hits, misses) in lookups.items()
+          for result, count in (("hit", hits), ("miss", misses))]),
+        ("taskflow_read_cache_requests_total", "counter",
+         "Read cache lookups in front of the database, per kind (task, query).",
+         [({"kind": kind, "result": result}, count)
+          for kind, (hits, misses, _) in cache.items()
+          for result, count in (("hit", hits), ("miss", misses))]),
+        ("taskflow_read_cache_entries", "gauge", "Entries held in the read cache, per kind.",
+         [({"kind": kind}, entries) for kind, (_, _, entries) in cache.items()]),
+        ("taskflow_list_requests_total", "counter",
+         "GET /tasks bodies computed, or shared with an identical request at the same store version.",
+         [({"result": "computed"}, state.list_flights.executed), ({"result": "shared"}, state.list_flights.shared)]),
+        ("taskflow_json_cache_requests_total", "counter", "Task JSON cache lookups.",
+         [({"result": "hit"}, state.json_cache.hits), ({"result": "miss"}, state.json_cache.misses)]),
+        ("taskflow_json_cache_entries", "gauge", "Tasks held in the JSON cache.",
+         [({}, len(state.json_cache))]),
+    ]
+    return PlainTextResponse(render(state.metrics, gauges), media_type=METRICS_CONTENT_TYPE)
+
+
+@router.get("/tasks", response_model=List[Task])
 async def get_tasks(
+    request: Request,
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
-    assignee: Optional[str] = None
+    assignee: Optional[str] = None,
+    sort: TaskSort = TaskSort.ID,
+    due_after: Optional[datetime] = Query(None, description="Due on or after this date"),
+    due_before: Optional[datetime] = Query(None, description="Due strictly before this date"),
+    created_since: Optional[datetime] = Query(None, description="Created on or after this date"),
+    created_before: Optional[datetime] = Query(None, description="Created strictly before this date"),
+    state: AppState = Depends(app_state),
 ) -> List[Task]:
     """
     Get all tasks with optional filtering.
@@ -175,99 +284,379 @@ async def get_tasks(
     - status: Filter by task status (todo, in_progress, done)
     - priority: Filter by priority (low, medium, high)
     - assignee: Filter by assignee email
+    - sort: id, created_at or due_date, "-" prefix for descending
+      (tasks without due date come last)
+    - due_after / due_before, created_since / created_before: date ranges
+      (lower bound included, upper bound excluded), e.g. overdue tasks:
+      ?due_before=<now>&status=todo&sort=due_date
+
+    Supports If-None-Match: answers 304 while the store has not changed.
+    """
+    # Read the version before the tasks: a write in between can only make
+    # the body newer than its ETag (one extra refetch), never staler
+    version = await state.repo.version()
+    etag = store_etag(version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    query = dict(
+        sort=sort,
+        due=DateRange.of(due_after, due_before),
+        created=DateRange.of(created_since, created_before),
+        status=status or None,
+        priority=priority or None,
+        assignee=assignee or None,
+    )
+
+    async def list_body() -> bytes:
+        # Tasks are already valid Task models: send their cached JSON as is
+        return state.json_cache.dumps_list(await state.repo.filter(**query))
+
+    # Identical requests at this version share one scan and one body
+    body = await state.list_flights.do(version, tuple(query.values()), list_body)
+    return RawJSONResponse(body, headers=cache_headers(etag))
+
+
+@router.get("/tasks/page", response_model=TaskPage)
+async def get_tasks_page(
+    request: Request,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    assignee: Optional[str] = None,
+    order_by: TaskOrder = TaskOrder.ID,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    state: AppState = Depends(app_state),
+) -> TaskPage:
+    """
+    Get one page of tasks (keyset pagination).
+
+    Query parameters:
+    - status, priority, assignee: same filters as GET /tasks
+    - order_by: id (default) or created_at
+    - limit: page size (1-500, default 50)
+    - cursor: next_cursor returned by the previous page
+    """
+    try:
+        after = decode_cursor(cursor, order_by) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    etag = store_etag(await state.repo.version())
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    # Fetch one extra task to know whether there is a next page
+    tasks = await state.repo.page(
+        order_by, after, limit + 1,
+        status=status or None,
+        priority=priority or None,
+        assignee=assignee or None,
+    )
+    items, next_cursor = split_page(tasks, limit, order_by)
+    body = page_body(state.json_cache.dumps_list(items), next_cursor)
+    return RawJSONResponse(body, headers=cache_headers(etag))
+
+
+@router.get("/tasks/stats", response_model=TaskStats)
+async def get_task_stats(state: AppState = Depends(app_state)) -> TaskStats:
+    """
+    Task counts per status, priority and assignee, plus overdue tasks
+    (not done, due date past) - without downloading every task.
+    """
+    return await state.repo.stats(datetime.utcnow())
+
+
+@router.get("/tasks/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: int = Query(..., ge=0, description="Store version of the client's copy (0 = none)"),
+    state: AppState = Depends(app_state),
+) -> TaskChanges:
+    """
+    Delta sync: the tasks created or updated since version ``since`` and
+    the IDs deleted since then. Pass the returned ``version`` as ``since``
+    next time. When ``reset`` is true the deletions are no longer known:
+    replace the local copy with ``changed``, which then holds every task.
+    """
+    _, _, body = await state.load_changes(since)
+    return RawJSONResponse(body)
+
+
+@router.get("/tasks/events")
+async def task_events(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Store version to start from (e.g. of GET /tasks/changes)"),
+    state: AppState = Depends(app_state),
+) -> StreamingResponse:
     """
-    tasks = list(tasks_db.values())
+    Server-Sent Events stream of task changes: each ``data:`` is a
+    TaskChanges delta (as GET /tasks/changes returns it), its ``id:`` the
+    store version it leads to - the same on every worker.
 
-    # Apply filters
-    if status:
-        tasks = [t for t in tasks if t.status == status]
-    if priority:
-        tasks = [t for t in tasks if t.priority == priority]
-    if assignee:
-        tasks = [t for t in tasks if t.assignee == assignee]
+    Start from the version of the snapshot the client loaded (``?since=``)
+    so no change in between is missed. A reconnecting EventSource sends
+    Last-Event-ID, which takes precedence over ``since``.
+    """
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    if last_event_id is not None:
+        since = last_event_id
+    return StreamingResponse(
+        state.change_feed.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    return tasks
 
+@router.get("/tasks/search", response_model=TaskPage)
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in title or description"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    state: AppState = Depends(app_state),
+) -> TaskPage:
+    """
+    Full-text search over task titles and descriptions.
 
-@app.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: int) -> Task:
-    """Get a single task by ID."""
-    if task_id not in tasks_db:
+    Returns the tasks containing every word of ``q`` (case and accents
+    ignored), most relevant first, one page at a time: pass next_cursor as
+    ``cursor`` to get the next page. Title matches rank above description
+    matches.
+    """
+    if not tokenize(q):
+        raise HTTPException(status_code=422, detail="Search query must contain at least one word")
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    etag = store_etag(await state.repo.version())
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    hits = await state.repo.search(q, after, limit + 1)
+    items = hits[:limit]
+    next_cursor = encode_search_cursor(items[-1][0], items[-1][1].id) if len(hits) > limit else None
+    body = page_body(state.json_cache.dumps_list(task for _, task in items), next_cursor)
+    return RawJSONResponse(body, headers=cache_headers(etag))
+
+
+@router.get("/tasks/export")
+async def export_tasks(
+    format: ExportFormat = ExportFormat.NDJSON,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    assignee: Optional[str] = None,
+    state: AppState = Depends(app_state),
+) -> StreamingResponse:
+    """
+    Stream every task as NDJSON (one JSON object per line) or CSV.
+
+    Tasks are fetched and sent in chunks, so memory use stays flat no matter
+    how many tasks are exported. Accepts the same filters as GET /tasks.
+    """
+    chunks = state.repo.iterate(
+        status=status or None,
+        priority=priority or None,
+        assignee=assignee or None,
+    )
+    return StreamingResponse(
+        encode_export(format, chunks),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'},
+    )
+
+
+@router.post("/tasks/import", response_model=ImportReport)
+async def import_tasks_ndjson(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=MAX_BATCH_SIZE),
+    state: AppState = Depends(app_state),
+) -> ImportReport:
+    """
+    Import tasks from an NDJSON body (one TaskCreate object per line).
+
+    The body is read as a stream and valid tasks are committed every
+    ``chunk_size`` lines, so very large imports never sit in memory.
+    Invalid lines are skipped and reported with their line number.
+    """
+    report = await import_tasks(
+        request.stream(), state.repo, chunk_size,
+        check=lambda data: title_error(data.title),
+        created=state.tasks_saved,
+    )
+    logger.info(f"Import finished: {report.imported} tasks imported, {report.failed} lines failed")
+    return report
+
+
+@router.post("/tasks/batch", response_model=BatchResponse)
+async def create_tasks_batch(items: List[Any] = Body(...), state: AppState = Depends(app_state)) -> BatchResponse:
+    """
+    Create several tasks in one request.
+
+    Body: a JSON array of TaskCreate objects. Each item is validated on its
+    own; valid items are stored together (one transaction), invalid ones are
+    reported with status 422. Results come back in request order.
+    """
+    check_batch_size(items)
+    results: List[Optional[BatchItemResult]] = [None] * len(items)
+    valid: List[Tuple[int, TaskCreate]] = []
+
+    for index, raw in enumerate(items):
+        try:
+            data = TaskCreate.model_validate(raw)
+        except ValidationError as exc:
+            results[index] = BatchItemResult(index=index, status=422, error=validation_errors(exc))
+            continue
+        error = title_error(data.title)
+        if error:
+            results[index] = BatchItemResult(index=index, status=422, error=error)
+            continue
+        valid.append((index, data))
+
+    created = await state.repo.create_many([data for _, data in valid])
+    state.tasks_saved(created)
+    for (index, _), task in zip(valid, created):
+        results[index] = BatchItemResult(index=index, status=201, id=task.id, task=task)
+
+    logger.info(f"Batch create: {len(created)}/{len(items)} tasks created")
+    return batch_response(results)
+
+
+@router.patch("/tasks/batch", response_model=BatchResponse)
+async def update_tasks_batch(items: List[Any] = Body(...), state: AppState = Depends(app_state)) -> BatchResponse:
+    """
+    Update several tasks in one request.
+
+    Body: a JSON array of objects with the task ``id`` plus the fields to
+    change (same fields as PUT /tasks/{task_id}). Per-item status is 200,
+    404 (unknown task) or 422 (invalid item or ID repeated in the batch).
+    """
+    check_batch_size(items)
+    results: List[Optional[BatchItemResult]] = [None] * len(items)
+    valid: List[Tuple[int, int, Dict[str, Any]]] = []
+    seen_ids = set()
+
+    for index, raw in enumerate(items):
+        try:
+            item = TaskBatchUpdate.model_validate(raw)
+        except ValidationError as exc:
+            results[index] = BatchItemResult(index=index, status=422, error=validation_errors(exc))
+            continue
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+        error = update_error(update_data)
+        if error is None and item.id in seen_ids:
+            error = f"Task {item.id} appears more than once in the batch"
+        if error:
+            results[index] = BatchItemResult(index=index, status=422, id=item.id, error=error)
+            continue
+        seen_ids.add(item.id)
+        valid.append((index, item.id, update_data))
+
+    updated = await state.repo.update_many([(task_id, data) for _, task_id, data in valid])
+    state.tasks_saved([task for task in updated if task is not None])
+    for (index, task_id, _), task in zip(valid, updated):
+        if task is None:
+            results[index] = BatchItemResult(index=index, status=404, id=task_id,
+                                             error=f"Task {task_id} not found")
+        else:
+            results[index] = BatchItemResult(index=index, status=200, id=task_id, task=task)
+
+    return batch_response(results)
+
+
+@router.delete("/tasks/batch", response_model=BatchResponse)
+async def delete_tasks_batch(task_ids: List[int] = Body(...), state: AppState = Depends(app_state)) -> BatchResponse:
+    """
+    Delete several tasks in one request.
+
+    Body: a JSON array of task IDs. Per-item status is 204, 404 (unknown
+    task) or 422 (ID repeated in the batch).
+    """
+    check_batch_size(task_ids)
+    results: List[Optional[BatchItemResult]] = [None] * len(task_ids)
+    unique: List[Tuple[int, int]] = []
+    seen_ids = set()
+
+    for index, task_id in enumerate(task_ids):
+        if task_id in seen_ids:
+            results[index] = BatchItemResult(index=index, status=422, id=task_id,
+                                             error=f"Task {task_id} appears more than once in the batch")
+            continue
+        seen_ids.add(task_id)
+        unique.append((index, task_id))
+
+    deleted = await state.repo.delete_many([task_id for _, task_id in unique])
+    for (index, task_id), existed in zip(unique, deleted):
+        if existed:
+            state.task_deleted(task_id)
+            results[index] = BatchItemResult(index=index, status=204, id=task_id)
+        else:
+            results[index] = BatchItemResult(index=index, status=404, id=task_id,
+                                             error=f"Task {task_id} not found")
+
+    return batch_response(results)
+
+
+@router.get("/tasks/{task_id}", response_model=Task)
+async def get_task(task_id: int, request: Request, state: AppState = Depends(app_state)) -> Task:
+    """Get a single task by ID (supports If-None-Match)."""
+    task = await state.repo.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    return tasks_db[task_id]
 
+    etag = task_etag(task)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return RawJSONResponse(state.json_cache.dumps(task), headers=cache_headers(etag))
 
-@app.post("/tasks", response_model=Task, status_code=201)
-async def create_task(task_data: TaskCreate) -> Task:
+
+@router.post("/tasks", response_model=Task, status_code=201)
+async def create_task(task_data: TaskCreate, state: AppState = Depends(app_state)) -> Task:
     """Create a new task."""
     # Validate title is not empty
-    if not task_data.title or not task_data.title.strip():
-        raise HTTPException(status_code=422, detail="Title cannot be empty")
+    error = title_error(task_data.title)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
 
     # Create new task with auto-generated ID
-    task_id = get_next_id()
-    now = datetime.utcnow()
-
-    task = Task(
-        id=task_id,
-        title=task_data.title,
-        description=task_data.description,
-        status=task_data.status,
-        priority=task_data.priority,
-        assignee=task_data.assignee,
-        due_date=task_data.due_date,
-        created_at=now,
-        updated_at=now
-    )
-
-    tasks_db[task_id] = task
-    logger.info(f"Task created successfully: {task_id}")
+    task = await state.repo.create(task_data)
+    state.tasks_saved([task])
+    logger.info(f"Task created successfully: {task.id}")
     return task
 
 
-@app.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: int, updates: TaskUpdate) -> Task:
+@router.put("/tasks/{task_id}", response_model=Task)
+async def update_task(task_id: int, updates: TaskUpdate, state: AppState = Depends(app_state)) -> Task:
     """Update an existing task (partial update supported)."""
-    if task_id not in tasks_db:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-
-    # Get existing task
-    existing_task = tasks_db[task_id]
-
     # Update only provided fields
     update_data = updates.model_dump(exclude_unset=True)
 
-    # Validate title if provided
-    if "title" in update_data and not update_data["title"].strip():
-        raise HTTPException(status_code=422, detail="Title cannot be empty")
-
-    # Create updated task with only changed fields
-    updated_task = Task(
-        id=task_id,
-        title=update_data.get("title", existing_task.title),
-        description=update_data.get("description", existing_task.description),
-        status=update_data.get("status", existing_task.status),
-        priority=update_data.get("priority", existing_task.priority),
-        assignee=update_data.get("assignee", existing_task.assignee),
-        due_date=update_data.get("due_date", existing_task.due_date),
-        created_at=existing_task.created_at,
-        updated_at=datetime.utcnow()
-    )
+    # Validate title (if provided), status and priority
+    error = update_error(update_data)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
 
-    tasks_db[task_id] = updated_task
+    updated_task = await state.repo.update(task_id, update_data)
+    if updated_task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    state.tasks_saved([updated_task])
     return updated_task
 
 
-@app.delete("/tasks/{task_id}", status_code=204)
-async def delete_task(task_id: int):
+@router.delete("/tasks/{task_id}", status_code=204)
+async def delete_task(task_id: int, state: AppState = Depends(app_state)):
     """Delete a task by ID."""
-    if task_id not in tasks_db:
+    if not await state.repo.delete(task_id):
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-
-    del tasks_db[task_id]
+    state.task_deleted(task_id)
     return None
 
 
+# Served by uvicorn (src.app:app) and used by the tests
+app = create_app()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Building blocks of the read-through task cache (``CachedTaskRepository``).
+
+- ``LRUCache``: bounded mapping whose entries also expire after a TTL,
+  with hit / miss counters for tuning (exported by GET /metrics).
+- Invalidation channels: each API worker caches what it read, so a write
+  handled by one worker must evict the copies held by the others. The
+  repository publishes the IDs it changed; every other subscriber drops
+  them.
+  - ``LocalInvalidationChannel``: in-process fan-out, the stand-in used by
+    tests (several caches on one channel behave like several workers);
+  - ``PostgresInvalidationChannel``: PostgreSQL LISTEN / NOTIFY, shared by
+    every worker connected to the same database.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+logger = logging.getLogger("taskflow")
+
+
+class LRUCache:
+    """
+    Mapping bounded to ``maxsize`` entries (the least recently used one is
+    evicted first), each valid for ``ttl`` seconds after it was stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]  # expired
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Remove every entry for which ``predicate(key, value)`` is true."""
+        for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# =============================================================================
+# INVALIDATION CHANNELS
+# =============================================================================
+
+# Called with the origin of a message and the task IDs it invalidates
+# (None: every task, e.g. after a clear)
+Subscriber = Callable[[str, Optional[List[int]]], None]
+
+
+class InvalidationChannel(ABC):
+    """Broadcast of changed task IDs between the caches of several workers."""
+
+    def __init__(self):
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> None:
+        self._subscribers.append(callback)
+
+    def _deliver(self, origin: str, task_ids: Optional[List[int]]) -> None:
+        for callback in self._subscribers:
+            callback(origin, task_ids)
+
+    async def start(self) -> None:
+        """Connect (called from the repository's initialize)."""
+
+    async def close(self) -> None:
+        """Disconnect (called from the repository's close)."""
+
+    @abstractmethod
+    async def publish(self, origin: str, task_ids: Optional[List[int]]) -> None:
+        """Tell every subscriber (the publisher included) that these tasks changed."""
+
+
+class LocalInvalidationChannel(InvalidationChannel):
+    """Channel within one process - for tests, or to share one cache policy."""
+
+    async def publish(self, origin: str, task_ids: Optional[List[int]]) -> None:
+        self._deliver(origin, task_ids)
+
+
+class PostgresInvalidationChannel(InvalidationChannel):
+    """
+    LISTEN / NOTIFY on a dedicated asyncpg connection.
+
+    Notifications are sent after the write committed; a reader of another
+    worker may serve the old version until it arrives (a few milliseconds).
+    Payloads are limited to 8000 bytes by PostgreSQL: larger batches are
+    sent as "everything changed".
+    """
+
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, dsn: str, name: str = "taskflow_cache"):
+        super().__init__()
+        self.dsn = dsn
+        self.name = name
+        self._connection = None
+        self._lock = asyncio.Lock()  # one query at a time on the connection
+
+    async def start(self) -> None:
+        import asyncpg  # only needed with this channel
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(self.name, self._on_notify)
+        logger.info(f"Cache invalidations shared over PostgreSQL channel '{self.name}'")
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def publish(self, origin: str, task_ids: Optional[List[int]]) -> None:
+        payload = json.dumps({"o": origin, "ids": task_ids}, separators=(",", ":"))
+        if len(payload) > self.MAX_PAYLOAD:
+            payload = json.dumps({"o": origin, "ids": None}, separators=(",", ":"))
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.name, payload)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self._deliver(message["o"], message["ids"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation: {payload[:100]}")
@@ -0,0 +1,62 @@
+"""
+ETags and conditional GET (If-None-Match -> 304 Not Modified).
+
+Two kinds of validators are used:
+- lists (GET /tasks, GET /tasks/page) are tagged with the store version,
+  a counter bumped by every create, update and delete. It is never reused,
+  not even across restarts: the database keeps it, and the in-memory store
+  starts it from the clock (``boot_version``), so the ETag of a previous
+  run never matches the data of the new one;
+- a single task (GET /tasks/{task_id}) is tagged with its ID and updated_at.
+
+When the client already has the current version, the endpoint answers 304
+without loading or serializing any task.
+"""
+
+from typing import Optional
+
+from fastapi import Response
+
+
+def store_etag(version: int) -> str:
+    """Strong ETag for any list read at this store version."""
+    return f'"v{version}"'
+
+
+def task_etag(task) -> str:
+    """Strong ETag for one task, derived from its last modification time."""
+    return f'"t{task.id}-{task.updated_at.strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if the If-None-Match header lists ``etag`` (or is ``*``).
+
+    If-None-Match uses the weak comparison: a ``W/`` prefix is ignored.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the validator."""
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> dict:
+    """
+    Headers sent with every tagged response.
+
+    ``no-cache`` lets browsers keep the body but forces them to revalidate
+    (send If-None-Match) before each reuse.
+    """
+    return {"ETag": etag, "Cache-Control": "no-cache"}
@@ -3,12 +3,32 @@ Database configuration and session management.
 
 This module handles SQLAlchemy setup for PostgreSQL database.
 Supports both production (PostgreSQL) and testing (SQLite) environments.
+
+Two engines are built from the same DATABASE_URL:
+- a synchronous one (psycopg2 / sqlite3) for scripts such as db_init.py
+- an asyncio one (asyncpg / aiosqlite) for the API, so that waiting on the
+  database never blocks the event loop
+
+Several API worker processes can share the same database (WEB_CONCURRENCY
+> 1): IDs come from the database and SQLite files are opened in WAL mode.
+
+A SQLite file also gets a tuned profile (pragmas below) and separate
+writer and reader engines: ``SessionLocal`` / ``AsyncSessionLocal`` for
+writes, ``ReadSessionLocal`` / ``AsyncReadSessionLocal`` for reads, which
+never wait behind a write.
+
+Engines are built on first use, not when this module is imported: creating
+one imports its driver (psycopg2, asyncpg, ...), and the API never uses the
+synchronous ones. ``from src.database import engine`` still works - it
+builds them at that point.
 """
 
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Tuple
 import logging
 
 logger = logging.getLogger("taskflow")
@@ -24,26 +44,161 @@ DATABASE_URL = os.getenv(
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-logger.info(f"Connecting to database: {DATABASE_URL.split('@')[0]}...")  # Don't log credentials
+# =============================================================================
+# SQLITE PROFILE
+# =============================================================================
+
+# Applied to every new SQLite connection (in this order):
+# - busy_timeout: a writer waits up to 5 s for the lock instead of failing
+#   at once with "database is locked"
+# - journal_mode=WAL: readers keep reading while a writer commits
+# - synchronous=NORMAL: with WAL, fsync at checkpoints only - a commit
+#   survives a crash of the process, the last ones may be lost on power
+#   failure (TASKFLOW_SQLITE_SYNCHRONOUS=FULL to fsync every commit)
+# - cache_size: page cache per connection, in KiB when negative (16 MiB)
+# - mmap_size: read pages through a 256 MiB memory map, shared by all the
+#   connections of the process, instead of read() copies
+# - temp_store=MEMORY: sorts and temporary indexes never touch the disk
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": os.getenv("TASKFLOW_SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+    "cache_size": -16384,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Reader connections refuse to write, so a write can never slip onto them
+SQLITE_READER_PRAGMAS = {**SQLITE_PRAGMAS, "query_only": "ON"}
+
+# Reader connections per engine. SQLite has a single writer at a time: the
+# writer engine keeps one connection and queues writes in its pool rather
+# than letting them spin on the file lock, while WAL lets the readers run
+# next to it without ever waiting for a write.
+SQLITE_READERS = int(os.getenv("TASKFLOW_SQLITE_READERS", "8"))
+
+
+def enable_sqlite_pragmas(engine, pragmas: Optional[Dict[str, object]] = None) -> None:
+    """Apply ``pragmas`` (default SQLITE_PRAGMAS) to each connection of ``engine`` (sync or async, SQLite only)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite":
+        return
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def is_sqlite_file(url: str) -> bool:
+    """True for a SQLite database stored in a file (not ``:memory:``)."""
+    scheme, _, path = url.partition("://")
+    if scheme.split("+", 1)[0] != "sqlite":
+        return False
+    path = path.lstrip("/").split("?", 1)[0]
+    return path not in ("", ":memory:") and "mode=memory" not in url
+
+
+def make_engines(url: str, asynchronous: bool = False) -> Tuple[Any, Any]:
+    """
+    (writer, reader) engines for ``url``.
+
+    A SQLite file gets the profile above: one writer connection and a pool
+    of ``SQLITE_READERS`` query-only connections. Any other database (or an
+    in-memory SQLite, private to its connection) uses one engine for both,
+    with the server's own connection pool.
+    """
+    create = create_async_engine if asynchronous else create_engine
+    if not url.startswith("sqlite"):
+        engine = create(url, pool_size=5, max_overflow=10, pool_pre_ping=True)  # Verify connections before using
+        return engine, engine
+
+    # check_same_thread=False: pooled connections move between threads
+    # (aiosqlite runs each connection in its own thread anyway)
+    connect_args = {} if asynchronous else {"check_same_thread": False}
+    if not is_sqlite_file(url):
+        engine = create(url, connect_args=connect_args)
+        enable_sqlite_pragmas(engine)
+        return engine, engine
+
+    writer = create(url, connect_args=connect_args, pool_size=1, max_overflow=0)
+    enable_sqlite_pragmas(writer, SQLITE_PRAGMAS)
+    reader = create(url, connect_args=connect_args, pool_size=SQLITE_READERS, max_overflow=0)
+    enable_sqlite_pragmas(reader, SQLITE_READER_PRAGMAS)
+    return writer, reader
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the synchronous driver of a database URL for its asyncio driver.
+
+    postgresql://...       -> postgresql+asyncpg://...
+    sqlite:///./taskflow.db -> sqlite+aiosqlite:///./taskflow.db
+    """
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "postgresql":
+        return f"postgresql+asyncpg://{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+
+# =============================================================================
+# ENGINES (built on first use)
+# =============================================================================
+
+# Module attributes provided lazily by __getattr__ below
+SYNC_ENGINES = ("engine", "read_engine", "SessionLocal", "ReadSessionLocal")
+ASYNC_ENGINES = ("async_engine", "async_read_engine", "AsyncSessionLocal", "AsyncReadSessionLocal")
 
-# Create engine
-# For SQLite, we need check_same_thread=False
-# For PostgreSQL, we can use connection pooling
-engine_kwargs = {}
-if DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
-else:
-    # PostgreSQL connection pool settings
-    engine_kwargs.update({
-        "pool_size": 5,
-        "max_overflow": 10,
-        "pool_pre_ping": True,  # Verify connections before using
-    })
+_engines_lock = threading.Lock()
+
+
+def _build_engines(asynchronous: bool) -> Dict[str, Any]:
+    if asynchronous:
+        # Async engines with the same settings and their session factories
+        # expire_on_commit=False: objects stay readable after commit without a new query
+        writer, reader = make_engines(ASYNC_DATABASE_URL, asynchronous=True)
+        return dict(zip(ASYNC_ENGINES, (
+            writer, reader,
+            async_sessionmaker(writer, autoflush=False, expire_on_commit=False),
+            async_sessionmaker(reader, autoflush=False, expire_on_commit=False),
+        )))
+    # Synchronous engines (psycopg2 / sqlite3) and their session factories
+    writer, reader = make_engines(DATABASE_URL)
+    return dict(zip(SYNC_ENGINES, (
+        writer, reader,
+        sessionmaker(autocommit=False, autoflush=False, bind=writer),
+        sessionmaker(autocommit=False, autoflush=False, bind=reader),
+    )))
+
+
+def engines(asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    The synchronous (or async) engines and session factories of DATABASE_URL,
+    by name, built on the first call and then kept as module attributes.
+    """
+    names = ASYNC_ENGINES if asynchronous else SYNC_ENGINES
+    with _engines_lock:
+        if names[0] not in globals():
+            logger.info(f"Connecting to database: {DATABASE_URL.split('@')[0]}...")  # Don't log credentials
+            globals().update(_build_engines(asynchronous))
+    return {name: globals()[name] for name in names}
 
-engine = create_engine(DATABASE_URL, **engine_kwargs)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str) -> Any:
+    # Only called for attributes not set yet: the engines before first use
+    if name in SYNC_ENGINES or name in ASYNC_ENGINES:
+        return engines(asynchronous=name in ASYNC_ENGINES)[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Base class for ORM models
 Base = declarative_base()
@@ -59,22 +214,39 @@ def get_db() -> Generator[Session, None, None]:
             tasks = db.query(TaskModel).all()
             return tasks
     """
-    db = SessionLocal()
+    db = engines()["SessionLocal"]()
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async counterpart of get_db.
+
+    Usage in FastAPI:
+        @app.get("/tasks")
+        async def list_tasks(db: AsyncSession = Depends(get_async_db)):
+            result = await db.scalars(select(TaskModel))
+            return result.all()
+    """
+    async with engines(asynchronous=True)["AsyncSessionLocal"]() as db:
+        yield db
+
+
 def init_db() -> None:
     """
-    Initialize the database by creating all tables.
+    Initialize the database: create the tables and apply pending migrations.
 
     This should be called on application startup.
     """
+    from .migrations import migrate  # models import this module
+
     logger.info("Initializing database tables...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully!")
+    with engines()["engine"].begin() as connection:
+        applied = migrate(connection)
+    logger.info(f"Database tables created successfully! (migrations applied: {applied or 'none'})")
 
 
 def drop_db() -> None:
@@ -84,6 +256,10 @@ def drop_db() -> None:
     WARNING: This will delete all data!
     Only use for testing or development reset.
     """
+    from .search import drop_sql_search
+
     logger.warning("Dropping all database tables...")
-    Base.metadata.drop_all(bind=engine)
+    with engines()["engine"].begin() as connection:
+        drop_sql_search(connection)
+        Base.metadata.drop_all(bind=connection)
     logger.warning("All tables dropped!")
@@ -0,0 +1,191 @@
+"""
+Change feed of task mutations (GET /tasks/events, Server-Sent Events).
+
+The feed tails the store by version, like a client of GET /tasks/changes
+would: every message is the delta between two store versions (tasks
+created or updated, IDs deleted) and carries the newer version as its
+``id``. Store versions are global - with a database they are a counter in
+the database - so every worker numbers the same changes the same way, and
+a client can resume on any worker (``Last-Event-ID``, sent automatically by
+``EventSource``, or ``?since=``). The in-memory store starts its versions
+from the clock, so an id from before a restart is never a version of the
+new process either: resuming from it gives a reset.
+
+One tailer per process loads the deltas, right after a write handled by
+this process (``notify``) or every ``poll`` seconds for the writes of the
+other workers, and keeps the latest ones in a bounded ring buffer shared by
+all subscribers: each subscriber only remembers its position in it, so a
+slow consumer costs no memory. A subscriber resuming from a version that is
+no longer buffered gets its delta straight from the store; when the store
+no longer knows the deletions either, the delta has ``reset`` set and
+holds every task.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("taskflow")
+
+# Deltas kept for resuming subscribers
+DEFAULT_BUFFER_SIZE = 1000
+
+# Seconds between two loads while subscribers are connected: how late the
+# writes of the other workers may arrive
+DEFAULT_POLL_SECONDS = 1.0
+
+# Seconds between two keep-alive comments on an idle stream (proxies close
+# connections that stay silent too long)
+KEEPALIVE_SECONDS = 15.0
+
+# Delta after a version: (new version, reset, JSON of the TaskChanges)
+ChangesLoader = Callable[[int], Awaitable[Tuple[int, bool, bytes]]]
+
+
+class ChangeEvent(NamedTuple):
+    since: int  # version the delta starts from
+    seq: int  # version it leads to
+    data: bytes  # TaskChanges JSON, already encoded
+
+
+class ChangeFeed:
+    """Tail of the store's changes plus wake-ups for waiting subscribers."""
+
+    def __init__(self, load: ChangesLoader, current: Callable[[], Awaitable[int]],
+                 maxlen: int = DEFAULT_BUFFER_SIZE, poll: float = DEFAULT_POLL_SECONDS):
+        self.load = load
+        self.current = current
+        self.poll = poll
+        self._events: Deque[ChangeEvent] = deque(maxlen=maxlen)
+        self.last_seq: Optional[int] = None  # store version of the latest delta loaded
+        self.appended = 0  # deltas loaded so far
+        self._waiters: List[asyncio.Future] = []
+        self._subscribers = 0
+        # Bound to the event loop of the subscribers (see _start_tailer)
+        self._lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tailer: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """A write was committed by this process: load it now rather than at the next poll."""
+        if self._wakeup is not None and self._tailer is not None and not self._tailer.done():
+            self._tailer.get_loop().call_soon_threadsafe(self._wakeup.set)
+
+    async def refresh(self) -> None:
+        """Load the changes committed since ``last_seq`` and wake the subscribers."""
+        async with self._lock:
+            if self.last_seq is None:
+                self.last_seq = await self.current()
+                return
+            version, reset, data = await self.load(self.last_seq)
+            if version == self.last_seq and not reset:
+                return
+            self._events.append(ChangeEvent(self.last_seq, version, data))
+            self.last_seq = version
+            self.appended += 1
+
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            # Subscribers may wait on another event loop (tests, threads)
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    def since(self, seq: int) -> Optional[List[ChangeEvent]]:
+        """
+        Buffered deltas after version ``seq``, oldest first, or None if they
+        do not start there (too old, or a version of another store).
+        """
+        if seq == self.last_seq:
+            return []
+        for index in range(len(self._events) - 1, -1, -1):
+            if self._events[index].since == seq:
+                return list(self._events)[index:]
+            if self._events[index].since < seq:
+                break
+        return None
+
+    async def wait(self, appended: int, timeout: float) -> bool:
+        """
+        Wait until more than ``appended`` deltas were loaded; False if
+        ``timeout`` seconds passed first.
+        """
+        if self.appended != appended:
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _start_tailer(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._tailer is not None and not self._tailer.done() and self._tailer.get_loop() is loop:
+            return
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._tailer = loop.create_task(self._tail())
+
+    async def _tail(self) -> None:
+        """Load new deltas while somebody listens: on notify, or every ``poll`` seconds."""
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Loading task changes failed, retrying at the next poll")
+
+    async def stream(self, since: Optional[int], keepalive: float = KEEPALIVE_SECONDS) -> AsyncIterator[bytes]:
+        """
+        SSE messages for one subscriber, forever.
+
+        ``since`` None starts with the next change; otherwise the changes
+        after that version are sent first.
+        """
+        self._subscribers += 1
+        try:
+            self._start_tailer()
+            if self.last_seq is None:
+                await self.refresh()
+            seq = self.last_seq if since is None else since
+            # Ask EventSource to reconnect after 1 s if the connection drops
+            yield b"retry: 1000\n\n"
+            while True:
+                appended = self.appended
+                events = self.since(seq)
+                if events is None:
+                    # Not buffered: this subscriber's own delta, from the store
+                    version, reset, data = await self.load(seq)
+                    events = [ChangeEvent(seq, version, data)] if version != seq or reset else []
+                if events:
+                    yield b"".join(b"id: %d\ndata: %s\n\n" % (event.seq, event.data) for event in events)
+                    seq = events[-1].seq
+                    continue
+                if not await self.wait(appended, keepalive):
+                    yield b": keepalive\n\n"
+        finally:
+            self._subscribers -= 1
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Store version of a Last-Event-ID header, None if missing or not ours."""
+    if value is None:
+        return None
+    try:
+        seq = int(value)
+    except ValueError:
+        return None
+    return seq if seq >= 0 else None
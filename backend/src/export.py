@@ -0,0 +1,58 @@
+"""
+Streaming export of tasks (GET /tasks/export).
+
+The repository hands out tasks in fixed-size chunks and each chunk is
+encoded and sent before the next one is fetched, so memory use does not
+depend on the number of tasks exported.
+"""
+
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, List
+
+from .schemas import Task
+
+# CSV columns, in the same order as the JSON fields
+CSV_COLUMNS = list(Task.model_fields)
+
+
+class ExportFormat(str, Enum):
+    """Formats available for GET /tasks/export."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+async def ndjson_chunks(chunks: AsyncIterator[List[Task]]) -> AsyncIterator[bytes]:
+    """One JSON object per line."""
+    async for tasks in chunks:
+        yield b"".join(task.model_dump_json().encode() + b"\n" for task in tasks)
+
+
+async def csv_chunks(chunks: AsyncIterator[List[Task]]) -> AsyncIterator[bytes]:
+    """A header line, then one row per task (None becomes an empty cell)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue().encode()
+
+    async for tasks in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for task in tasks:
+            row = task.model_dump(mode="json")
+            writer.writerow(["" if row[column] is None else row[column] for column in CSV_COLUMNS])
+        yield buffer.getvalue().encode()
+
+
+def encode_export(export_format: ExportFormat, chunks: AsyncIterator[List[Task]]) -> AsyncIterator[bytes]:
+    """Encode task chunks in the requested format."""
+    if export_format == ExportFormat.CSV:
+        return csv_chunks(chunks)
+    return ndjson_chunks(chunks)
@@ -0,0 +1,112 @@
+"""
+Streaming NDJSON import (POST /tasks/import).
+
+The request body is consumed as it arrives: complete lines are validated one
+by one with ``TaskCreate`` and valid tasks are committed in chunks through
+``create_many`` (one transaction / multi-row INSERT per chunk). Only the
+current line and the current chunk are ever held in memory, so the size of
+an import is limited by the storage backend, not by the HTTP body.
+"""
+
+import logging
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .repository import TaskRepository
+from .schemas import ImportLineError, ImportReport, Task, TaskCreate, validation_errors
+
+logger = logging.getLogger("taskflow")
+
+# A line longer than this is reported as an error instead of being buffered
+MAX_LINE_BYTES = 64 * 1024
+
+# Only the first errors are returned in the report (all are counted)
+MAX_REPORTED_ERRORS = 100
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into (line number, line) pairs, skipping blank lines.
+
+    Yields None instead of the line when it exceeds MAX_LINE_BYTES.
+    """
+    buffer = b""
+    line_number = 0
+    too_long = False
+
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if too_long or len(line) > MAX_LINE_BYTES:
+                too_long = False
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+        if len(buffer) > MAX_LINE_BYTES:
+            # Drop the rest of this line as it arrives
+            too_long = True
+            buffer = b""
+
+    if too_long:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, buffer
+
+
+async def import_tasks(
+    stream: AsyncIterator[bytes],
+    repo: TaskRepository,
+    chunk_size: int,
+    check: Callable[[TaskCreate], Optional[str]],
+    created: Optional[Callable[[List[Task]], None]] = None,
+) -> ImportReport:
+    """
+    Validate and store every task of an NDJSON stream.
+
+    ``check`` adds API-level rules on top of the schema (it returns an error
+    message or None); ``created`` is called with the tasks of each chunk
+    once they are stored.
+    """
+    report = ImportReport(lines=0, imported=0, failed=0, chunks=0, errors=[])
+    chunk: List[TaskCreate] = []
+
+    def fail(line_number: int, error) -> None:
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportLineError(line=line_number, error=error))
+        else:
+            report.errors_truncated = True
+
+    async def commit() -> None:
+        tasks = await repo.create_many(chunk)
+        if created is not None:
+            created(tasks)
+        report.imported += len(chunk)
+        report.chunks += 1
+        chunk.clear()
+        logger.info(f"Import: {report.lines} lines read, {report.imported} imported, {report.failed} failed")
+
+    async for line_number, line in iter_lines(stream):
+        report.lines += 1
+        if line is None:
+            fail(line_number, f"Line longer than {MAX_LINE_BYTES} bytes")
+            continue
+        try:
+            data = TaskCreate.model_validate_json(line)
+        except ValidationError as exc:
+            fail(line_number, validation_errors(exc))
+            continue
+        error = check(data)
+        if error:
+            fail(line_number, error)
+            continue
+        chunk.append(data)
+        if len(chunk) >= chunk_size:
+            await commit()
+
+    if chunk:
+        await commit()
+    return report
@@ -0,0 +1,147 @@
+"""
+Prometheus metrics (GET /metrics).
+
+``MetricsMiddleware`` times every HTTP request and records it in a latency
+histogram labelled by route template, method and status code. Store size,
+index lookups and JSON cache counters are read from the app only when
+``/metrics`` is scraped.
+
+Recording is kept cheap on purpose:
+- histogram buckets are fixed up front, so an observation is one bisect
+  and two additions on plain lists - no locks, no allocations once a label
+  set has been seen;
+- everything is updated from the event loop thread, where increments
+  cannot interleave;
+- routes are labelled by template (``/tasks/{task_id}``), never by raw
+  path, so the number of series stays bounded.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+# Upper bounds (seconds) of the request latency buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route label of requests that matched no route (404 on unknown paths)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Pre-bucketed histogram: per-bucket counts (not cumulative) plus sum."""
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def cumulative(self) -> List[int]:
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class RequestMetrics:
+    """HTTP request counters, keyed by (route, method, status)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, route: str, method: str, status: int, seconds: float) -> None:
+        key = (route, method, str(status))
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(len(self.buckets))
+        histogram.counts[bisect_left(self.buckets, seconds)] += 1
+        histogram.sum += seconds
+
+    def reset(self) -> None:
+        self.latency.clear()
+        self.in_flight = 0
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the duration and status of each request."""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500  # if the app raises before sending a response
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            metrics.observe(getattr(route, "path", UNMATCHED_ROUTE), scope["method"],
+                            status, time.perf_counter() - started)
+
+
+# =============================================================================
+# TEXT EXPOSITION FORMAT
+# =============================================================================
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render(metrics: RequestMetrics, gauges: Iterable[Tuple[str, str, str, List[Tuple[dict, float]]]]) -> str:
+    """
+    Prometheus text format for the request metrics plus extra series.
+
+    ``gauges`` holds (name, type, help, [(labels, value), ...]) tuples for
+    values sampled at scrape time.
+    """
+    lines = [
+        "# HELP taskflow_http_request_duration_seconds HTTP request latency by route, method and status.",
+        "# TYPE taskflow_http_request_duration_seconds histogram",
+    ]
+    bounds = [repr(float(b)) for b in metrics.buckets] + ["+Inf"]
+    for (route, method, status), histogram in sorted(metrics.latency.items()):
+        cumulative = histogram.cumulative()
+        for bound, count in zip(bounds, cumulative):
+            labels = _labels(route=route, method=method, status=status, le=bound)
+            lines.append(f"taskflow_http_request_duration_seconds_bucket{labels} {count}")
+        labels = _labels(route=route, method=method, status=status)
+        lines.append(f"taskflow_http_request_duration_seconds_sum{labels} {histogram.sum}")
+        lines.append(f"taskflow_http_request_duration_seconds_count{labels} {cumulative[-1]}")
+
+    lines += [
+        "# HELP taskflow_http_requests_in_flight HTTP requests currently being served.",
+        "# TYPE taskflow_http_requests_in_flight gauge",
+        f"taskflow_http_requests_in_flight {metrics.in_flight}",
+    ]
+
+    for name, kind, help_text, samples in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels) if labels else ''} {value}")
+
+    return "\n".join(lines) + "\n"
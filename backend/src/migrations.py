@@ -0,0 +1,205 @@
+"""
+Versioned schema migrations for the SQL backend (Atelier 3).
+
+``create_all`` only creates missing tables: it never adds a column or an
+index to a table that already exists. Schema changes to existing tables
+are therefore listed in ``MIGRATIONS``, numbered, and applied in order by
+``migrate()`` on startup. The ``schema_migrations`` table records the
+versions already applied, so each one runs once per database.
+
+Migrations are online and expand-only: they add columns and indexes, never
+rewrite or drop data (except the tasks table rebuild SQLite needs to alter
+its primary key), so workers still running the previous code keep
+working while (and after) a new one migrates. Each step is also idempotent
+(``IF NOT EXISTS``, columns checked first): a migration interrupted before
+it was recorded is simply run again. Workers starting together race to
+record the same version; the loser fails with an IntegrityError and
+``SQLTaskRepository.initialize`` retries, finding the work done.
+
+On a large PostgreSQL table, an index can be built without blocking writes
+beforehand (``CREATE INDEX CONCURRENTLY`` with the same name): the
+migration then finds it and only records itself.
+
+To change the schema: update models.py (fresh databases get it from
+``create_all``), then append a migration doing the same to existing ones.
+"""
+
+import logging
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Integer, MetaData, inspect, insert, select, text
+from sqlalchemy.schema import CreateTable
+
+from .database import Base
+from .models import SchemaMigrationModel, TaskModel
+from .search import install_sql_search
+
+logger = logging.getLogger("taskflow")
+
+# Primary key of the single store_meta row
+STORE_META_ID = 1
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable  # apply(connection)
+
+
+def _create_indexes(*ddl: str) -> Callable:
+    """Migration step creating the given indexes, ``name ON table (columns)``."""
+    def apply(connection) -> None:
+        for index in ddl:
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index}"))
+    return apply
+
+
+def _add_task_versions(connection) -> None:
+    """Per-task versions and the tombstone floor (GET /tasks/changes)."""
+    inspector = inspect(connection)
+    task_columns = {column["name"] for column in inspector.get_columns("tasks")}
+    meta_columns = {column["name"] for column in inspector.get_columns("store_meta")}
+    if "tombstone_floor" not in meta_columns:
+        connection.execute(text("ALTER TABLE store_meta ADD COLUMN tombstone_floor INTEGER NOT NULL DEFAULT 0"))
+    if "version" not in task_columns:
+        connection.execute(text("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+        # Rows from before versioning count as changed at the current
+        # version, and clients older than it must reset
+        current = f"COALESCE((SELECT version FROM store_meta WHERE id = {STORE_META_ID}), 0)"
+        connection.execute(text(f"UPDATE tasks SET version = {current}"))
+        connection.execute(text("UPDATE store_meta SET tombstone_floor = version"))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_version ON tasks (version)"))
+
+
+def _rebuild_sqlite_tasks(connection) -> None:
+    """
+    Recreate the tasks table as models.py describes it, rows included.
+
+    SQLite cannot alter a column or the primary key of a table: the new
+    table is created under another name, filled, and takes the old one's
+    place; its indexes and search triggers are then created again (they
+    went with the old table). The rare exception to expand-only
+    migrations: it holds the database lock while it copies.
+    """
+    table = TaskModel.__table__
+    columns = ", ".join(column.name for column in table.columns)
+    # IDs of the first schema were VARCHAR (see _check_task_ids)
+    values = ", ".join("CAST(id AS INTEGER)" if column.name == "id" else column.name for column in table.columns)
+    rebuilt = table.to_metadata(MetaData(), name="tasks_rebuilt")
+    connection.execute(CreateTable(rebuilt))
+    connection.execute(text(f"INSERT INTO tasks_rebuilt ({columns}) SELECT {values} FROM tasks"))
+    connection.execute(text("DROP TABLE tasks"))
+    connection.execute(text("ALTER TABLE tasks_rebuilt RENAME TO tasks"))
+    for index in table.indexes:
+        index.create(connection)
+    install_sql_search(connection)
+
+
+def _never_reuse_task_ids(connection) -> None:
+    """SQLite: AUTOINCREMENT on tasks.id, counting from the highest ID ever used."""
+    if connection.dialect.name != "sqlite":
+        return  # PostgreSQL sequences never go back
+    ddl = connection.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"))
+    if "AUTOINCREMENT" not in ddl.upper():
+        _rebuild_sqlite_tasks(connection)
+    # IDs of deleted tasks still known to clients are not reused either
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+    connection.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', MAX("
+        "(SELECT COALESCE(MAX(id), 0) FROM tasks), "
+        "(SELECT COALESCE(MAX(task_id), 0) FROM task_tombstones))"
+    ))
+
+
+def _task_ids_are_integers(connection) -> bool:
+    id_column = next(column for column in inspect(connection).get_columns("tasks") if column["name"] == "id")
+    return isinstance(id_column["type"], Integer)
+
+
+def _check_task_ids(connection) -> None:
+    """
+    Fail clearly on task IDs that cannot become integers.
+
+    The tasks table of the first schema (before Atelier 3 was wired in) had
+    ``id VARCHAR``: numeric IDs are converted by the migrations, anything
+    else would only fail later, on every insert.
+    """
+    if not inspect(connection).has_table("tasks") or _task_ids_are_integers(connection):
+        return
+    if connection.dialect.name == "postgresql":
+        not_integer = "id !~ '^-?[0-9]+$'"
+    else:
+        not_integer = "CAST(CAST(id AS INTEGER) AS VARCHAR) <> id"
+    bad = connection.scalar(text(f"SELECT id FROM tasks WHERE {not_integer} LIMIT 1"))
+    if bad is not None:
+        raise RuntimeError(
+            f"tasks.id is a string column holding IDs that are not integers (e.g. {bad!r}): "
+            "renumber or delete those rows, or recreate the database "
+            "(python src/db_init.py --reset, which deletes every task)"
+        )
+
+
+def _integer_task_ids(connection) -> None:
+    """tasks.id of the first schema (VARCHAR, no default) as an auto-incremented integer."""
+    if _task_ids_are_integers(connection):
+        return  # created from models.py, or rebuilt by migration 5 (SQLite)
+    if connection.dialect.name == "sqlite":
+        _rebuild_sqlite_tasks(connection)
+        return
+    # PostgreSQL: what a SERIAL column is, starting after every ID used
+    for statement in (
+        "ALTER TABLE tasks ALTER COLUMN id TYPE INTEGER USING id::integer",
+        "CREATE SEQUENCE IF NOT EXISTS tasks_id_seq OWNED BY tasks.id",
+        "ALTER TABLE tasks ALTER COLUMN id SET DEFAULT nextval('tasks_id_seq')",
+        "SELECT setval('tasks_id_seq', GREATEST((SELECT COALESCE(MAX(id), 0) FROM tasks), "
+        "(SELECT COALESCE(MAX(task_id), 0) FROM task_tombstones)) + 1, false)",
+    ):
+        connection.execute(text(statement))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Index due and creation dates", _create_indexes(
+        "ix_tasks_due_date ON tasks (due_date)",
+        "ix_tasks_created_at ON tasks (created_at)",
+    )),
+    Migration(2, "Task versions for delta sync", _add_task_versions),
+    Migration(3, "Full-text search index", install_sql_search),
+    Migration(4, "Composite indexes for the API filters", _create_indexes(
+        "ix_tasks_status_priority ON tasks (status, priority)",
+        "ix_tasks_status_due_date ON tasks (status, due_date)",
+        "ix_tasks_status_created_at ON tasks (status, created_at)",
+        "ix_tasks_assignee_status ON tasks (assignee, status)",
+        "ix_tasks_priority_due_date ON tasks (priority, due_date)",
+    )),
+    Migration(5, "Never reuse task IDs", _never_reuse_task_ids),
+    Migration(6, "Integer task IDs", _integer_task_ids),
+]
+
+# Version of the schema described by models.py
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def migrate(connection) -> List[int]:
+    """
+    Create missing tables, then apply the pending migrations in order.
+
+    Runs in the caller's transaction; returns the versions applied.
+    """
+    _check_task_ids(connection)
+    Base.metadata.create_all(bind=connection)
+    applied = set(connection.scalars(select(SchemaMigrationModel.version)))
+    pending = [migration for migration in MIGRATIONS if migration.version not in applied]
+    for migration in pending:
+        logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+        migration.apply(connection)
+        connection.execute(insert(SchemaMigrationModel).values(
+            version=migration.version, description=migration.description,
+        ))
+    return [migration.version for migration in pending]
+
+
+def schema_version(connection) -> int:
+    """Latest migration applied to the database (0 if none)."""
+    if not inspect(connection).has_table(SchemaMigrationModel.__tablename__):
+        return 0
+    return connection.scalar(select(SchemaMigrationModel.version).order_by(SchemaMigrationModel.version.desc())) or 0
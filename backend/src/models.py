@@ -4,24 +4,11 @@ Database models for TaskFlow application.
 SQLAlchemy ORM models for PostgreSQL database.
 """
 
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, DateTime, Enum as SQLEnum
 from sqlalchemy.sql import func
-from datetime import datetime
 from .database import Base
-from enum import Enum
-
-
 # Enums (shared between Pydantic and SQLAlchemy)
-class TaskStatus(str, Enum):
-    TODO = "todo"
-    IN_PROGRESS = "in_progress"
-    DONE = "done"
-
-
-class TaskPriority(str, Enum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
+from .schemas import TaskStatus, TaskPriority
 
 
 class TaskModel(Base):
@@ -29,10 +16,30 @@ class TaskModel(Base):
     SQLAlchemy model for tasks table.
 
     This represents the database schema for tasks.
+
+    Besides the single-column indexes below, composite indexes match the
+    filter combinations of the API (an index on (a, b) also serves
+    filters on ``a`` alone). Existing databases get them through
+    migrations.py.
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # GET /tasks?status=...&priority=...; stats group by status, priority
+        Index("ix_tasks_status_priority", "status", "priority"),
+        # Overdue / due this week per status; sort=due_date within a status
+        Index("ix_tasks_status_due_date", "status", "due_date"),
+        # GET /tasks/page?order_by=created_at&status=...
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        # "My open tasks": assignee, optionally with a status
+        Index("ix_tasks_assignee_status", "assignee", "status"),
+        # GET /tasks?priority=high&sort=due_date
+        Index("ix_tasks_priority_due_date", "priority", "due_date"),
+        # Never reuse the ID of a deleted task (SQLite takes max(id) + 1
+        # otherwise): clients syncing by ID would mix the two tasks up
+        {"sqlite_autoincrement": True},
+    )
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String(200), nullable=False)
     description = Column(String(1000), nullable=True)
     status = Column(
@@ -46,9 +53,12 @@ class TaskModel(Base):
         default=TaskPriority.MEDIUM.value
     )
     assignee = Column(String(100), nullable=True)
-    due_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    # Indexed for range filters and sorting (GET /tasks?due_before=...&sort=due_date)
+    due_date = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    # Store version of the task's last change (GET /tasks/changes)
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
 
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
@@ -66,3 +76,41 @@ class TaskModel(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class StoreMetaModel(Base):
+    """
+    Single-row table holding the store version.
+
+    The version is bumped in the same transaction as every write to the
+    tasks table, so all API workers agree on it (used for ETags).
+    Deletions older than ``tombstone_floor`` have been compacted away.
+    """
+    __tablename__ = "store_meta"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    tombstone_floor = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class TaskTombstoneModel(Base):
+    """
+    One deleted task, with the store version of its deletion.
+
+    Lets GET /tasks/changes tell clients which tasks disappeared. Only the
+    most recent rows are kept (see SQLTaskRepository).
+    """
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, index=True)
+
+
+class SchemaMigrationModel(Base):
+    """One applied schema migration (see migrations.py)."""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
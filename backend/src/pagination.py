@@ -0,0 +1,146 @@
+"""
+Keyset (cursor) pagination for task lists.
+
+A page is identified by the sort key of the last task the client has seen,
+never by an offset, so fetching page 1000 costs the same as fetching page 1.
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort order
+and the last key.
+
+Supported orders:
+- ``id``: ascending task ID
+- ``created_at``: ascending creation date (ties broken by ID)
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .query import naive_utc
+
+
+class TaskOrder(str, Enum):
+    """Sort orders available for paginated task lists."""
+    ID = "id"
+    CREATED_AT = "created_at"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def sort_key(task, order: TaskOrder) -> Tuple:
+    """Return the (unique) sort key of a task for the given order."""
+    if order == TaskOrder.CREATED_AT:
+        return (task.created_at, task.id)
+    return (task.id,)
+
+
+def encode_cursor(order: TaskOrder, key: Tuple) -> str:
+    """Encode a sort key into an opaque cursor string."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    return _encode({"o": order.value, "k": values})
+
+
+def decode_cursor(cursor: str, order: TaskOrder) -> Tuple:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises InvalidCursor if the cursor is malformed or was issued for a
+    different sort order. A date with a UTC offset is converted to naive
+    UTC, like the stored ``created_at`` it is compared with.
+    """
+    values = _decode(cursor, order.value)
+    try:
+        if order == TaskOrder.CREATED_AT:
+            return (naive_utc(datetime.fromisoformat(values[0])), int(values[1]))
+        return (int(values[0]),)
+    except (ValueError, IndexError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+
+
+# Search results (GET /tasks/search) are ranked by relevance: their cursor
+# holds the (score, id) of the last result
+RELEVANCE = "relevance"
+
+
+def encode_search_cursor(score: float, task_id: int) -> str:
+    return _encode({"o": RELEVANCE, "k": [score, task_id]})
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    values = _decode(cursor, RELEVANCE)
+    try:
+        return (float(values[0]), int(values[1]))
+    except (ValueError, IndexError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, order: str) -> List[Any]:
+    """The key values of a cursor, checked to belong to ``order``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        issued_for = payload["o"]
+        values = payload["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if issued_for != order:
+        raise InvalidCursor(f"Cursor was issued for order '{issued_for}'")
+    if not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def split_page(rows: Sequence[Any], limit: int, order: TaskOrder) -> Tuple[List[Any], Optional[str]]:
+    """
+    Turn ``limit + 1`` fetched rows into a page and the cursor of the next one.
+
+    Backends fetch one extra row so we know whether another page exists
+    without running a COUNT query.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    return items, encode_cursor(order, sort_key(items[-1], order))
+
+
+# =============================================================================
+# SQLALCHEMY (Atelier 3)
+# =============================================================================
+
+def keyset_select(model, order: TaskOrder, after: Optional[Tuple], limit: int, **filters):
+    """
+    Build a ``SELECT`` for at most ``limit`` rows of ``model`` after ``after``.
+
+    Ask for one more row than the page size so ``split_page`` can detect the
+    next page. Equality filters whose value is None are ignored.
+    """
+    from sqlalchemy import and_, or_, select  # SQL backends only
+
+    stmt = select(model)
+    for field, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(getattr(model, field) == value)
+
+    if order == TaskOrder.CREATED_AT:
+        if after is not None:
+            created_at, task_id = after
+            stmt = stmt.where(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > task_id),
+            ))
+        stmt = stmt.order_by(model.created_at, model.id)
+    else:
+        if after is not None:
+            stmt = stmt.where(model.id > after[0])
+        stmt = stmt.order_by(model.id)
+
+    return stmt.limit(limit)
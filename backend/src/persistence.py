@@ -0,0 +1,365 @@
+"""
+Durability for the in-memory store: write-ahead log + snapshots.
+
+Enabled by setting TASKFLOW_DATA_DIR (see ``journal_from_env``). Reads still
+come straight from the ``TaskStore``; only writes touch the disk:
+
+- every create, update, delete and clear is appended as one JSON line to
+  the current log segment (``wal-<first version>.log``);
+- log lines are fsynced in groups: the writes queued while an fsync is
+  running all share the next one, and TASKFLOW_WAL_GROUP_MS can add a short
+  wait so that more writes join each group;
+- every TASKFLOW_SNAPSHOT_EVERY records (and on shutdown) the whole store is
+  written to ``snapshot.ndjson`` in a background thread, after which the
+  log segments it covers are deleted.
+
+Each record carries the store version it produces, so on startup the
+snapshot is loaded and only the log records newer than it are replayed.
+A half-written last line (crash during a write) is dropped.
+
+If writing the log fails (disk full, I/O error), the journal is marked
+failed: the writes of that group and every later one are refused with
+``JournalFailed``, and no snapshot is taken, so the disk never holds more
+than what was acknowledged. A restart recovers from what was written.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .schemas import Task
+
+logger = logging.getLogger("taskflow")
+
+SNAPSHOT_FILE = "snapshot.ndjson"
+
+# Marker placed among the pending lines: switch to a new log segment there
+_ROTATE = "rotate"
+
+
+class JournalFailed(RuntimeError):
+    """A write to the log failed earlier: the journal refuses new records."""
+
+
+class RecoveredState:
+    """What ``TaskJournal.recover`` rebuilt from disk."""
+
+    def __init__(self, version: int = 0, next_id: int = 1, tasks: Optional[Dict[int, Task]] = None):
+        self.version = version
+        self.next_id = next_id
+        self.tasks: Dict[int, Task] = tasks if tasks is not None else {}
+
+
+class TaskJournal:
+    """
+    Append-only log of task changes with group commit and snapshots.
+
+    ``append`` only queues a record; ``await commit()`` returns once every
+    record queued so far is on disk (fsynced unless ``fsync`` is False).
+    The store is updated before the log is durable, so a concurrent reader
+    may briefly see a write that a crash would lose - as with any
+    write-behind cache, the writer itself is only answered after commit.
+    """
+
+    def __init__(self, directory, fsync: bool = True, group_ms: float = 0.0,
+                 snapshot_every: int = 10_000):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.group_delay = group_ms / 1000
+        self.snapshot_every = snapshot_every
+        self.records_since_snapshot = 0
+        self._segment = None
+        self._pending: List = []
+        self._waiters: List[asyncio.Future] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self.failed: Optional[BaseException] = None  # first write error, if any
+
+    # -------------------------------------------------------------------------
+    # Recovery
+    # -------------------------------------------------------------------------
+
+    def recover(self) -> RecoveredState:
+        """Load the snapshot, replay newer log records and open the log for appending."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self._read_snapshot()
+        snapshot_version = state.version
+
+        segments = self._segments()
+        for number, (_, path) in enumerate(segments):
+            last_segment = number == len(segments) - 1
+            replayed = self._replay(path, state, snapshot_version, last_segment)
+            self.records_since_snapshot += replayed
+
+        if segments:
+            self._segment = open(segments[-1][1], "ab")
+        else:
+            self._open_segment(state.version + 1)
+        logger.info(
+            f"💾 Recovered {len(state.tasks)} tasks (version {state.version}, "
+            f"{self.records_since_snapshot} log records replayed) from {self.directory}"
+        )
+        return state
+
+    def _read_snapshot(self) -> RecoveredState:
+        path = self.directory / SNAPSHOT_FILE
+        if not path.exists():
+            return RecoveredState()
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            tasks = {}
+            for line in f:
+                task = Task.model_validate_json(line)
+                tasks[task.id] = task
+        return RecoveredState(header["version"], header["next_id"], tasks)
+
+    def _replay(self, path: Path, state: RecoveredState, snapshot_version: int, last_segment: bool) -> int:
+        """Apply the records of one segment newer than the snapshot; return how many."""
+        replayed = 0
+        with open(path, "rb+") as f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    record = json.loads(line)
+                except ValueError:
+                    if not last_segment:
+                        raise
+                    # Torn write at the very end of the log: drop it
+                    logger.warning(f"Dropping incomplete record at the end of {path.name}")
+                    f.truncate(offset)
+                    break
+                offset += len(line)
+                if record["v"] <= snapshot_version:
+                    continue
+                apply_record(state, record)
+                replayed += 1
+        return replayed
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        """Log segments, oldest first, with the first version they contain."""
+        segments = [
+            (int(path.stem.split("-", 1)[1]), path)
+            for path in self.directory.glob("wal-*.log")
+        ]
+        return sorted(segments)
+
+    def _open_segment(self, first_version: int) -> None:
+        if self._segment is not None:
+            self._segment.close()
+        self._segment = open(self.directory / f"wal-{first_version:012d}.log", "ab")
+        _fsync_directory(self.directory)
+
+    # -------------------------------------------------------------------------
+    # Logging
+    # -------------------------------------------------------------------------
+
+    def check(self) -> None:
+        """Raise JournalFailed if the log can no longer be written (call before changing the store)."""
+        if self.failed is not None:
+            raise JournalFailed(
+                f"Write-ahead log unavailable since a write failed ({self.failed}): restart to recover"
+            ) from self.failed
+
+    def append(self, version: int, op: str, task: Optional[Task] = None, task_id: Optional[int] = None) -> None:
+        """Queue one record: ``put`` (task), ``delete`` (task_id) or ``clear``."""
+        if op == "put":
+            line = f'{{"v":{version},"op":"put","task":{task.model_dump_json()}}}\n'
+        elif op == "delete":
+            line = f'{{"v":{version},"op":"delete","id":{task_id}}}\n'
+        else:
+            line = f'{{"v":{version},"op":"{op}"}}\n'
+        self._pending.append(line.encode())
+        self.records_since_snapshot += 1
+
+    def rotate(self, next_version: int) -> None:
+        """Start a new log segment at ``next_version`` once the queued records are written."""
+        self._pending.append((_ROTATE, next_version))
+        self.records_since_snapshot = 0
+
+    async def commit(self) -> None:
+        """Wait until every queued record is durable."""
+        self.check()
+        if not self._pending and self._flusher is None:
+            return
+        if not self.fsync:
+            # Hand the lines to the OS right away: survives a process crash,
+            # not a power loss
+            try:
+                self._write(self._take_pending())
+            except Exception as exc:
+                self._fail(exc)
+                raise
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_groups())
+        await waiter
+
+    async def _flush_groups(self) -> None:
+        """Write and fsync queued records, one group at a time."""
+        try:
+            if self.group_delay:
+                await asyncio.sleep(self.group_delay)  # let other writes join the group
+            # Waiters that arrived during a write may own records of that
+            # write: they are released by the next (possibly empty) group
+            while self._pending or self._waiters:
+                lines, waiters = self._take_pending(), self._waiters
+                self._waiters = []
+                try:
+                    # Once a group failed, the next ones are refused too:
+                    # their records may follow the lost ones
+                    self.check()
+                    await asyncio.to_thread(self._write, lines)
+                except Exception as exc:
+                    self._fail(exc)
+                    for waiter in waiters:
+                        if not waiter.done():  # the request may have been cancelled
+                            waiter.set_exception(exc)
+                    continue
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            self._flusher = None
+
+    def _fail(self, exc: BaseException) -> None:
+        if self.failed is None:
+            self.failed = exc
+            logger.error(f"Write-ahead log write failed, refusing writes until a restart: {exc}")
+
+    def _take_pending(self) -> List:
+        pending, self._pending = self._pending, []
+        return pending
+
+    def _write(self, lines: List) -> None:
+        chunk = []
+        for line in lines:
+            if isinstance(line, tuple) and line[0] == _ROTATE:
+                self._write_chunk(chunk)
+                chunk = []
+                self._open_segment(line[1])
+            else:
+                chunk.append(line)
+        self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk: List[bytes]) -> None:
+        if chunk:
+            self._segment.write(b"".join(chunk))
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def snapshot_due(self) -> bool:
+        return self.records_since_snapshot >= self.snapshot_every and self._snapshot_task is None
+
+    def start_snapshot(self, version: int, next_id: int, tasks: List[Task]) -> None:
+        """
+        Snapshot ``tasks`` (the store at ``version``) in the background.
+
+        Tasks are immutable models, so the list is a consistent copy even if
+        the store keeps changing while it is written.
+        """
+        self.rotate(version + 1)
+        self._snapshot_task = asyncio.create_task(self._snapshot(version, next_id, tasks))
+
+    async def _snapshot(self, version: int, next_id: int, tasks: List[Task]) -> None:
+        try:
+            await self.commit()  # the rotation marker is written before old segments go
+            await asyncio.to_thread(self.write_snapshot, version, next_id, tasks)
+        except Exception as exc:
+            logger.error(f"Snapshot failed (log kept): {exc}")
+        finally:
+            self._snapshot_task = None
+
+    def write_snapshot(self, version: int, next_id: int, tasks: List[Task]) -> None:
+        """Atomically replace the snapshot, then delete the log segments it covers."""
+        tmp = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps({"version": version, "next_id": next_id}).encode() + b"\n")
+            for start in range(0, len(tasks), 1000):
+                f.write(b"".join(t.model_dump_json().encode() + b"\n" for t in tasks[start:start + 1000]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / SNAPSHOT_FILE)
+        _fsync_directory(self.directory)
+
+        for first_version, path in self._segments():
+            if first_version <= version and path.name != Path(self._segment.name).name:
+                path.unlink()
+        logger.info(f"💾 Snapshot written: {len(tasks)} tasks at version {version}")
+
+    async def close(self, version: int, next_id: int, tasks: List[Task]) -> None:
+        """Flush the log, write a final snapshot and close the files."""
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if self.failed is not None:
+            # The store holds refused writes: keep the disk as it is
+            logger.warning("No final snapshot: the write-ahead log failed earlier")
+        else:
+            await self.commit()
+            if self.records_since_snapshot:
+                self.rotate(version + 1)
+                await self.commit()
+                await asyncio.to_thread(self.write_snapshot, version, next_id, tasks)
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+
+def apply_record(state: RecoveredState, record: dict) -> None:
+    """Replay one log record onto the recovered state."""
+    op = record["op"]
+    if op == "put":
+        task = Task.model_validate(record["task"])
+        state.tasks[task.id] = task
+        state.next_id = max(state.next_id, task.id + 1)
+    elif op == "delete":
+        state.tasks.pop(record["id"], None)
+    elif op == "clear":
+        state.tasks.clear()
+        state.next_id = 1
+    state.version = record["v"]
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist file creations/renames in ``directory`` (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def journal_from_env() -> Optional[TaskJournal]:
+    """
+    Build the journal configured by environment variables, or None.
+
+    - TASKFLOW_DATA_DIR: directory of the log and snapshot (unset = no persistence)
+    - TASKFLOW_WAL_FSYNC: "true" (default) or "false" to skip fsync
+    - TASKFLOW_WAL_GROUP_MS: extra wait for other writes to share an fsync (default 0)
+    - TASKFLOW_SNAPSHOT_EVERY: log records between two snapshots (default 10000)
+    """
+    directory = os.getenv("TASKFLOW_DATA_DIR")
+    if not directory:
+        return None
+    return TaskJournal(
+        directory,
+        fsync=os.getenv("TASKFLOW_WAL_FSYNC", "true").lower() not in ("0", "false", "no"),
+        group_ms=float(os.getenv("TASKFLOW_WAL_GROUP_MS", "0")),
+        snapshot_every=int(os.getenv("TASKFLOW_SNAPSHOT_EVERY", "10000")),
+    )
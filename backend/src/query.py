@@ -0,0 +1,118 @@
+"""
+Sorting and date-range filters for GET /tasks.
+
+- ``sort``: ``id``, ``created_at`` or ``due_date``, prefixed with ``-`` for
+  descending order. Ties are broken by ID (descending with ``-``); tasks
+  without a due date always come last when sorting by due date.
+- ``DateRange``: half-open interval ``since <= date < before``, either
+  bound optional, so consecutive ranges never overlap ("due this week" is
+  ``due_after=<monday>&due_before=<next monday>``).
+
+Bounds are compared as naive UTC datetimes, like the stored timestamps.
+
+The in-memory store answers these with its bisect-maintained sorted keys
+(store.py); databases with their indexes on ``due_date`` and ``created_at``
+(alone or after ``status`` / ``priority``, see models.py).
+"""
+
+from datetime import datetime, timezone
+from enum import Enum
+from typing import NamedTuple, Optional
+
+
+class TaskSort(str, Enum):
+    """Orders available for GET /tasks."""
+    ID = "id"
+    ID_DESC = "-id"
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    DUE_DATE = "due_date"
+    DUE_DATE_DESC = "-due_date"
+
+    @property
+    def field(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware datetimes converted to naive UTC; naive ones kept as is."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class DateRange(NamedTuple):
+    """Dates ``since <= date < before``; a None bound is open."""
+    since: Optional[datetime] = None
+    before: Optional[datetime] = None
+
+    @classmethod
+    def of(cls, since: Optional[datetime], before: Optional[datetime]) -> Optional["DateRange"]:
+        """The range between two optional bounds, or None when both are missing."""
+        if since is None and before is None:
+            return None
+        return cls(naive_utc(since), naive_utc(before))
+
+
+# =============================================================================
+# SQLALCHEMY (Atelier 3)
+# =============================================================================
+
+# SQLAlchemy is imported by the functions below, only called by the SQL
+# backends: the in-memory store starts without it
+
+def range_clause(column, date_range: DateRange):
+    """WHERE clause of a date range (NULL dates never match)."""
+    from sqlalchemy import and_
+
+    conditions = [column.isnot(None)]
+    if date_range.since is not None:
+        conditions.append(column >= date_range.since)
+    if date_range.before is not None:
+        conditions.append(column < date_range.before)
+    return and_(*conditions)
+
+
+def order_clauses(model, sort: TaskSort, without_nulls: bool = False):
+    """
+    ORDER BY clauses of a sort, matching the in-memory order exactly.
+
+    ``without_nulls``: the query already excludes NULLs of the sort column,
+    so they need no ordering clause (which would keep an index from
+    delivering the rows in order).
+    """
+    if sort.field == "id":
+        return [model.id.desc() if sort.descending else model.id]
+    column = getattr(model, sort.field)
+    if sort.descending:
+        clauses = [column.desc(), model.id.desc()]
+    else:
+        clauses = [column, model.id]
+    if model.__table__.c[sort.field].nullable and not without_nulls:
+        # NULL dates last in both directions, portably (SQLite sorts them first)
+        clauses.insert(0, column.is_(None))
+    return clauses
+
+
+def filter_select(model, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+                  created: Optional[DateRange] = None, **filters):
+    """
+    ``SELECT`` of GET /tasks: equality filters (None values ignored), date
+    ranges and sort, answered by the indexes of models.py.
+    """
+    from sqlalchemy import select
+
+    ranged = {"due_date": due, "created_at": created}.get(sort.field) is not None
+    stmt = select(model).order_by(*order_clauses(model, sort, without_nulls=ranged))
+    for field, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(getattr(model, field) == value)
+    if due is not None:
+        stmt = stmt.where(range_clause(model.due_date, due))
+    if created is not None:
+        stmt = stmt.where(range_clause(model.created_at, created))
+    return stmt
@@ -0,0 +1,629 @@
+"""
+Task repositories - where the API stores its tasks.
+
+The endpoints in app.py only talk to a ``TaskRepository``. Two backends are
+available:
+
+- ``InMemoryTaskRepository``: the indexed dictionary of Atelier 1 & 2
+  (fast, but data is lost on restart and not shared between processes)
+- ``SQLTaskRepository``: the ``TaskModel`` table through ``SessionLocal``
+  (SQLite or PostgreSQL, Atelier 3)
+- ``AsyncSQLTaskRepository``: the same table through ``AsyncSessionLocal``
+  (asyncpg / aiosqlite) - what the API uses when a database is configured
+- ``CachedTaskRepository``: optional read-through cache in front of a
+  database backend (single tasks and filter results, see cache.py)
+
+``create_repository()`` picks the backend from the ``DATABASE_URL``
+environment variable: set it to use the database, leave it unset to keep the
+in-memory store. Running several workers (WEB_CONCURRENCY > 1) requires the
+database: each worker would otherwise hold its own, diverging tasks.
+
+The two SQL backends live in sql_repository.py and are imported from there
+on first use, so the in-memory backend starts without loading SQLAlchemy.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+import logging
+
+from .cache import InvalidationChannel, LRUCache, PostgresInvalidationChannel
+from .pagination import TaskOrder
+from .persistence import TaskJournal, journal_from_env
+from .query import DateRange, TaskSort, naive_utc
+from .schemas import Task, TaskChanges, TaskCreate, TaskStats
+from .store import ConcurrentTaskStore
+
+logger = logging.getLogger("taskflow")
+
+
+class TaskRepository(ABC):
+    """
+    Storage contract shared by every backend.
+
+    Filters (``status``, ``priority``, ``assignee``) are equality filters;
+    a None value means "don't filter on this field". ``filter`` also takes
+    date ranges on ``due_date`` / ``created_at`` and a sort (see query.py).
+    """
+
+    async def initialize(self) -> None:
+        """Prepare the backend (create tables, ...). Called on startup."""
+
+    async def close(self) -> None:
+        """Release connections. Called on shutdown."""
+
+    @abstractmethod
+    async def get(self, task_id: int) -> Optional[Task]:
+        """Return a task, or None if it does not exist."""
+
+    @abstractmethod
+    async def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+                     created: Optional[DateRange] = None, **filters) -> List[Task]:
+        """Return every task matching the filters and date ranges, ordered by ``sort``."""
+
+    @abstractmethod
+    async def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **filters) -> List[Task]:
+        """Return up to ``limit`` matching tasks whose sort key is after ``after``."""
+
+    @abstractmethod
+    async def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Task]]:
+        """
+        Up to ``limit`` (score, task) pairs whose title/description contain
+        every word of ``query``, best first (ties by ID), after the
+        (score, id) ``after`` - see search.py.
+        """
+
+    async def iterate(self, chunk_size: int = 500, **filters) -> AsyncIterator[List[Task]]:
+        """
+        Yield every matching task, ``chunk_size`` at a time, ordered by ID.
+
+        Default implementation: one keyset page per chunk, so only one chunk
+        is ever held in memory and writes between chunks are tolerated.
+        """
+        after = None
+        while True:
+            chunk = await self.page(TaskOrder.ID, after, chunk_size, **filters)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after = (chunk[-1].id,)
+
+    @abstractmethod
+    async def create(self, data: TaskCreate) -> Task:
+        """Store a new task and return it with its ID and timestamps."""
+
+    @abstractmethod
+    async def update(self, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        """Apply a partial update. Returns None if the task does not exist."""
+
+    @abstractmethod
+    async def delete(self, task_id: int) -> bool:
+        """Delete a task. Returns False if it did not exist."""
+
+    @abstractmethod
+    async def create_many(self, items: List[TaskCreate]) -> List[Task]:
+        """Store several tasks at once (all or nothing), in order."""
+
+    @abstractmethod
+    async def update_many(self, changes: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Task]]:
+        """
+        Apply several partial updates at once (task IDs must be distinct).
+
+        Returns, for each item, the updated task or None if it does not exist.
+        """
+
+    @abstractmethod
+    async def delete_many(self, task_ids: List[int]) -> List[bool]:
+        """Delete several tasks at once. Returns, for each ID, whether it existed."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of stored tasks."""
+
+    @abstractmethod
+    async def version(self) -> int:
+        """Store version: increases with every create, update and delete."""
+
+    @abstractmethod
+    async def stats(self, now: datetime) -> TaskStats:
+        """Counts per status, priority and assignee, and overdue tasks at ``now``."""
+
+    @abstractmethod
+    async def changes(self, since: int) -> TaskChanges:
+        """
+        Tasks created or updated after store version ``since`` and IDs of
+        the tasks deleted after it; ``reset`` (with every task) when those
+        deletions are no longer known.
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every task and restart IDs at 1 - useful for testing."""
+
+    def index_lookups(self) -> Dict[str, Tuple[int, int]]:
+        """
+        (hits, misses) of in-process index lookups per filter field.
+
+        Only the in-memory backend has such indexes; databases report nothing.
+        """
+        return {}
+
+    def cache_lookups(self) -> Dict[str, Tuple[int, int, int]]:
+        """(hits, misses, entries) of the read cache per kind ("task", "query"); empty without one."""
+        return {}
+
+
+# =============================================================================
+# IN-MEMORY BACKEND (Atelier 1 & 2)
+# =============================================================================
+
+def boot_version() -> int:
+    """
+    First store version of a process: microseconds since the epoch.
+
+    The in-memory store starts over on every restart; starting its version
+    from the clock keeps it above every version of the previous runs (unless
+    they averaged more than a million writes per second), and below 2**53
+    for JavaScript clients.
+    """
+    return time.time_ns() // 1000
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """
+    Tasks kept in an indexed ``ConcurrentTaskStore`` inside this process.
+
+    Safe to call from several threads: IDs come from an atomic allocator,
+    each write holds the stripe lock of its task, and version bumps are
+    serialized with their journal records.
+
+    With a ``TaskJournal`` (TASKFLOW_DATA_DIR) every change is also logged to
+    disk and the store is rebuilt from the log on startup - see persistence.py.
+    ``compact=True`` (TASKFLOW_COMPACT_STORE) stores slotted records instead
+    of pydantic models - see records.py.
+
+    Versions start at ``boot_version()``, so those of a previous run (held
+    by clients as ``since``, ETags or Last-Event-ID) are never reused.
+    """
+
+    def __init__(self, journal: Optional[TaskJournal] = None, compact: bool = False):
+        self.store = ConcurrentTaskStore(compact=compact)
+        self._version = boot_version()
+        # Older versions belong to another run: their clients must reload
+        self.store.clear(self._version)
+        self._version_lock = threading.Lock()
+        self.journal = journal
+        self._recovered = False
+
+    @property
+    def next_id(self) -> int:
+        return self.store.ids.peek()
+
+    @next_id.setter
+    def next_id(self, value: int) -> None:
+        self.store.ids.reset(value)
+
+    async def initialize(self) -> None:
+        if self.journal is None or self._recovered:
+            return
+        state = await asyncio.to_thread(self.journal.recover)
+        # Deletions are not journaled as tombstones: changes from before
+        # the recovered version are unknown (clients will reset). Logged
+        # versions go on where they stopped; an empty log keeps the boot base.
+        version = state.version or self._version
+        self.store.clear(version)
+        for task_id in sorted(state.tasks):
+            self.store.add(state.tasks[task_id], version)
+        self.next_id = state.next_id
+        self._version = version
+        self._recovered = True
+
+    async def close(self) -> None:
+        if self.journal is not None and self._recovered:
+            await self.journal.close(self._version, self.next_id, self.store.values())
+            self._recovered = False
+
+    async def get(self, task_id: int) -> Optional[Task]:
+        return self.store.get(task_id)
+
+    async def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+                     created: Optional[DateRange] = None, **filters) -> List[Task]:
+        return self.store.filter(sort, due, created, **filters)
+
+    async def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **filters) -> List[Task]:
+        return self.store.page(order, after, limit, **filters)
+
+    async def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Task]]:
+        return self.store.search(query, after, limit)
+
+    # Writes change the store synchronously (``_create``, ...) and only then
+    # wait for the journal, so batches are applied without interruption and
+    # share a single log commit
+
+    def _create(self, data: TaskCreate) -> Task:
+        now = datetime.utcnow()
+        task = Task(id=self.store.ids.allocate(), created_at=now, updated_at=now, **data.model_dump())
+        with self.store.stripe(task.id), self._change("put", task=task) as version:
+            self.store.add(task, version)
+        return task
+
+    def _update(self, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        # Read and replace under the task's stripe: a concurrent update of
+        # the same task cannot slip in between and be overwritten
+        with self.store.stripe(task_id):
+            existing = self.store.get(task_id)
+            if existing is None:
+                return None
+            updated = existing.model_copy(update={**changes, "updated_at": datetime.utcnow()})
+            with self._change("put", task=updated) as version:
+                self.store.replace(updated, version)
+            return updated
+
+    def _delete(self, task_id: int) -> bool:
+        with self.store.stripe(task_id):
+            if task_id not in self.store:
+                return False
+            with self._change("delete", task_id=task_id) as version:
+                self.store.remove(task_id, version)
+            return True
+
+    @contextmanager
+    def _change(self, op: str, **record) -> Iterator[int]:
+        """
+        Bump the version for one change, yield it to apply the change to the
+        store, then log the change under that version.
+
+        The version lock is held throughout: the store sees versions in
+        increasing order, and a reader of ``store.changes`` never sees a
+        version whose change is not in the store yet.
+        """
+        with self._version_lock:
+            if self.journal is not None:
+                self.journal.check()  # a failed log refuses the change before it is applied
+            self._version += 1
+            yield self._version
+            if self.journal is not None:
+                self.journal.append(self._version, op, **record)
+
+    async def _commit(self) -> None:
+        """Wait for the journal to persist the changes made so far."""
+        if self.journal is None:
+            return
+        if self.journal.snapshot_due():
+            with self.store.exclusive(), self._version_lock:
+                self.journal.start_snapshot(self._version, self.next_id, self.store.values())
+        await self.journal.commit()
+
+    async def create(self, data: TaskCreate) -> Task:
+        task = self._create(data)
+        await self._commit()
+        return task
+
+    async def update(self, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        task = self._update(task_id, changes)
+        await self._commit()
+        return task
+
+    async def delete(self, task_id: int) -> bool:
+        deleted = self._delete(task_id)
+        await self._commit()
+        return deleted
+
+    async def create_many(self, items: List[TaskCreate]) -> List[Task]:
+        tasks = [self._create(data) for data in items]
+        await self._commit()
+        return tasks
+
+    async def update_many(self, changes: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Task]]:
+        tasks = [self._update(task_id, fields) for task_id, fields in changes]
+        await self._commit()
+        return tasks
+
+    async def delete_many(self, task_ids: List[int]) -> List[bool]:
+        deleted = [self._delete(task_id) for task_id in task_ids]
+        await self._commit()
+        return deleted
+
+    async def count(self) -> int:
+        return len(self.store)
+
+    async def version(self) -> int:
+        return self._version
+
+    async def stats(self, now: datetime) -> TaskStats:
+        return self.store.stats(now)
+
+    async def changes(self, since: int) -> TaskChanges:
+        return self.store.changes(since)
+
+    async def clear(self) -> None:
+        # Never reuse a version: clients may still hold ETags for it
+        with self.store.exclusive(), self._change("clear") as version:
+            self.store.clear(version)
+            self.next_id = 1
+        await self._commit()
+
+    def index_lookups(self) -> Dict[str, Tuple[int, int]]:
+        return {field: (hits, self.store.index_misses[field])
+                for field, hits in self.store.index_hits.items()}
+
+
+# =============================================================================
+# READ-THROUGH CACHE
+# =============================================================================
+
+# Default lifetime of cached reads (TASKFLOW_READ_CACHE_TTL), in seconds
+READ_CACHE_TTL = 30.0
+
+# Filter results kept, and the largest result worth keeping (in tasks)
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_MAX_ROWS = 1000
+
+
+class CachedTaskRepository(TaskRepository):
+    """
+    In-process read-through cache in front of another repository (the SQL
+    backends): ``get`` and ``filter`` are answered from memory when they
+    can be, everything else goes to ``inner``.
+
+    Invalidation is exact:
+    - a write made through this repository evicts the tasks it changed and
+      the cached filter results that contained them or now match them;
+    - writes of other workers arrive on ``channel`` as task IDs: those
+      tasks are evicted, with every filter result (their new values are
+      unknown here);
+    - a read that started before an invalidation does not store its
+      possibly stale result.
+    Filter results also remember the store version they were read at and
+    are only served while the store is still at that version, so a list
+    is never older than the version (ETag) sent with it, channel or not.
+    Entries expire after ``ttl`` seconds, which bounds the staleness of
+    ``get`` when there is no channel (several workers, scripts writing to
+    the database).
+    """
+
+    def __init__(self, inner: TaskRepository, maxsize: int = 10_000, ttl: float = READ_CACHE_TTL,
+                 channel: Optional[InvalidationChannel] = None, query_maxsize: int = QUERY_CACHE_SIZE):
+        self.inner = inner
+        self.tasks = LRUCache(maxsize, ttl)
+        self.queries = LRUCache(query_maxsize, ttl)  # key -> (store version, task IDs, tasks)
+        self.channel = channel
+        self.origin = uuid4().hex
+        # Bumped by every invalidation: a read only stores its result if
+        # none happened while it was running
+        self._generation = 0
+        if channel is not None:
+            channel.subscribe(self._on_invalidation)
+
+    async def initialize(self) -> None:
+        await self.inner.initialize()
+        if self.channel is not None:
+            await self.channel.start()
+
+    async def close(self) -> None:
+        if self.channel is not None:
+            await self.channel.close()
+        await self.inner.close()
+
+    async def get(self, task_id: int) -> Optional[Task]:
+        task = self.tasks.get(task_id)
+        if task is not None:
+            return task
+        generation = self._generation
+        task = await self.inner.get(task_id)
+        if task is not None and generation == self._generation:
+            self.tasks.put(task_id, task)
+        return task
+
+    async def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+                     created: Optional[DateRange] = None, **filters) -> List[Task]:
+        key = (sort, due, created, tuple(sorted((f, v) for f, v in filters.items() if v is not None)))
+        # Read before the tasks: a write in between leaves an entry that is
+        # never served rather than a stale one
+        version = await self.inner.version()
+        entry = self.queries.get(key)
+        if entry is not None:
+            if entry[0] == version:
+                return list(entry[2])
+            # Read at an older version: counted as the miss it is
+            self.queries.hits -= 1
+            self.queries.misses += 1
+        tasks = await self.inner.filter(sort, due, created, **filters)
+        if len(tasks) <= QUERY_CACHE_MAX_ROWS:
+            self.queries.put(key, (version, frozenset(task.id for task in tasks), tuple(tasks)))
+        return tasks
+
+    def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **filters):
+        return self.inner.page(order, after, limit, **filters)
+
+    def search(self, query: str, after: Optional[Tuple[float, int]], limit: int):
+        return self.inner.search(query, after, limit)
+
+    def iterate(self, chunk_size: int = 500, **filters) -> AsyncIterator[List[Task]]:
+        return self.inner.iterate(chunk_size, **filters)
+
+    async def create(self, data: TaskCreate) -> Task:
+        task = await self.inner.create(data)
+        await self._changed([task])
+        return task
+
+    async def update(self, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        task = await self.inner.update(task_id, changes)
+        if task is not None:
+            await self._changed([task])
+        return task
+
+    async def delete(self, task_id: int) -> bool:
+        deleted = await self.inner.delete(task_id)
+        if deleted:
+            await self._changed([], [task_id])
+        return deleted
+
+    async def create_many(self, items: List[TaskCreate]) -> List[Task]:
+        tasks = await self.inner.create_many(items)
+        await self._changed(tasks)
+        return tasks
+
+    async def update_many(self, changes: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Task]]:
+        tasks = await self.inner.update_many(changes)
+        await self._changed([task for task in tasks if task is not None])
+        return tasks
+
+    async def delete_many(self, task_ids: List[int]) -> List[bool]:
+        results = await self.inner.delete_many(task_ids)
+        await self._changed([], [task_id for task_id, deleted in zip(task_ids, results) if deleted])
+        return results
+
+    def count(self):
+        return self.inner.count()
+
+    def version(self):
+        return self.inner.version()
+
+    def stats(self, now: datetime):
+        return self.inner.stats(now)
+
+    def changes(self, since: int):
+        return self.inner.changes(since)
+
+    async def clear(self) -> None:
+        await self.inner.clear()
+        self._invalidate_all()
+        if self.channel is not None:
+            await self.channel.publish(self.origin, None)
+
+    def index_lookups(self) -> Dict[str, Tuple[int, int]]:
+        return self.inner.index_lookups()
+
+    def cache_lookups(self) -> Dict[str, Tuple[int, int, int]]:
+        return {
+            "task": (self.tasks.hits, self.tasks.misses, len(self.tasks)),
+            "query": (self.queries.hits, self.queries.misses, len(self.queries)),
+        }
+
+    async def _changed(self, tasks: List[Task], deleted: List[int] = ()) -> None:
+        """Evict what a local write changed, then tell the other workers."""
+        task_ids = {task.id for task in tasks}.union(deleted)
+        if not task_ids:
+            return
+        self._generation += 1
+        for task_id in task_ids:
+            self.tasks.pop(task_id)
+        self.queries.discard_where(lambda key, entry: not task_ids.isdisjoint(entry[1])
+                                   or any(_query_matches(key, task) for task in tasks))
+        if self.channel is not None:
+            await self.channel.publish(self.origin, sorted(task_ids))
+
+    def _on_invalidation(self, origin: str, task_ids: Optional[List[int]]) -> None:
+        if origin == self.origin:
+            return  # our own write, already evicted
+        if task_ids is None:
+            self._invalidate_all()
+            return
+        self._generation += 1
+        for task_id in task_ids:
+            self.tasks.pop(task_id)
+        self.queries.clear()
+
+    def _invalidate_all(self) -> None:
+        self._generation += 1
+        self.tasks.clear()
+        self.queries.clear()
+
+
+def _query_matches(key: Tuple, task: Task) -> bool:
+    """Whether ``task`` belongs to the result of a cached filter query."""
+    _, due, created, criteria = key
+    return (all(getattr(task, field) == value for field, value in criteria)
+            and _in_range(task.due_date, due) and _in_range(task.created_at, created))
+
+
+def _in_range(value: Optional[datetime], date_range: Optional[DateRange]) -> bool:
+    if date_range is None:
+        return True
+    value = naive_utc(value)
+    return (value is not None
+            and (date_range.since is None or value >= date_range.since)
+            and (date_range.before is None or value < date_range.before))
+
+
+# =============================================================================
+# BACKEND SELECTION
+# =============================================================================
+
+def create_repository() -> TaskRepository:
+    """
+    Build the repository selected by configuration.
+
+    - DATABASE_URL set   -> AsyncSQLTaskRepository (SQLite or PostgreSQL),
+      behind a CachedTaskRepository when TASKFLOW_READ_CACHE_SIZE > 0
+    - DATABASE_URL unset -> InMemoryTaskRepository, single worker only
+      (logged to disk when TASKFLOW_DATA_DIR is set, slotted records when
+      TASKFLOW_COMPACT_STORE is true)
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if os.getenv("DATABASE_URL"):
+        logger.info("Using SQL storage (DATABASE_URL is set)")
+        from .sql_repository import AsyncSQLTaskRepository
+
+        # Engines are built by the first query (initialize at startup)
+        return _with_read_cache(AsyncSQLTaskRepository(), workers)
+    if workers > 1:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers} needs shared storage: set DATABASE_URL "
+            "(the in-memory store is private to each worker process)"
+        )
+    journal = journal_from_env()
+    compact = os.getenv("TASKFLOW_COMPACT_STORE", "false").lower() in ("1", "true", "yes")
+    if journal is not None:
+        logger.info(f"Using in-memory storage persisted to {journal.directory}")
+    else:
+        logger.info("Using in-memory storage (no DATABASE_URL)")
+    return InMemoryTaskRepository(journal, compact=compact)
+
+
+def _with_read_cache(repository: TaskRepository, workers: int) -> TaskRepository:
+    """
+    Wrap ``repository`` in a CachedTaskRepository when TASKFLOW_READ_CACHE_SIZE
+    is set; TASKFLOW_CACHE_CHANNEL=postgres shares invalidations between workers.
+    """
+    size = int(os.getenv("TASKFLOW_READ_CACHE_SIZE", "0"))
+    if size <= 0:
+        return repository
+    ttl = float(os.getenv("TASKFLOW_READ_CACHE_TTL", str(READ_CACHE_TTL)))
+    channel = None
+    if os.getenv("TASKFLOW_CACHE_CHANNEL", "").lower() == "postgres":
+        from sqlalchemy.engine import make_url
+
+        from .database import DATABASE_URL
+
+        url = make_url(DATABASE_URL)
+        if url.get_backend_name() != "postgresql":
+            raise RuntimeError("TASKFLOW_CACHE_CHANNEL=postgres needs a PostgreSQL DATABASE_URL")
+        channel = PostgresInvalidationChannel(url.set(drivername="postgresql").render_as_string(hide_password=False))
+    elif workers > 1:
+        logger.warning(
+            f"Read cache without TASKFLOW_CACHE_CHANNEL: workers may serve writes of "
+            f"the others up to {ttl:g} s late"
+        )
+    logger.info(f"Caching up to {size} tasks for {ttl:g} s")
+    return CachedTaskRepository(repository, maxsize=size, ttl=ttl, channel=channel)
+
+
+# Names of sql_repository.py, importable from here as before
+SQL_NAMES = ("SQLTaskRepository", "AsyncSQLTaskRepository", "STATS_TTL")
+
+
+def __getattr__(name: str) -> Any:
+    if name in SQL_NAMES:
+        from . import sql_repository
+
+        return getattr(sql_repository, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
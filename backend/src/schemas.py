@@ -0,0 +1,127 @@
+"""
+API schemas for TaskFlow.
+
+Pydantic models shared by the endpoints (app.py) and the storage backends
+(repository.py). The SQLAlchemy models reuse the same enums.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from .query import naive_utc
+
+
+class TaskStatus(str, Enum):
+    """Task status enum (also used by the SQLAlchemy model)."""
+    TODO = "todo"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+
+
+class TaskPriority(str, Enum):
+    """Task priority enum (also used by the SQLAlchemy model)."""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+class TaskCreate(BaseModel):
+    """Model for creating a new task."""
+    title: str = Field(..., min_length=1, max_length=200, description="Task title")
+    description: Optional[str] = Field(None, max_length=1000, description="Task description")
+    status: TaskStatus = Field(default=TaskStatus.TODO, description="Task status")
+    priority: TaskPriority = Field(default=TaskPriority.MEDIUM, description="Task priority")
+    assignee: Optional[str] = Field(None, max_length=100, description="Assigned user")
+    due_date: Optional[datetime] = Field(None, description="Due date")
+
+    # Stored as naive UTC by every backend, so that date filters and the
+    # overdue count compare the same instants in memory and in SQL
+    _due_date_utc = field_validator("due_date")(naive_utc)
+
+
+class TaskUpdate(BaseModel):
+    """Model for updating a task - all fields optional for partial updates."""
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = Field(None, max_length=1000)
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    assignee: Optional[str] = Field(None, max_length=100)
+    due_date: Optional[datetime] = None
+
+    _due_date_utc = field_validator("due_date")(naive_utc)
+
+
+class Task(TaskCreate):
+    """Model for a task with ID and timestamps."""
+    id: int  # Integer ID instead of UUID string - simpler!
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskPage(BaseModel):
+    """One page of tasks plus the cursor to fetch the next one."""
+    items: List[Task]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page (null on the last page)")
+
+
+class TaskBatchUpdate(TaskUpdate):
+    """One item of PATCH /tasks/batch: the task ID plus the fields to change."""
+    id: int
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item of a batch request (in the same order as the request)."""
+    index: int
+    status: int = Field(..., description="HTTP status the single-item endpoint would have returned")
+    id: Optional[int] = None
+    task: Optional[Task] = None
+    error: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Per-item results of a batch request."""
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class ImportLineError(BaseModel):
+    """A line of an NDJSON import that could not be stored."""
+    line: int
+    error: Any
+
+
+class ImportReport(BaseModel):
+    """Outcome of POST /tasks/import."""
+    lines: int = Field(..., description="Non-empty lines read")
+    imported: int
+    failed: int
+    chunks: int = Field(..., description="Number of chunks committed")
+    errors: List[ImportLineError] = Field(..., description="Per-line errors (the first ones only)")
+    errors_truncated: bool = False
+
+
+class TaskStats(BaseModel):
+    """Task counts for dashboards (GET /tasks/stats)."""
+    total: int
+    by_status: Dict[TaskStatus, int] = Field(..., description="Every status, 0 included")
+    by_priority: Dict[TaskPriority, int] = Field(..., description="Every priority, 0 included")
+    by_assignee: Dict[str, int] = Field(..., description="Assignees with at least one task")
+    unassigned: int
+    overdue: int = Field(..., description="Tasks not done whose due date is past")
+
+
+class TaskChanges(BaseModel):
+    """Tasks changed since a store version (GET /tasks/changes)."""
+    version: int = Field(..., description="Store version of this answer: pass it as ?since= next time")
+    reset: bool = Field(..., description="since is too old: drop the local copy, changed holds every task")
+    changed: List[Task] = Field(..., description="Tasks created or updated since, oldest change first")
+    deleted: List[int] = Field(..., description="IDs of the tasks deleted since")
+
+
+def validation_errors(exc: ValidationError) -> List[dict]:
+    """Pydantic errors reduced to JSON-friendly fields (for per-item reports)."""
+    return [{"loc": list(e["loc"]), "msg": e["msg"], "type": e["type"]} for e in exc.errors()]
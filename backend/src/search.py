@@ -0,0 +1,207 @@
+"""
+Full-text search over task titles and descriptions (GET /tasks/search).
+
+In memory, ``SearchIndex`` is an inverted index (word -> task IDs) kept up
+to date by the ``TaskStore`` on every add, replace and remove. A query only
+touches the tasks containing its rarest word, never the whole store.
+
+With a database the same search runs on the engine's own full-text index,
+created by ``install_sql_search``:
+- SQLite: an FTS5 table kept in sync with ``tasks`` by triggers;
+- PostgreSQL: a GIN index on the ``tsvector`` of title + description
+  (``simple`` configuration: no stemming, accents are significant).
+
+Every word of the query must appear in the task (AND). Results are ranked
+by relevance, best first, with title matches weighing twice as much as
+description matches; ties are broken by ID.
+"""
+
+import math
+import re
+import unicodedata
+from heapq import nsmallest
+from typing import Dict, List, Optional, Set, Tuple
+
+# Letters and digits; "_" and punctuation separate words (like SQLite unicode61)
+WORD = re.compile(r"[^\W_]+")
+
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+
+def tokenize(value: Optional[str], fold_accents: bool = True) -> List[str]:
+    """Lowercase words of ``value``, accents removed ("Réunion" -> "reunion")."""
+    if not value:
+        return []
+    value = value.lower()
+    if fold_accents:
+        decomposed = unicodedata.normalize("NFKD", value)
+        value = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return WORD.findall(value)
+
+
+def word_weights(title: Optional[str], description: Optional[str]) -> Dict[str, int]:
+    """Weight of each word of a task: TITLE_WEIGHT per title occurrence, DESCRIPTION_WEIGHT per description one."""
+    weights: Dict[str, int] = {}
+    for word in tokenize(title):
+        weights[word] = weights.get(word, 0) + TITLE_WEIGHT
+    for word in tokenize(description):
+        weights[word] = weights.get(word, 0) + DESCRIPTION_WEIGHT
+    return weights
+
+
+class SearchIndex:
+    """
+    Inverted index: word -> {task ID: weight of the word in that task}.
+
+    Only the postings are kept: removing a task takes its old title and
+    description and tokenizes them again, which is cheaper than keeping
+    the words of every task in memory.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, task_id: int, title: Optional[str], description: Optional[str]) -> None:
+        for word, weight in word_weights(title, description).items():
+            self._postings.setdefault(word, {})[task_id] = weight
+        self._count += 1
+
+    def remove(self, task_id: int, title: Optional[str], description: Optional[str]) -> None:
+        """Unindex a task, given the title and description it was added with."""
+        for word in word_weights(title, description):
+            posting = self._postings[word]
+            del posting[task_id]
+            if not posting:
+                del self._postings[word]
+        self._count -= 1
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._count = 0
+
+    def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, int]]:
+        """
+        Best ``limit`` (score, task ID) pairs ranked after ``after``.
+
+        Scores are TF-IDF: the weight of each query word in the task times
+        log(1 + N / number of tasks containing the word).
+        """
+        words = set(tokenize(query))
+        postings = [self._postings.get(word) for word in words]
+        if not postings or not all(postings):
+            return []
+        postings.sort(key=len)
+
+        total = self._count
+        idfs = [math.log(1 + total / len(posting)) for posting in postings]
+        candidates: Set[int] = set(postings[0]).intersection(*postings[1:])
+
+        ranked = ((-sum(p[task_id] * idf for p, idf in zip(postings, idfs)), task_id)
+                  for task_id in candidates)
+        if after is not None:
+            bound = (-after[0], after[1])
+            ranked = (key for key in ranked if key > bound)
+        return [(-negative_score, task_id) for negative_score, task_id in nsmallest(limit, ranked)]
+
+
+# =============================================================================
+# SQL FULL-TEXT SEARCH (Atelier 3)
+# =============================================================================
+
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+# Same weighting as SearchIndex: title 'A', description 'B'
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN (({POSTGRES_DOCUMENT}))",
+]
+
+
+def install_sql_search(connection) -> None:
+    """Create the full-text index of the tasks table (idempotent)."""
+    from sqlalchemy import text  # SQL backends only
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        # Index the tasks written before search existed; a tasks_fts left by
+        # a dropped tasks table is rebuilt too (its rows are stale)
+        connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+def drop_sql_search(connection) -> None:
+    """Drop what ``install_sql_search`` created outside the models (SQLite's FTS table)."""
+    from sqlalchemy import text
+
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS tasks_fts"))
+
+
+def sql_search(connection, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, int]]:
+    """Same contract as ``SearchIndex.search``, answered by the database."""
+    from sqlalchemy import text
+
+    words = tokenize(query)
+    if not words:
+        return []
+    params = {"limit": limit}
+    if after is not None:
+        params["after_score"], params["after_id"] = after
+        seek = "WHERE score < :after_score OR (score = :after_score AND id > :after_id)"
+    else:
+        seek = ""
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        # Quoted words: the client's text is never parsed as FTS5 syntax.
+        # bm25() is lower-is-better, so it is negated.
+        params["match"] = " ".join(f'"{word}"' for word in words)
+        ranked = (
+            f"SELECT rowid AS id, -bm25(tasks_fts, {TITLE_WEIGHT}.0, {DESCRIPTION_WEIGHT}.0) AS score "
+            "FROM tasks_fts WHERE tasks_fts MATCH :match"
+        )
+    elif dialect == "postgresql":
+        # The 'simple' configuration keeps accents, so the query keeps them too
+        params["match"] = " & ".join(tokenize(query, fold_accents=False))
+        ranked = (
+            f"SELECT id, CAST(ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', :match)) AS DOUBLE PRECISION) AS score "
+            f"FROM tasks WHERE {POSTGRES_DOCUMENT} @@ to_tsquery('simple', :match)"
+        )
+    else:
+        raise NotImplementedError(f"Full-text search is not available on {dialect}")
+
+    rows = connection.execute(
+        text(f"SELECT id, score FROM ({ranked}) AS ranked {seek} ORDER BY score DESC, id LIMIT :limit"),
+        params,
+    )
+    return [(row.score, row.id) for row in rows]
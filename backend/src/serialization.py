@@ -0,0 +1,74 @@
+"""
+Pre-serialized JSON for Task objects.
+
+Encoding every task of a large list on every request is the dominant CPU
+cost of GET /tasks. ``TaskJSONCache`` keeps the JSON bytes of recently
+served tasks, and list endpoints answer by concatenating those bytes in a
+``RawJSONResponse``, skipping response_model validation and re-encoding.
+
+Entries are keyed by task ID and checked against ``updated_at``, so a task
+modified elsewhere (another worker, a batch) is never served stale; the
+write endpoints also invalidate entries explicitly to free memory early.
+"""
+
+import json
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from fastapi import Response
+
+
+class RawJSONResponse(Response):
+    """Response whose body is already-encoded JSON bytes."""
+    media_type = "application/json"
+
+
+class TaskJSONCache:
+    """LRU cache of task ID -> (updated_at, JSON bytes), bounded to ``maxsize`` tasks."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def dumps(self, task) -> bytes:
+        """Return the JSON encoding of ``task``, from the cache when still valid."""
+        entry = self._entries.get(task.id)
+        if entry is not None and entry[0] == task.updated_at:
+            self._entries.move_to_end(task.id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        data = task.model_dump_json().encode()
+        if self.maxsize > 0:
+            self._entries[task.id] = (task.updated_at, data)
+            self._entries.move_to_end(task.id)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)  # least recently used
+        return data
+
+    def dumps_list(self, tasks: Iterable) -> bytes:
+        """JSON array of tasks, built from cached bytes."""
+        return b"[" + b",".join(self.dumps(task) for task in tasks) + b"]"
+
+    def invalidate(self, task_id: int) -> None:
+        self._entries.pop(task_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def page_body(items: bytes, next_cursor: Optional[str]) -> bytes:
+    """JSON of a TaskPage from an already-encoded items array."""
+    return b'{"items":' + items + b',"next_cursor":' + json.dumps(next_cursor).encode() + b"}"
+
+
+def changes_body(version: int, reset: bool, changed: bytes, deleted: List[int]) -> bytes:
+    """JSON of a TaskChanges from an already-encoded ``changed`` array."""
+    return (b'{"version":%d,"reset":%s,"changed":' % (version, b"true" if reset else b"false")
+            + changed + b',"deleted":' + json.dumps(deleted).encode() + b"}")
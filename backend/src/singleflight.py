@@ -0,0 +1,120 @@
+"""
+Request coalescing ("single flight") for GET /tasks.
+
+When many clients poll the same list at once, every request would scan the
+store (or query the database) and serialize the same JSON. ``SingleFlight``
+runs the computation once per distinct query: concurrent identical requests
+await the same in-flight result, and later ones reuse it for as long as the
+store version has not changed.
+
+Finished bodies are kept within a total size (``max_bytes``, the oldest are
+dropped first); a body larger than that is only shared with the requests
+already waiting for it.
+
+Keys pair the store version with the normalized query, so a write never
+serves an old body: the next request reads the new version, misses, and
+the results of older versions are dropped.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Sized, TypeVar
+
+T = TypeVar("T", bound=Sized)
+
+# Distinct queries kept for the current store version
+DEFAULT_MAX_QUERIES = 128
+
+# Total size of the finished bodies kept for the current store version
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+class SingleFlight:
+    """Share one computation between identical calls made at the same store version."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_QUERIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._version = None
+        self._flights: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+        # len() of the finished results kept, and their total
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        # Calls that ran the computation / reused another call's result
+        self.executed = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, version: int, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """
+        Result of ``compute()`` for ``key`` at store ``version``: computed by
+        this call, or shared with an identical one (in flight or done).
+        """
+        if version != self._version:
+            # The store changed: results of other versions are stale
+            self.clear()
+            self._version = version
+
+        flight = self._flights.get(key)
+        while flight is not None:
+            self._flights.move_to_end(key)
+            self.shared += 1
+            if not flight.done():
+                # wait() leaves the flight alone if this caller is cancelled
+                # (client gone): the others still get its result
+                await asyncio.wait((flight,))
+            if not flight.cancelled():
+                return flight.result()
+            # The caller computing it gave up: the next one in line takes over
+            self.shared -= 1
+            flight = self._flights.get(key)
+
+        # Computed inline, not in a task of its own: an uncontended request
+        # costs no extra scheduling round
+        self.executed += 1
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            result = await compute()
+        except BaseException as exc:
+            # Failures are shared with the waiting calls, not with later ones
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if isinstance(exc, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(exc)
+                flight.exception()  # retrieved, even if nobody was waiting
+            raise
+        flight.set_result(result)
+        if self._flights.get(key) is flight:
+            self._keep(key, len(result))
+        return result
+
+    def clear(self) -> None:
+        self._version = None
+        self._flights.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def _keep(self, key: Hashable, size: int) -> None:
+        """Account for a finished result, dropping the oldest ones over the limits."""
+        if size > self.max_bytes:
+            # Never kept: the waiting calls already have it
+            del self._flights[key]
+            return
+        self._sizes[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes or len(self._flights) > self.maxsize:
+            if not self._drop_oldest_done():
+                break
+
+    def _drop_oldest_done(self) -> bool:
+        for key, flight in self._flights.items():
+            if flight.done():
+                del self._flights[key]
+                self.bytes -= self._sizes.pop(key, 0)
+                return True
+        return False
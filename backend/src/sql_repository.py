@@ -0,0 +1,425 @@
+"""
+SQLAlchemy task repositories (Atelier 3) - see repository.py for the contract.
+
+- ``SQLTaskRepository``: the ``TaskModel`` table through ``SessionLocal``
+  (SQLite or PostgreSQL), in Starlette's threadpool
+- ``AsyncSQLTaskRepository``: the same table through ``AsyncSessionLocal``
+  (asyncpg / aiosqlite) - what the API uses when a database is configured
+
+Kept apart from repository.py so that the in-memory backend never imports
+SQLAlchemy: ``create_repository()`` only loads this module when
+DATABASE_URL is set.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, case, delete, func, insert, select, text, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import database
+from .models import StoreMetaModel, TaskModel, TaskTombstoneModel
+from .pagination import TaskOrder, keyset_select
+from .migrations import STORE_META_ID, migrate
+from .query import DateRange, TaskSort, filter_select
+from .repository import TaskRepository
+from .schemas import Task, TaskChanges, TaskCreate, TaskPriority, TaskStats, TaskStatus
+from .search import sql_search
+from .store import DEFAULT_MAX_TOMBSTONES
+
+logger = logging.getLogger("taskflow")
+
+# Seconds a GET /tasks/stats result is reused while no task changes
+STATS_TTL = 2.0
+
+
+class SQLTaskRepository(TaskRepository):
+    """
+    Tasks stored in the ``tasks`` table (SQLite or PostgreSQL).
+
+    Each operation is written once as a plain function of a synchronous
+    ``Session`` (the ``_get``, ``_create``, ... methods below) and executed
+    by ``_run`` (writes) or ``_read`` (reads, on ``read_session_factory``
+    when given: the SQLite reader connections of database.py). This class
+    uses ``SessionLocal`` in Starlette's threadpool; ``AsyncSQLTaskRepository``
+    runs the very same functions on the asyncio engine.
+    """
+
+    # Session factories of database.py used when none is given
+    DEFAULT_FACTORIES = ("SessionLocal", "ReadSessionLocal")
+
+    def __init__(self, session_factory=None, stats_ttl: float = STATS_TTL, read_session_factory=None):
+        # None: the factories of DATABASE_URL, whose engines are only built
+        # (and their driver imported) on the first query
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory
+        self.stats_ttl = stats_ttl
+        self._stats_cache: Optional[Tuple[int, datetime, TaskStats]] = None
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            self._session_factory, self._read_session_factory = (
+                getattr(database, name) for name in self.DEFAULT_FACTORIES
+            )
+        return self._session_factory
+
+    @property
+    def read_session_factory(self):
+        writer = self.session_factory
+        return self._read_session_factory or writer
+
+    async def _run(self, operation, *args):
+        """Run ``operation(db, *args)`` in its own session and transaction."""
+        return await self._call(self.session_factory, operation, *args)
+
+    async def _read(self, operation, *args):
+        """Same as ``_run`` for an operation that does not write."""
+        return await self._call(self.read_session_factory, operation, *args)
+
+    async def _call(self, session_factory, operation, *args):
+        def call():
+            with session_factory() as db:
+                return operation(db, *args)
+        return await run_in_threadpool(call)
+
+    async def initialize(self) -> None:
+        # Workers started together race to create the tables; the loser gets
+        # a "table already exists" error and simply tries again (create_all
+        # skips tables that exist by then)
+        for attempt in range(INITIALIZE_ATTEMPTS):
+            try:
+                await self._run(self._initialize)
+                return
+            except DBAPIError:
+                if attempt == INITIALIZE_ATTEMPTS - 1:
+                    raise
+                logger.warning("Database initialization failed, retrying...")
+                await asyncio.sleep(0.1 * (attempt + 1))
+
+    async def get(self, task_id: int) -> Optional[Task]:
+        return await self._read(self._get, task_id)
+
+    async def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+                     created: Optional[DateRange] = None, **filters) -> List[Task]:
+        return await self._read(self._filter, filters, sort, due, created)
+
+    async def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **filters) -> List[Task]:
+        return await self._read(self._page, order, after, limit, filters)
+
+    async def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Task]]:
+        return await self._read(self._search, query, after, limit)
+
+    async def create(self, data: TaskCreate) -> Task:
+        return await self._run(self._create, data)
+
+    async def update(self, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        return await self._run(self._update, task_id, changes)
+
+    async def delete(self, task_id: int) -> bool:
+        return await self._run(self._delete, task_id)
+
+    async def create_many(self, items: List[TaskCreate]) -> List[Task]:
+        return await self._run(self._create_many, items)
+
+    async def update_many(self, changes: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Task]]:
+        return await self._run(self._update_many, changes)
+
+    async def delete_many(self, task_ids: List[int]) -> List[bool]:
+        return await self._run(self._delete_many, task_ids)
+
+    async def count(self) -> int:
+        return await self._read(self._count)
+
+    async def version(self) -> int:
+        return await self._read(self._version)
+
+    async def changes(self, since: int) -> TaskChanges:
+        return await self._read(self._changes, since)
+
+    async def stats(self, now: datetime) -> TaskStats:
+        """
+        One GROUP BY over the table, cached for ``stats_ttl`` seconds.
+
+        The cache is also dropped as soon as the store version changes, so
+        only the overdue count (which moves with the clock) can lag.
+        """
+        version = await self.version()
+        cached = self._stats_cache
+        if cached is not None and cached[0] == version and 0 <= (now - cached[1]).total_seconds() < self.stats_ttl:
+            return cached[2]
+        stats = await self._read(self._stats, now)
+        self._stats_cache = (version, now, stats)
+        return stats
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    # -------------------------------------------------------------------------
+    # Operations on a synchronous Session
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _initialize(db: Session) -> None:
+        # Tables, then the columns and indexes added since (migrations.py)
+        migrate(db.connection())
+        if db.get(StoreMetaModel, STORE_META_ID) is None:
+            db.add(StoreMetaModel(id=STORE_META_ID, version=0))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker seeded the row at the same time
+            db.rollback()
+
+    @staticmethod
+    def _get(db: Session, task_id: int) -> Optional[Task]:
+        row = db.get(TaskModel, task_id)
+        return _to_task(row) if row is not None else None
+
+    @staticmethod
+    def _filter(db: Session, filters: Dict[str, Any], sort: TaskSort = TaskSort.ID,
+                due: Optional[DateRange] = None, created: Optional[DateRange] = None) -> List[Task]:
+        stmt = filter_select(TaskModel, sort, due, created, **filters)
+        return [_to_task(row) for row in db.scalars(stmt)]
+
+    @staticmethod
+    def _page(db: Session, order: TaskOrder, after: Optional[Tuple], limit: int, filters: Dict[str, Any]) -> List[Task]:
+        stmt = keyset_select(TaskModel, order, after, limit, **filters)
+        return [_to_task(row) for row in db.scalars(stmt)]
+
+    @staticmethod
+    def _search(db: Session, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Task]]:
+        hits = sql_search(db.connection(), query, after, limit)
+        rows = {row.id: row for row in db.scalars(
+            select(TaskModel).where(TaskModel.id.in_([task_id for _, task_id in hits]))
+        )}
+        # A hit without its row: the index lags the table, never fail the search
+        return [(score, _to_task(rows[task_id])) for score, task_id in hits if task_id in rows]
+
+    @staticmethod
+    def _create(db: Session, data: TaskCreate) -> Task:
+        now = datetime.utcnow()
+        row = TaskModel(created_at=now, updated_at=now, version=_bump_version(db), **data.model_dump())
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        return _to_task(row)
+
+    @staticmethod
+    def _update(db: Session, task_id: int, changes: Dict[str, Any]) -> Optional[Task]:
+        row = db.get(TaskModel, task_id)
+        if row is None:
+            return None
+        version = _bump_version(db)
+        for field, value in changes.items():
+            setattr(row, field, value)
+        row.updated_at = datetime.utcnow()
+        row.version = version
+        db.commit()
+        db.refresh(row)
+        return _to_task(row)
+
+    @staticmethod
+    def _delete(db: Session, task_id: int) -> bool:
+        result = db.execute(delete(TaskModel).where(TaskModel.id == task_id))
+        if result.rowcount == 0:
+            return False
+        _add_tombstones(db, [task_id], _bump_version(db))
+        db.commit()
+        return True
+
+    @staticmethod
+    def _create_many(db: Session, items: List[TaskCreate]) -> List[Task]:
+        if not items:
+            return []
+        now = datetime.utcnow()
+        version = _bump_version(db)
+        rows = [{**data.model_dump(), "created_at": now, "updated_at": now, "version": version} for data in items]
+        # One multi-row INSERT ... RETURNING instead of one flush per task
+        stmt = insert(TaskModel).returning(TaskModel, sort_by_parameter_order=True)
+        tasks = [_to_task(row) for row in db.scalars(stmt, rows)]
+        db.commit()
+        return tasks
+
+    @staticmethod
+    def _update_many(db: Session, changes: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Task]]:
+        task_ids = [task_id for task_id, _ in changes]
+        existing = set(db.scalars(select(TaskModel.id).where(TaskModel.id.in_(task_ids))))
+        if existing:
+            now = datetime.utcnow()
+            version = _bump_version(db)
+            params = [
+                {**fields, "id": task_id, "updated_at": now, "version": version}
+                for task_id, fields in changes if task_id in existing
+            ]
+            # ORM bulk UPDATE by primary key: executemany, grouped by changed columns
+            db.execute(update(TaskModel), params)
+        rows = db.scalars(
+            select(TaskModel)
+            .where(TaskModel.id.in_(existing))
+            .execution_options(populate_existing=True)
+        )
+        updated = {row.id: _to_task(row) for row in rows}
+        db.commit()
+        return [updated.get(task_id) for task_id in task_ids]
+
+    @staticmethod
+    def _delete_many(db: Session, task_ids: List[int]) -> List[bool]:
+        existing = set(db.scalars(select(TaskModel.id).where(TaskModel.id.in_(task_ids))))
+        if existing:
+            db.execute(delete(TaskModel).where(TaskModel.id.in_(existing)))
+            _add_tombstones(db, sorted(existing), _bump_version(db))
+        db.commit()
+        return [task_id in existing for task_id in task_ids]
+
+    @staticmethod
+    def _count(db: Session) -> int:
+        return db.scalar(select(func.count()).select_from(TaskModel))
+
+    @staticmethod
+    def _version(db: Session) -> int:
+        return db.scalar(select(StoreMetaModel.version).where(StoreMetaModel.id == STORE_META_ID))
+
+    @staticmethod
+    def _stats(db: Session, now: datetime) -> TaskStats:
+        overdue = case(
+            (and_(TaskModel.due_date < now, TaskModel.status != TaskStatus.DONE), 1),
+            else_=0,
+        )
+        rows = db.execute(
+            select(TaskModel.status, TaskModel.priority, TaskModel.assignee,
+                   func.count(), func.sum(overdue))
+            .group_by(TaskModel.status, TaskModel.priority, TaskModel.assignee)
+        )
+        stats = TaskStats(
+            total=0,
+            by_status={status: 0 for status in TaskStatus},
+            by_priority={priority: 0 for priority in TaskPriority},
+            by_assignee={},
+            unassigned=0,
+            overdue=0,
+        )
+        for status, priority, assignee, count, overdue_count in rows:
+            stats.total += count
+            stats.by_status[status] += count
+            stats.by_priority[priority] += count
+            if assignee is None:
+                stats.unassigned += count
+            else:
+                stats.by_assignee[assignee] = stats.by_assignee.get(assignee, 0) + count
+            stats.overdue += overdue_count
+        return stats
+
+    @staticmethod
+    def _changes(db: Session, since: int) -> TaskChanges:
+        meta = db.get(StoreMetaModel, STORE_META_ID)
+        if since < meta.tombstone_floor or since > meta.version:
+            rows = db.scalars(select(TaskModel).order_by(TaskModel.id))
+            return TaskChanges(version=meta.version, reset=True, changed=[_to_task(row) for row in rows], deleted=[])
+        # Rows committed after the version was read may come too: harmless,
+        # the client gets them again next time
+        rows = list(db.scalars(
+            select(TaskModel).where(TaskModel.version > since).order_by(TaskModel.version, TaskModel.id)
+        ))
+        tombstones = db.execute(
+            select(TaskTombstoneModel.task_id, TaskTombstoneModel.version)
+            .where(TaskTombstoneModel.version > since)
+            .order_by(TaskTombstoneModel.version, TaskTombstoneModel.id)
+        )
+        # An ID deleted then used again (databases from before AUTOINCREMENT)
+        # is changed, not deleted
+        versions = {row.id: row.version for row in rows}
+        deleted = [task_id for task_id, version in tombstones if versions.get(task_id, -1) < version]
+        return TaskChanges(version=meta.version, reset=False, changed=[_to_task(row) for row in rows],
+                           deleted=deleted)
+
+    @staticmethod
+    def _clear(db: Session) -> None:
+        db.execute(delete(TaskModel))
+        db.execute(delete(TaskTombstoneModel))
+        if db.get_bind().dialect.name == "sqlite":
+            # Clients reset after a clear: IDs may start again from 1
+            db.execute(text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+        version = _bump_version(db)
+        db.execute(
+            update(StoreMetaModel).where(StoreMetaModel.id == STORE_META_ID).values(tombstone_floor=version)
+        )
+        db.commit()
+
+
+class AsyncSQLTaskRepository(SQLTaskRepository):
+    """
+    Same queries as ``SQLTaskRepository``, on the asyncio engine.
+
+    ``AsyncSession.run_sync`` executes the synchronous operations inside a
+    greenlet while the driver (asyncpg / aiosqlite) awaits the database, so
+    a single worker can keep many queries in flight without threads.
+    """
+
+    DEFAULT_FACTORIES = ("AsyncSessionLocal", "AsyncReadSessionLocal")
+
+    async def _call(self, session_factory, operation, *args):
+        async with session_factory() as db:
+            return await db.run_sync(operation, *args)
+
+    async def iterate(self, chunk_size: int = 500, **filters) -> AsyncIterator[List[Task]]:
+        """Stream rows through a server-side cursor, ``chunk_size`` rows per fetch."""
+        stmt = select(TaskModel).order_by(TaskModel.id).execution_options(yield_per=chunk_size)
+        for field, value in filters.items():
+            if value is not None:
+                stmt = stmt.where(getattr(TaskModel, field) == value)
+        async with self.read_session_factory() as db:
+            result = await db.stream_scalars(stmt)
+            async for rows in result.partitions():
+                yield [_to_task(row) for row in rows]
+
+    async def close(self) -> None:
+        if self._session_factory is None:
+            return  # never connected
+        await self.session_factory.kw["bind"].dispose()
+        await self.read_session_factory.kw["bind"].dispose()
+
+
+# Attempts of SQLTaskRepository.initialize before giving up
+INITIALIZE_ATTEMPTS = 5
+
+# Deletions kept for GET /tasks/changes (twice as many before compaction)
+MAX_TOMBSTONES = DEFAULT_MAX_TOMBSTONES
+
+
+def _bump_version(db: Session) -> int:
+    """Increment the store version inside the current transaction and return it."""
+    return db.execute(
+        update(StoreMetaModel)
+        .where(StoreMetaModel.id == STORE_META_ID)
+        .values(version=StoreMetaModel.version + 1)
+        .returning(StoreMetaModel.version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+def _add_tombstones(db: Session, task_ids: List[int], version: int) -> None:
+    """
+    Record deletions, then compact: past twice MAX_TOMBSTONES rows, only the
+    MAX_TOMBSTONES most recent are kept and the floor moves up.
+    """
+    db.execute(insert(TaskTombstoneModel), [{"task_id": task_id, "version": version} for task_id in task_ids])
+    if db.scalar(select(func.count()).select_from(TaskTombstoneModel)) <= 2 * MAX_TOMBSTONES:
+        return
+    floor = db.scalar(
+        select(TaskTombstoneModel.version)
+        .order_by(TaskTombstoneModel.version.desc())
+        .offset(MAX_TOMBSTONES)
+        .limit(1)
+    )
+    db.execute(delete(TaskTombstoneModel).where(TaskTombstoneModel.version <= floor))
+    db.execute(update(StoreMetaModel).where(StoreMetaModel.id == STORE_META_ID).values(tombstone_floor=floor))
+
+
+def _to_task(row) -> Task:
+    """Convert a TaskModel row into the API's Task model."""
+    return Task.model_validate(row, from_attributes=True)
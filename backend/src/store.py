@@ -0,0 +1,570 @@
+"""
+In-memory task store with secondary indexes.
+
+Replaces the plain ``Dict[int, Task]`` used in Atelier 1 & 2. Tasks are still
+kept in a dictionary keyed by ID, but the store also maintains one index per
+filterable field so that ``GET /tasks?status=...&assignee=...`` only touches
+the matching tasks instead of scanning the whole collection.
+
+It also keeps every task's sort key in bisect-maintained lists, one per
+pagination order, so a page can be located in O(log N), plus the sorted due
+dates, so a date range (``?due_before=...``) is found in O(log N + k).
+
+The index buckets double as counters for GET /tasks/stats: the number of
+tasks per status, priority or assignee is the size of a bucket, and the
+number of overdue tasks is one bisect in the sorted due dates of the tasks
+not done yet - all kept up to date by every write.
+
+For GET /tasks/changes every write also carries the store version it
+produces: the store keeps each task's last modification version (sorted,
+so "changed since v" is a bisect) and a log of deletions (tombstones),
+trimmed to the most recent ``max_tombstones``.
+
+``ConcurrentTaskStore`` is the thread-safe variant used by the API: handlers
+may run in the threadpool (sync ``def``) or on free-threaded Python.
+
+With ``compact=True`` tasks are held as ``TaskRecord`` objects (records.py)
+and turned back into ``Task`` models only when they are read.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from heapq import nsmallest
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .pagination import TaskOrder, sort_key
+from .query import DateRange, TaskSort, naive_utc
+from .records import TaskRecord, to_micros
+from .schemas import TaskChanges, TaskPriority, TaskStats, TaskStatus
+from .search import SearchIndex
+
+# Fields that can be used as filters on GET /tasks.
+# status and priority are enums (a handful of buckets), assignee is free text
+# (one bucket per distinct value) - both are stored as value -> set of IDs.
+INDEXED_FIELDS = ("status", "priority", "assignee")
+
+# Deletions remembered for GET /tasks/changes (clients older than that reset)
+DEFAULT_MAX_TOMBSTONES = 10_000
+
+
+class TaskStore:
+    """
+    Dictionary of tasks plus incrementally maintained secondary indexes.
+
+    Supports the read-only mapping operations the API already relies on
+    (``in``, ``[]``, ``len``, ``values()``) so it can be used where
+    ``tasks_db`` used to be a plain dict. All writes must go through
+    ``add``, ``replace`` and ``remove`` so the indexes stay in sync.
+    """
+
+    def __init__(self, compact: bool = False, max_tombstones: int = DEFAULT_MAX_TOMBSTONES):
+        self.compact = compact
+        self.max_tombstones = max_tombstones
+        self._tasks: Dict[int, Any] = {}
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        # Sorted sort keys, one list per pagination order
+        self._orders: Dict[TaskOrder, List[Tuple]] = {order: [] for order in TaskOrder}
+        # Sorted (due date in microseconds, ID) of the tasks that have one
+        self._due: List[Tuple[int, int]] = []
+        # Sorted due dates (microseconds) of the tasks not done, for overdue counts
+        self._open_due: List[int] = []
+        # Words of titles and descriptions (GET /tasks/search)
+        self.search_index = SearchIndex()
+        # Version of the last write, version of each task's last change, the
+        # same sorted as (version, ID), and (version, ID) of deleted tasks.
+        # Changes since a version below tombstone_floor are no longer known.
+        self.version = 0
+        self._task_versions: Dict[int, int] = {}
+        self._modified: List[Tuple[int, int]] = []
+        self._tombstones: List[Tuple[int, int]] = []
+        self.tombstone_floor = 0
+        # Index lookups per field: hit = some task has the value, miss = none
+        self.index_hits: Dict[str, int] = {field: 0 for field in INDEXED_FIELDS}
+        self.index_misses: Dict[str, int] = {field: 0 for field in INDEXED_FIELDS}
+
+    # -------------------------------------------------------------------------
+    # Mapping interface
+    # -------------------------------------------------------------------------
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._tasks
+
+    def __getitem__(self, task_id: int):
+        return self._unpack(self._tasks[task_id])
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._tasks)
+
+    def get(self, task_id: int, default=None):
+        record = self._tasks.get(task_id)
+        return default if record is None else self._unpack(record)
+
+    def values(self):
+        if self.compact:
+            return [record.to_task() for record in self._tasks.values()]
+        return self._tasks.values()
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def add(self, task, version: Optional[int] = None) -> None:
+        """Insert a new task and index it (``version``: the write's store version)."""
+        self._set_version(task.id, version)
+        if self.compact:
+            task = TaskRecord.from_task(task)
+        self._tasks[task.id] = task
+        for field in INDEXED_FIELDS:
+            self._index_add(field, getattr(task, field), task.id)
+        for order, keys in self._orders.items():
+            insort(keys, self._sort_key(task, order))
+        due = self._due_key(task)
+        if due is not None:
+            insort(self._due, (due, task.id))
+            if task.status != TaskStatus.DONE:
+                insort(self._open_due, due)
+        self.search_index.add(task.id, task.title, task.description)
+
+    def replace(self, task, version: Optional[int] = None) -> None:
+        """Replace an existing task, re-indexing only the fields that changed."""
+        previous = self._tasks[task.id]
+        self._set_version(task.id, version)
+        if self.compact:
+            task = TaskRecord.from_task(task)
+        self._tasks[task.id] = task
+        for field in INDEXED_FIELDS:
+            old_value = getattr(previous, field)
+            new_value = getattr(task, field)
+            if old_value != new_value:
+                self._index_remove(field, old_value, task.id)
+                self._index_add(field, new_value, task.id)
+        for order, keys in self._orders.items():
+            old_key, new_key = self._sort_key(previous, order), self._sort_key(task, order)
+            if old_key != new_key:
+                del keys[bisect_left(keys, old_key)]
+                insort(keys, new_key)
+        old_due, new_due = self._due_key(previous), self._due_key(task)
+        if old_due != new_due:
+            if old_due is not None:
+                del self._due[bisect_left(self._due, (old_due, task.id))]
+            if new_due is not None:
+                insort(self._due, (new_due, task.id))
+        old_open, new_open = self._open_due_key(previous), self._open_due_key(task)
+        if old_open != new_open:
+            if old_open is not None:
+                del self._open_due[bisect_left(self._open_due, old_open)]
+            if new_open is not None:
+                insort(self._open_due, new_open)
+        if (previous.title, previous.description) != (task.title, task.description):
+            self.search_index.remove(task.id, previous.title, previous.description)
+            self.search_index.add(task.id, task.title, task.description)
+
+    def remove(self, task_id: int, version: Optional[int] = None):
+        """Remove a task and drop it from every index. Returns the task."""
+        task = self._tasks.pop(task_id)
+        self._set_version(task_id, version, deleted=True)
+        for field in INDEXED_FIELDS:
+            self._index_remove(field, getattr(task, field), task_id)
+        for order, keys in self._orders.items():
+            del keys[bisect_left(keys, self._sort_key(task, order))]
+        due = self._due_key(task)
+        if due is not None:
+            del self._due[bisect_left(self._due, (due, task_id))]
+            if task.status != TaskStatus.DONE:
+                del self._open_due[bisect_left(self._open_due, due)]
+        self.search_index.remove(task_id, task.title, task.description)
+        return self._unpack(task)
+
+    def clear(self, version: Optional[int] = None) -> None:
+        """Remove all tasks and reset the indexes."""
+        self.version = self.version + 1 if version is None else version
+        # Clients must reload everything: which tasks vanished is not kept
+        self.tombstone_floor = self.version
+        self._task_versions.clear()
+        self._modified.clear()
+        self._tombstones.clear()
+        self._tasks.clear()
+        for index in self._indexes.values():
+            index.clear()
+        for keys in self._orders.values():
+            keys.clear()
+        self._due.clear()
+        self._open_due.clear()
+        self.search_index.clear()
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+               created: Optional[DateRange] = None, **criteria) -> List[Any]:
+        """
+        Return tasks matching every non-None criterion, ordered by ``sort``.
+
+        Example:
+            store.filter(status=TaskStatus.IN_PROGRESS, assignee="alice")
+            store.filter(TaskSort.DUE_DATE, due=DateRange(before=now), status=TaskStatus.TODO)
+
+        Date ranges are located by bisecting the sorted keys (O(log N + k))
+        and buckets are intersected from the smallest to the largest: the
+        most selective of them drives the scan and the others are probed,
+        so the cost is bounded by the size of the narrowest filter.
+        """
+        buckets = self._buckets(criteria)
+        if buckets is None:
+            return []
+
+        scans = [self._date_range(field, date_range)
+                 for field, date_range in (("due_date", due), ("created_at", created))
+                 if date_range is not None]
+        scans.sort(key=lambda scan: len(scan[1]))
+        if scans and (not buckets or len(scans[0][1]) <= len(buckets[0])):
+            field, keys, _ = scans[0]
+            tests = [contains for _, _, contains in scans[1:]]
+            ids = [key[-1] for key in keys
+                   if all(key[-1] in bucket for bucket in buckets)
+                   and all(contains(self._tasks[key[-1]]) for contains in tests)]
+            ordered_by = field  # keys come sorted by this field
+        else:
+            if buckets:
+                ids = buckets[0].intersection(*buckets[1:])
+            elif sort.field == "created_at":
+                ids = [key[-1] for key in self._orders[TaskOrder.CREATED_AT]]
+            else:
+                ids = self._tasks
+            tests = [contains for _, _, contains in scans]
+            if tests:
+                ids = [task_id for task_id in ids if all(contains(self._tasks[task_id]) for contains in tests)]
+            ordered_by = "created_at" if not buckets and sort.field == "created_at" else None
+
+        return [self._unpack(self._tasks[task_id]) for task_id in self._sorted(ids, sort, ordered_by)]
+
+    def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **criteria) -> List[Any]:
+        """
+        Return up to ``limit`` matching tasks whose sort key is after ``after``.
+
+        Without filters this is a bisect plus a slice: O(log N + limit).
+        With filters we either walk the sorted keys and probe the buckets
+        (cheap when matches are dense) or sort only the matching IDs (cheap
+        when they are rare), whichever is expected to touch fewer tasks.
+        """
+        buckets = self._buckets(criteria)
+        if buckets is None or limit <= 0:
+            return []
+
+        if self.compact and after is not None and order == TaskOrder.CREATED_AT:
+            after = (to_micros(after[0]), after[1])
+        keys = self._orders[order]
+        start = 0 if after is None else bisect_right(keys, after)
+
+        if not buckets:
+            selected = keys[start:start + limit]
+        elif limit * len(self._tasks) <= len(buckets[0]) ** 2:
+            # Dense matches: expect ~limit * N / matches keys to scan
+            selected = []
+            for position in range(start, len(keys)):
+                key = keys[position]
+                task_id = key[-1]
+                if all(task_id in bucket for bucket in buckets):
+                    selected.append(key)
+                    if len(selected) == limit:
+                        break
+        else:
+            # Sparse matches: only look at the (few) matching tasks
+            matching_ids = buckets[0].intersection(*buckets[1:])
+            candidates = (self._sort_key(self._tasks[task_id], order) for task_id in matching_ids)
+            if after is not None:
+                candidates = (key for key in candidates if key > after)
+            selected = nsmallest(limit, candidates)
+
+        return [self._unpack(self._tasks[key[-1]]) for key in selected]
+
+    def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Any]]:
+        """Up to ``limit`` (score, task) matching ``query``, best first, ranked after ``after``."""
+        return [(score, self._unpack(self._tasks[task_id]))
+                for score, task_id in self.search_index.search(query, after, limit)]
+
+    def stats(self, now: datetime) -> TaskStats:
+        """Counts per status, priority and assignee, read from the index sizes."""
+        by_status = self._indexes["status"]
+        by_priority = self._indexes["priority"]
+        by_assignee = {assignee: len(ids) for assignee, ids in self._indexes["assignee"].items()}
+        return TaskStats(
+            total=len(self._tasks),
+            by_status={status: len(by_status.get(status, ())) for status in TaskStatus},
+            by_priority={priority: len(by_priority.get(priority, ())) for priority in TaskPriority},
+            by_assignee=by_assignee,
+            unassigned=len(self._tasks) - sum(by_assignee.values()),
+            overdue=bisect_left(self._open_due, to_micros(naive_utc(now))),
+        )
+
+    def changes(self, since: int) -> TaskChanges:
+        """
+        Tasks created or updated after version ``since`` (oldest change
+        first) and IDs deleted after it: O(log N + k).
+
+        A ``since`` older than the tombstones kept (or newer than the store,
+        e.g. from a previous run) gives every task with ``reset`` set.
+        """
+        if since < self.tombstone_floor or since > self.version:
+            return TaskChanges(version=self.version, reset=True, changed=list(self.values()), deleted=[])
+        start = bisect_right(self._modified, (since, float("inf")))
+        deleted_start = bisect_right(self._tombstones, (since, float("inf")))
+        return TaskChanges(
+            version=self.version,
+            reset=False,
+            changed=[self._unpack(self._tasks[task_id]) for _, task_id in self._modified[start:]],
+            deleted=[task_id for _, task_id in self._tombstones[deleted_start:]],
+        )
+
+    # -------------------------------------------------------------------------
+    # Index helpers
+    # -------------------------------------------------------------------------
+
+    def _unpack(self, record):
+        """The ``Task`` for a stored entry."""
+        return record.to_task() if self.compact else record
+
+    def _set_version(self, task_id: int, version: Optional[int], deleted: bool = False) -> None:
+        """Record that ``task_id`` changed (or was deleted) at ``version`` (default: the next one)."""
+        if version is None:
+            version = self.version + 1
+        self.version = version
+        previous = self._task_versions.pop(task_id, None)
+        if previous is not None:
+            del self._modified[bisect_left(self._modified, (previous, task_id))]
+        if not deleted:
+            self._task_versions[task_id] = version
+            insort(self._modified, (version, task_id))
+            return
+        self._tombstones.append((version, task_id))
+        if len(self._tombstones) > 2 * self.max_tombstones:
+            # Compact: forget the oldest deletions, in one go for many writes
+            cut = len(self._tombstones) - self.max_tombstones
+            self.tombstone_floor = self._tombstones[cut - 1][0]
+            del self._tombstones[:cut]
+
+    def _due_key(self, entry) -> Optional[int]:
+        """Due date of a stored entry in microseconds (naive UTC), or None."""
+        value = entry._due_date if self.compact else entry.due_date
+        if value is None or isinstance(value, int):
+            return value
+        return to_micros(naive_utc(value))
+
+    def _open_due_key(self, entry) -> Optional[int]:
+        """Due date of a stored entry that is not done, or None."""
+        return None if entry.status == TaskStatus.DONE else self._due_key(entry)
+
+    def _date_range(self, field: str, date_range: DateRange) -> Tuple[str, List[Tuple], Callable[[Any], bool]]:
+        """
+        Sorted keys of the tasks whose ``field`` (due_date or created_at) is
+        in ``date_range``, and a test telling whether one entry is.
+        """
+        if field == "due_date":
+            keys, value_of, convert = self._due, self._due_key, to_micros
+        else:
+            keys = self._orders[TaskOrder.CREATED_AT]
+            value_of = lambda entry: self._sort_key(entry, TaskOrder.CREATED_AT)[0]  # noqa: E731
+            convert = to_micros if self.compact else None
+        since, before = (bound if bound is None or convert is None else convert(bound) for bound in date_range)
+
+        # (value,) sorts before every (value, id): bisect_left finds the first key >= value
+        start = 0 if since is None else bisect_left(keys, (since,))
+        end = len(keys) if before is None else bisect_left(keys, (before,))
+
+        def contains(entry) -> bool:
+            value = value_of(entry)
+            return value is not None and (since is None or value >= since) and (before is None or value < before)
+
+        return field, keys[start:end], contains
+
+    def _sorted(self, ids, sort: TaskSort, ordered_by: Optional[str]) -> List[int]:
+        """
+        ``ids`` in ``sort`` order (see query.py). ``ordered_by`` names the
+        field ``ids`` are already ascending by, if any, to skip the sort.
+        """
+        if sort.field == ordered_by:
+            ids = list(ids)
+        elif sort.field == "id":
+            ids = sorted(ids)
+        elif sort.field == "created_at":
+            ids = [key[-1] for key in sorted(self._sort_key(self._tasks[task_id], TaskOrder.CREATED_AT)
+                                             for task_id in ids)]
+        else:
+            dated, undated = [], []
+            for task_id in ids:
+                due = self._due_key(self._tasks[task_id])
+                if due is None:
+                    undated.append(task_id)
+                else:
+                    dated.append((due, task_id))
+            dated.sort()
+            undated.sort()
+            if sort.descending:
+                dated.reverse()
+                undated.reverse()
+            return [task_id for _, task_id in dated] + undated
+        if sort.descending:
+            ids.reverse()
+        return ids
+
+    def _sort_key(self, entry, order: TaskOrder) -> Tuple:
+        """Sort key of a stored entry; compact records keep creation dates as ints."""
+        if self.compact and order == TaskOrder.CREATED_AT:
+            return (entry._created_at, entry.id)
+        return sort_key(entry, order)
+
+    def _buckets(self, criteria) -> Optional[List[Set[int]]]:
+        """
+        Look up the index bucket of each non-None criterion, smallest first.
+
+        Returns None when a criterion matches nothing at all.
+        """
+        buckets = []
+        for field, value in criteria.items():
+            if value is None:
+                continue
+            if field not in self._indexes:
+                raise ValueError(f"Field '{field}' is not indexed")
+            bucket = self._indexes[field].get(value)
+            if not bucket:
+                self.index_misses[field] += 1
+                return None
+            self.index_hits[field] += 1
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        return buckets
+
+    def _index_add(self, field: str, value, task_id: int) -> None:
+        if value is None:
+            return
+        self._indexes[field].setdefault(value, set()).add(task_id)
+
+    def _index_remove(self, field: str, value, task_id: int) -> None:
+        if value is None:
+            return
+        bucket = self._indexes[field].get(value)
+        if bucket is None:
+            return
+        bucket.discard(task_id)
+        if not bucket:
+            # Drop empty buckets so free-text indexes (assignee) don't grow forever
+            del self._indexes[field][value]
+
+
+# =============================================================================
+# THREAD-SAFE VARIANT
+# =============================================================================
+
+class IdAllocator:
+    """Hands out increasing task IDs, never the same one twice, from any thread."""
+
+    def __init__(self, start: int = 1):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            task_id = self._next
+            self._next += 1
+            return task_id
+
+    def peek(self) -> int:
+        """The ID the next ``allocate`` will return."""
+        return self._next
+
+    def reset(self, start: int = 1) -> None:
+        with self._lock:
+            self._next = start
+
+
+class ConcurrentTaskStore(TaskStore):
+    """
+    ``TaskStore`` safe to share between threads.
+
+    Two kinds of locks:
+    - striped locks, ``stripe(task_id)``, picked by task ID: callers hold the
+      stripe of a task around a read-modify-write of that task (see
+      InMemoryTaskRepository.update), so two updates of one task never lose
+      each other's changes while updates of different tasks run in parallel;
+    - one structure lock held for the short time a write updates the
+      dictionary, the indexes and the sort keys, and while a query reads
+      them - so every query sees the store between two writes, never in the
+      middle of one (snapshot-consistent results).
+
+    Lock order is always stripe(s) first, then the structure lock.
+    """
+
+    def __init__(self, stripes: int = 64, compact: bool = False,
+                 max_tombstones: int = DEFAULT_MAX_TOMBSTONES):
+        super().__init__(compact=compact, max_tombstones=max_tombstones)
+        self.ids = IdAllocator()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._lock = threading.RLock()
+
+    def stripe(self, task_id: int) -> threading.Lock:
+        """Lock guarding read-modify-writes of ``task_id``."""
+        return self._stripes[task_id % len(self._stripes)]
+
+    @contextmanager
+    def exclusive(self):
+        """Hold every stripe (in a fixed order): no task can change meanwhile."""
+        with ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            yield
+
+    # Dict lookups are atomic on their own; iteration is not, so it works on
+    # a copy taken under the structure lock
+
+    def __iter__(self) -> Iterator[int]:
+        with self._lock:
+            return iter(list(self._tasks))
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return list(super().values())
+
+    def add(self, task, version: Optional[int] = None) -> None:
+        with self._lock:
+            super().add(task, version)
+
+    def replace(self, task, version: Optional[int] = None) -> None:
+        with self._lock:
+            super().replace(task, version)
+
+    def remove(self, task_id: int, version: Optional[int] = None):
+        with self._lock:
+            return super().remove(task_id, version)
+
+    def clear(self, version: Optional[int] = None) -> None:
+        with self._lock:
+            super().clear(version)
+
+    def filter(self, sort: TaskSort = TaskSort.ID, due: Optional[DateRange] = None,
+               created: Optional[DateRange] = None, **criteria) -> List[Any]:
+        with self._lock:
+            return super().filter(sort, due, created, **criteria)
+
+    def page(self, order: TaskOrder, after: Optional[Tuple], limit: int, **criteria) -> List[Any]:
+        with self._lock:
+            return super().page(order, after, limit, **criteria)
+
+    def search(self, query: str, after: Optional[Tuple[float, int]], limit: int) -> List[Tuple[float, Any]]:
+        with self._lock:
+            return super().search(query, after, limit)
+
+    def stats(self, now: datetime) -> TaskStats:
+        with self._lock:
+            return super().stats(now)
+
+    def changes(self, since: int) -> TaskChanges:
+        with self._lock:
+            return super().changes(since)
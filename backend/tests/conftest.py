@@ -1,6 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
-from src.app import app, clear_tasks
+from src.app import app
+
+# Repository, caches and metrics of the application under test
+state = app.state.taskflow
 
 
 def pytest_configure(config):
@@ -14,14 +17,17 @@ def pytest_configure(config):
 
 
 @pytest.fixture(autouse=True)
-def clean_tasks():
+async def clean_tasks():
     """
     Clear all tasks before each test.
     This ensures tests don't interfere with each other.
+
+    The suite can also run against a database: DATABASE_URL=... uv run pytest
     """
-    clear_tasks()
+    await state.repo.initialize()  # creates the tables when DATABASE_URL is set
+    await state.clear()
     yield
-    clear_tasks()
+    await state.clear()
 
 
 @pytest.fixture
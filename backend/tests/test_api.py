@@ -1,4 +1,5 @@
 import pytest
+from fastapi.testclient import TestClient
 
 # =============================================================================
 # BASIC ENDPOINT TESTS
@@ -20,6 +21,23 @@ def test_health_check(client):
     assert response.json()["status"] == "healthy"
 
 
+def test_create_app_builds_a_new_application(client):
+    """create_app() returns a separate application, with its own storage, serving the same endpoints."""
+    from src.app import app, create_app
+    from src.repository import InMemoryTaskRepository
+
+    other = create_app(InMemoryTaskRepository())
+
+    assert other is not app
+    assert other.openapi()["paths"] == app.openapi()["paths"]
+    with TestClient(other) as other_client:
+        other_client.post("/tasks", json={"title": "Elsewhere"})
+        assert [t["title"] for t in other_client.get("/tasks").json()] == ["Elsewhere"]
+        assert 'route="/tasks",method="POST"' in other_client.get("/metrics").text
+    assert client.get("/tasks").json() == []
+    assert other.state.taskflow.metrics is not app.state.taskflow.metrics
+
+
 # =============================================================================
 # CREATE TASK TESTS
 # =============================================================================
@@ -158,6 +176,48 @@ def test_filter_by_assignee(client):
     assert tasks[0]["assignee"] == "alice"
 
 
+def test_filter_by_status_and_assignee(client):
+    """Combining filters should only return tasks matching all of them."""
+    client.post("/tasks", json={"title": "Alice todo", "assignee": "alice"})
+    client.post("/tasks", json={"title": "Alice wip", "assignee": "alice", "status": "in_progress"})
+    client.post("/tasks", json={"title": "Bob wip", "assignee": "bob", "status": "in_progress"})
+
+    response = client.get("/tasks?status=in_progress&assignee=alice")
+
+    tasks = response.json()
+    assert len(tasks) == 1
+    assert tasks[0]["title"] == "Alice wip"
+
+
+def test_filters_follow_updates(client):
+    """Updated tasks should be found under their new status only."""
+    task_id = client.post("/tasks", json={"title": "Moving"}).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "done"})
+
+    assert client.get("/tasks?status=todo").json() == []
+    assert len(client.get("/tasks?status=done").json()) == 1
+
+
+def test_filter_overdue_and_sort_by_due_date(client):
+    """Date ranges and sort can be combined with the other filters."""
+    for title, due_date in [("Later", "2030-01-01T09:00:00"), ("Late", "2020-01-02T09:00:00"),
+                            ("Very late", "2020-01-01T09:00:00"), ("Someday", None)]:
+        client.post("/tasks", json={"title": title, "due_date": due_date})
+
+    overdue = client.get("/tasks?due_before=2025-01-01T00:00:00&sort=due_date").json()
+    assert [t["title"] for t in overdue] == ["Very late", "Late"]
+
+    by_due = client.get("/tasks?sort=-due_date").json()
+    assert [t["title"] for t in by_due] == ["Later", "Late", "Very late", "Someday"]
+
+    # Lower bounds are inclusive, timezone offsets are converted to UTC
+    since = client.get("/tasks", params={"due_after": "2020-01-02T10:00:00+01:00"}).json()
+    assert [t["title"] for t in since] == ["Later", "Late"]
+
+    assert client.get("/tasks?created_since=2000-01-01T00:00:00&sort=-created_at").json()[0]["title"] == "Someday"
+    assert client.get("/tasks?sort=title").status_code == 422
+
+
 # =============================================================================
 # UPDATE TASK TESTS
 # =============================================================================
@@ -218,6 +278,49 @@ def test_delete_nonexistent_task(client):
     assert response.status_code == 404
 
 
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+def test_task_stats(client):
+    """The stats endpoint should count tasks without listing them."""
+    client.post("/tasks", json={"title": "Late", "assignee": "alice", "due_date": "2020-01-01T00:00:00"})
+    client.post("/tasks", json={"title": "Done", "assignee": "alice", "status": "done", "priority": "high"})
+
+    stats = client.get("/tasks/stats").json()
+
+    assert stats == {
+        "total": 2,
+        "by_status": {"todo": 1, "in_progress": 0, "done": 1},
+        "by_priority": {"low": 0, "medium": 1, "high": 1},
+        "by_assignee": {"alice": 2},
+        "unassigned": 0,
+        "overdue": 1,
+    }
+
+
+# =============================================================================
+# DELTA SYNC
+# =============================================================================
+
+def test_task_changes(client):
+    """A client holding version X should receive only what changed after it."""
+    first = client.post("/tasks", json={"title": "Kept"}).json()
+    second = client.post("/tasks", json={"title": "Gone"}).json()
+    synced = client.get("/tasks/changes", params={"since": 0}).json()
+    assert [task["title"] for task in synced["changed"]] == ["Kept", "Gone"]
+
+    client.put(f"/tasks/{first['id']}", json={"status": "done"})
+    client.delete(f"/tasks/{second['id']}")
+    delta = client.get("/tasks/changes", params={"since": synced["version"]}).json()
+
+    assert delta["reset"] is False
+    assert [task["status"] for task in delta["changed"]] == ["done"]
+    assert delta["deleted"] == [second["id"]]
+    assert delta["version"] > synced["version"]
+    assert client.get("/tasks/changes", params={"since": -1}).status_code == 422
+
+
 # =============================================================================
 # COMPLETE WORKFLOW TEST
 # =============================================================================
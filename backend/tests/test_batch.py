@@ -0,0 +1,77 @@
+from src.app import MAX_BATCH_SIZE
+
+
+# =============================================================================
+# POST /tasks/batch
+# =============================================================================
+
+def test_batch_create(client):
+    response = client.post("/tasks/batch", json=[
+        {"title": "First"},
+        {"title": "Second", "priority": "high"},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 0)
+    assert [r["status"] for r in body["results"]] == [201, 201]
+    assert [r["task"]["title"] for r in body["results"]] == ["First", "Second"]
+    assert len(client.get("/tasks").json()) == 2
+
+
+def test_batch_create_reports_invalid_items(client):
+    response = client.post("/tasks/batch", json=[
+        {"title": "Valid"},
+        {"description": "No title"},
+        {"title": "   "},
+        "not an object",
+    ])
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    assert [r["status"] for r in body["results"]] == [201, 422, 422, 422]
+    assert body["results"][2]["error"] == "Title cannot be empty"
+    assert [t["title"] for t in client.get("/tasks").json()] == ["Valid"]
+
+
+def test_batch_size_is_bounded(client):
+    assert client.post("/tasks/batch", json=[]).status_code == 422
+    too_many = [{"title": "x"}] * (MAX_BATCH_SIZE + 1)
+    assert client.post("/tasks/batch", json=too_many).status_code == 422
+
+
+# =============================================================================
+# PATCH /tasks/batch
+# =============================================================================
+
+def test_batch_update(client):
+    ids = [client.post("/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(3)]
+
+    response = client.patch("/tasks/batch", json=[
+        {"id": ids[0], "status": "done"},
+        {"id": ids[2], "assignee": "alice", "priority": "low"},
+        {"id": 999, "status": "done"},
+        {"id": ids[0], "title": "Twice"},
+        {"id": ids[1], "title": ""},
+    ])
+
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [200, 200, 404, 422, 422]
+    assert body["results"][1]["task"]["assignee"] == "alice"
+    assert client.get(f"/tasks/{ids[0]}").json()["status"] == "done"
+    assert client.get(f"/tasks/{ids[1]}").json()["title"] == "Task 1"
+    assert [t["id"] for t in client.get("/tasks?status=done").json()] == [ids[0]]
+
+
+# =============================================================================
+# DELETE /tasks/batch
+# =============================================================================
+
+def test_batch_delete(client):
+    ids = [client.post("/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(3)]
+
+    response = client.request("DELETE", "/tasks/batch", json=[ids[0], 999, ids[2], ids[0]])
+
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [204, 404, 204, 422]
+    assert [t["id"] for t in client.get("/tasks").json()] == [ids[1]]
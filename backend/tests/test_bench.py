@@ -0,0 +1,66 @@
+"""
+Smoke tests for the benchmarks (bench/): a tiny run per backend, and the
+cold start regression threshold.
+"""
+
+import pytest
+
+from bench.load import OPERATIONS, parse_mix, percentile, run_benchmark
+
+
+def test_parse_mix():
+    assert parse_mix("create=1,get=3") == {"create": 1, "get": 3}
+    with pytest.raises(ValueError):
+        parse_mix("explode=1")
+    with pytest.raises(ValueError):
+        parse_mix("create=0")
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+
+async def test_benchmark_report():
+    from src.app import app
+
+    tasks_repo = app.state.taskflow.repo
+    report = await run_benchmark(["memory", "sqlite"], tasks=30, requests=60, concurrency=4)
+
+    assert report["config"]["tasks"] == 30
+    for backend in ("memory", "sqlite"):
+        result = report["results"][backend]
+        assert result["requests"] == 60
+        assert result["errors"] == 0
+        assert result["requests_per_s"] > 0
+        assert set(result["latency_ms"]) == {"all", *OPERATIONS}
+        assert {"p50", "p95", "p99"} <= set(result["latency_ms"]["all"])
+
+    # Benchmarks run on applications of their own
+    assert app.state.taskflow.repo is tasks_repo
+
+
+def test_memory_benchmark_report():
+    from bench.memory import run_memory_benchmark
+
+    report = run_memory_benchmark(tasks=500)
+
+    sizes = report["bytes_per_task"]
+    assert sizes["compact"] < sizes["pydantic"]
+    assert 0 < report["reduction"] < 1
+
+
+@pytest.mark.e2e  # wall-clock timing of fresh interpreters: run with the e2e job
+def test_cold_start_stays_within_budget():
+    from bench.startup import DEFAULT_BUDGET_MS, run_startup_benchmark
+
+    report = run_startup_benchmark(["memory", "sqlite"], runs=1, budget_ms=DEFAULT_BUDGET_MS)
+
+    memory, sqlite = report["results"]["memory"], report["results"]["sqlite"]
+    assert memory["within_budget"], memory
+    assert sqlite["within_budget"], sqlite
+    # SQLAlchemy only with a database, and drivers only on the first query
+    assert memory["loaded_at_import"] == []
+    assert sqlite["loaded_at_import"] == ["sqlalchemy"]
@@ -0,0 +1,155 @@
+"""
+Read-through cache in front of the SQL backend (CachedTaskRepository) and
+its building blocks (src/cache.py).
+"""
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.cache import LocalInvalidationChannel, LRUCache
+from src.repository import AsyncSQLTaskRepository, CachedTaskRepository
+from src.schemas import TaskCreate, TaskStatus
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_and_expires():
+    clock = Clock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" is the least recently used
+
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    clock.now = 10
+    assert cache.get("a") is None and len(cache) == 1
+    cache.discard_where(lambda key, value: value == 3)
+    assert len(cache) == 0
+
+
+async def open_cached(path, channel=None):
+    """A cached repository on its own engine, like one API worker."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    repo = CachedTaskRepository(AsyncSQLTaskRepository(async_sessionmaker(engine, expire_on_commit=False)),
+                                channel=channel)
+    await repo.initialize()
+    return repo
+
+
+async def test_reads_are_served_from_the_cache(tmp_path):
+    repo = await open_cached(tmp_path / "tasks.db")
+    task = await repo.create(TaskCreate(title="Cached"))
+
+    assert await repo.get(task.id) == task
+    assert await repo.get(task.id) == task
+    assert await repo.filter(status=TaskStatus.TODO) == [task]
+    assert await repo.filter(status=TaskStatus.TODO) == [task]
+
+    assert repo.cache_lookups() == {"task": (1, 1, 1), "query": (1, 1, 1)}
+    await repo.close()
+
+
+async def test_writes_invalidate_exactly(tmp_path):
+    repo = await open_cached(tmp_path / "tasks.db")
+    first, second = await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B", status="done")])
+    await repo.get(first.id)
+    await repo.get(second.id)
+    await repo.filter(status=TaskStatus.TODO)
+    await repo.filter(status=TaskStatus.DONE)
+    await repo.filter(assignee="alice")
+
+    # First moves from "todo" to "done": both lists change, not alice's
+    await repo.update(first.id, {"status": TaskStatus.DONE})
+
+    assert len(repo.queries) == 1 and len(repo.tasks) == 1
+    assert await repo.filter(status=TaskStatus.TODO) == []
+    assert [t.id for t in await repo.filter(status=TaskStatus.DONE)] == [first.id, second.id]
+    assert (await repo.get(first.id)).status == TaskStatus.DONE
+
+    # A new task joins the lists it matches
+    await repo.create(TaskCreate(title="C", assignee="alice"))
+    assert [t.title for t in await repo.filter(assignee="alice")] == ["C"]
+
+    await repo.delete(second.id)
+    assert await repo.get(second.id) is None
+    assert [t.id for t in await repo.filter(status=TaskStatus.DONE)] == [first.id]
+    await repo.close()
+
+
+async def test_other_workers_are_invalidated_through_the_channel(tmp_path):
+    channel = LocalInvalidationChannel()
+    worker_a = await open_cached(tmp_path / "shared.db", channel)
+    worker_b = await open_cached(tmp_path / "shared.db", channel)
+    task = await worker_a.create(TaskCreate(title="Shared"))
+    assert await worker_b.get(task.id) == task
+    await worker_b.filter(status=TaskStatus.TODO)
+
+    await worker_a.update(task.id, {"title": "Renamed"})
+
+    assert (await worker_b.get(task.id)).title == "Renamed"
+    assert [t.title for t in await worker_b.filter(status=TaskStatus.TODO)] == ["Renamed"]
+
+    await worker_a.clear()
+    assert await worker_b.get(task.id) is None
+    await worker_a.close()
+    await worker_b.close()
+
+
+async def test_lists_never_lag_behind_the_store_version(tmp_path):
+    # No channel: worker B only learns about A's write from the store version
+    worker_a = await open_cached(tmp_path / "shared.db")
+    worker_b = await open_cached(tmp_path / "shared.db")
+    task = await worker_a.create(TaskCreate(title="Shared"))
+    assert [t.title for t in await worker_b.filter(status=TaskStatus.TODO)] == ["Shared"]
+
+    await worker_a.update(task.id, {"title": "Renamed"})
+
+    assert [t.title for t in await worker_b.filter(status=TaskStatus.TODO)] == ["Renamed"]
+    assert worker_b.cache_lookups()["query"][:2] == (0, 2)
+    await worker_a.close()
+    await worker_b.close()
+
+
+async def test_read_racing_a_write_is_not_cached(tmp_path):
+    repo = await open_cached(tmp_path / "tasks.db")
+    task = await repo.create(TaskCreate(title="Before"))
+    inner_get = repo.inner.get
+
+    async def slow_get(task_id):
+        stale = await inner_get(task_id)
+        # The write commits and invalidates while this read is in flight
+        await repo.update(task_id, {"title": "After"})
+        return stale
+
+    repo.inner.get = slow_get
+    assert (await repo.get(task.id)).title == "Before"
+    repo.inner.get = inner_get
+
+    assert (await repo.get(task.id)).title == "After"
+    await repo.close()
+
+
+async def test_cache_counters_are_exported(tmp_path):
+    from src.app import create_app
+
+    repo = await open_cached(tmp_path / "tasks.db")
+    transport = httpx.ASGITransport(app=create_app(repo))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        task = (await client.post("/tasks", json={"title": "Counted"})).json()
+        await client.get(f"/tasks/{task['id']}")
+        await client.get(f"/tasks/{task['id']}")
+        text = (await client.get("/metrics")).text
+
+    assert 'taskflow_read_cache_requests_total{kind="task",result="hit"} 1' in text
+    assert 'taskflow_read_cache_requests_total{kind="task",result="miss"} 1' in text
+    assert 'taskflow_read_cache_entries{kind="task"} 1' in text
+    await repo.close()
@@ -0,0 +1,145 @@
+"""
+Stress tests: the in-memory store and repository hammered from many threads.
+
+The interpreter's switch interval is lowered so threads are preempted in
+the middle of operations as often as possible.
+"""
+
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from src.pagination import TaskOrder
+from src.repository import InMemoryTaskRepository
+from src.schemas import Task, TaskCreate, TaskPriority, TaskStatus
+from src.store import ConcurrentTaskStore, IdAllocator
+
+THREADS = 16
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(worker, count=THREADS):
+    """Start ``count`` threads at the same time; re-raise the first failure."""
+    barrier = threading.Barrier(count)
+
+    def start(number):
+        barrier.wait()
+        return worker(number)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(start, range(count)))
+
+
+def test_id_allocator_never_repeats():
+    ids = IdAllocator()
+    allocated = run_threads(lambda _: [ids.allocate() for _ in range(2000)])
+
+    flat = [task_id for chunk in allocated for task_id in chunk]
+    assert sorted(flat) == list(range(1, THREADS * 2000 + 1))
+
+
+def test_striped_updates_are_not_lost():
+    store = ConcurrentTaskStore(stripes=8)
+    now = datetime.utcnow()
+    for task_id in range(1, 11):
+        store.add(Task(id=task_id, title="0", created_at=now, updated_at=now))
+
+    def increment(number):
+        for i in range(300):
+            task_id = (number + i) % 10 + 1
+            with store.stripe(task_id):
+                task = store[task_id]
+                store.replace(task.model_copy(update={"title": str(int(task.title) + 1)}))
+
+    run_threads(increment)
+
+    assert sum(int(task.title) for task in store.values()) == THREADS * 300
+
+
+def test_queries_see_consistent_snapshots():
+    store = ConcurrentTaskStore()
+    now = datetime.utcnow()
+    stop = threading.Event()
+    errors = []
+
+    def writer(number):
+        statuses = list(TaskStatus)
+        for i in range(400):
+            task_id = store.ids.allocate()
+            store.add(Task(id=task_id, title="t", status=statuses[i % 3], created_at=now, updated_at=now))
+            with store.stripe(task_id):
+                task = store[task_id]
+                store.replace(task.model_copy(update={"status": statuses[(i + 1) % 3]}))
+            if i % 4 == 0:
+                with store.stripe(task_id):
+                    store.remove(task_id)
+
+    def reader():
+        while not stop.is_set():
+            tasks = store.filter(status=TaskStatus.DONE)
+            if any(t.status != TaskStatus.DONE for t in tasks):
+                errors.append("filter returned a task outside its bucket")
+            ids = [t.id for t in tasks]
+            if ids != sorted(set(ids)):
+                errors.append("filter returned duplicates or unsorted IDs")
+            page = store.page(TaskOrder.CREATED_AT, None, 50)
+            if len(page) != len({t.id for t in page}):
+                errors.append("page returned duplicates")
+            for task_id in list(store)[:20]:
+                store.get(task_id)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        run_threads(writer, count=8)
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+    assert errors == []
+    assert len(store) == 8 * 300
+    assert len(store.values()) == len(store.filter())
+    by_status = sum(len(store.filter(status=s)) for s in TaskStatus)
+    assert by_status == len(store)
+    # Sort keys were kept in step with the dictionary
+    assert [t.id for t in store.page(TaskOrder.ID, None, 10_000)] == sorted(store)
+
+
+def test_repository_from_many_threads():
+    repo = InMemoryTaskRepository()
+    start = asyncio.run(repo.version())
+    shared = asyncio.run(repo.create(TaskCreate(title="Shared")))
+
+    def worker(number):
+        async def work():
+            created = [await repo.create(TaskCreate(title=f"{number}-{i}")) for i in range(100)]
+            for task in created:
+                await repo.update(task.id, {"priority": TaskPriority.HIGH})
+            for _ in range(20):
+                await repo.update(shared.id, {"description": str(number)})
+            await repo.delete_many([task.id for task in created[:10]])
+            return [task.id for task in created]
+        return asyncio.run(work())
+
+    ids = [task_id for chunk in run_threads(worker) for task_id in chunk]
+
+    assert sorted(ids) == list(range(2, THREADS * 100 + 2))
+    assert repo.next_id == THREADS * 100 + 2
+    # Per thread: 100 creates, 100 updates, 20 shared updates, 10 deletes
+    assert asyncio.run(repo.version()) == start + 1 + THREADS * 230
+    remaining = asyncio.run(repo.filter(priority=TaskPriority.HIGH))
+    assert len(remaining) == THREADS * 90
+    assert asyncio.run(repo.count()) == THREADS * 90 + 1
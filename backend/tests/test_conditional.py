@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+
+from src.app import create_app
+from src.conditional import etag_matches
+from src.repository import InMemoryTaskRepository
+
+
+def test_list_has_etag_and_answers_304(client):
+    client.post("/tasks", json={"title": "Cached"})
+    first = client.get("/tasks")
+    etag = first.headers["etag"]
+
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_list_etag_changes_on_every_mutation(client):
+    etags = [client.get("/tasks").headers["etag"]]
+    task_id = client.post("/tasks", json={"title": "Task"}).json()["id"]
+    etags.append(client.get("/tasks").headers["etag"])
+    client.put(f"/tasks/{task_id}", json={"status": "done"})
+    etags.append(client.get("/tasks").headers["etag"])
+    client.delete(f"/tasks/{task_id}")
+    etags.append(client.get("/tasks").headers["etag"])
+
+    assert len(set(etags)) == 4
+    assert client.get("/tasks", headers={"If-None-Match": etags[0]}).status_code == 200
+
+
+def test_list_etag_of_a_previous_run_never_matches():
+    """The in-memory store restarts empty (scale to zero): same write count, other tasks."""
+    with TestClient(create_app(InMemoryTaskRepository())) as first_run:
+        first_run.post("/tasks", json={"title": "a"})
+        etag = first_run.get("/tasks").headers["etag"]
+
+    with TestClient(create_app(InMemoryTaskRepository())) as second_run:
+        second_run.post("/tasks", json={"title": "x"})
+        response = second_run.get("/tasks", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["x"]
+
+
+def test_page_supports_if_none_match(client):
+    client.post("/tasks", json={"title": "Task"})
+    etag = client.get("/tasks/page").headers["etag"]
+
+    assert client.get("/tasks/page", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_single_task_etag_follows_updates(client):
+    task_id = client.post("/tasks", json={"title": "Task"}).json()["id"]
+    etag = client.get(f"/tasks/{task_id}").headers["etag"]
+
+    assert client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    # Updating another task does not invalidate this one
+    other_id = client.post("/tasks", json={"title": "Other"}).json()["id"]
+    client.put(f"/tasks/{other_id}", json={"status": "done"})
+    assert client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/tasks/{task_id}", json={"status": "done"})
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_matching_rules():
+    assert etag_matches('"a", W/"v3"', '"v3"')
+    assert etag_matches("*", '"v3"')
+    assert not etag_matches('"v2"', '"v3"')
+    assert not etag_matches(None, '"v3"')
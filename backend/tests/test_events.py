@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.app import app
+from src.events import ChangeFeed, parse_last_event_id
+from src.repository import AsyncSQLTaskRepository, InMemoryTaskRepository
+from src.schemas import TaskCreate
+from src.serialization import TaskJSONCache, changes_body
+
+
+async def read_stream(path, headers=(), messages=1):
+    """
+    Call the app directly over ASGI and return the SSE body once it holds
+    ``messages`` data lines (then disconnect, like a closing browser tab).
+    """
+    body = b""
+    enough = asyncio.Event()
+
+    async def receive():
+        await enough.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body += message.get("body", b"")
+            if body.count(b"\ndata: ") >= messages:
+                enough.set()
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+    return body
+
+
+def data_lines(body):
+    return [json.loads(line[len(b"data: "):]) for line in body.split(b"\n") if line.startswith(b"data: ")]
+
+
+def feed_of(repo, **options):
+    """A change feed tailing ``repo``, like the one of app.py."""
+    json_cache = TaskJSONCache()
+
+    async def load(since):
+        changes = await repo.changes(since)
+        return changes.version, changes.reset, changes_body(
+            changes.version, changes.reset, json_cache.dumps_list(changes.changed), changes.deleted)
+
+    return ChangeFeed(load, repo.version, **options)
+
+
+async def next_message(stream):
+    """Next data message of an SSE stream, skipping keep-alives."""
+    while True:
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        if chunk.startswith(b"id: "):
+            return chunk
+
+
+# =============================================================================
+# FEED
+# =============================================================================
+
+async def test_feed_streams_deltas_by_store_version():
+    repo = InMemoryTaskRepository()
+    feed = feed_of(repo, maxlen=2, poll=60)
+    stream = feed.stream(None, keepalive=0.01)
+    assert await anext(stream) == b"retry: 1000\n\n"
+    assert await anext(stream) == b": keepalive\n\n"
+
+    task = await repo.create(TaskCreate(title="Pushed"))
+    pushed = await repo.version()
+    feed.notify()
+    message = await next_message(stream)
+    assert message.startswith(b"id: %d\ndata: " % pushed)
+    assert data_lines(message)[0]["changed"][0]["title"] == "Pushed"
+
+    # Resuming from a version no longer buffered is answered by the store
+    for title in ("A", "B", "C"):
+        await repo.create(TaskCreate(title=title))
+        await feed.refresh()
+    assert feed.since(pushed) is None
+    resumed = feed.stream(pushed)
+    await anext(resumed)
+    delta = data_lines(await next_message(resumed))[0]
+    assert [t["title"] for t in delta["changed"]] == ["A", "B", "C"]
+
+    await repo.delete(task.id)
+    await feed.refresh()
+    assert data_lines(await next_message(resumed))[0]["deleted"] == [task.id]
+
+
+async def test_subscribers_of_other_workers_see_every_write(tmp_path):
+    """Two workers on one database: each feed polls the writes of the other."""
+    def open_worker():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shared.db'}")
+        return AsyncSQLTaskRepository(async_sessionmaker(engine, expire_on_commit=False))
+
+    worker_a, worker_b = open_worker(), open_worker()
+    await worker_a.initialize()
+    await worker_b.initialize()
+    start = await worker_a.version()
+    stream = feed_of(worker_b, poll=0.01).stream(start, keepalive=0.01)
+    await anext(stream)
+
+    await worker_a.create(TaskCreate(title="Written by A"))
+    message = await next_message(stream)
+
+    # Versions come from the database: the same id on every worker
+    assert message.startswith(b"id: %d\n" % await worker_a.version())
+    assert data_lines(message)[0]["changed"][0]["title"] == "Written by A"
+
+    # A version from a wiped store: every task, reset
+    other = feed_of(worker_b).stream(start + 100)
+    await anext(other)
+    assert data_lines(await next_message(other))[0]["reset"]
+    await worker_a.close()
+    await worker_b.close()
+
+
+async def test_ids_of_a_previous_run_are_answered_with_a_reset():
+    first_run = InMemoryTaskRepository()
+    await first_run.create(TaskCreate(title="Before the restart"))
+    last_event_id = await first_run.version()
+
+    second_run = InMemoryTaskRepository()
+    await second_run.create_many([TaskCreate(title="x"), TaskCreate(title="y")])
+    stream = feed_of(second_run).stream(last_event_id)
+    await anext(stream)
+
+    delta = data_lines(await next_message(stream))[0]
+    assert delta["reset"] and [t["title"] for t in delta["changed"]] == ["x", "y"]
+
+
+def test_parse_last_event_id():
+    assert parse_last_event_id("42") == 42
+    assert parse_last_event_id("abc") is None
+    assert parse_last_event_id("-1") is None
+    assert parse_last_event_id(None) is None
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+async def test_events_endpoint_streams_and_resumes():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = (await client.get("/tasks/changes", params={"since": 0})).json()["version"]
+        created = (await client.post("/tasks", json={"title": "Shared"})).json()
+        await client.put(f"/tasks/{created['id']}", json={"status": "done"})
+        await client.delete(f"/tasks/{created['id']}")
+
+    # Everything after the snapshot the client loaded, in one delta
+    [delta] = data_lines(await read_stream(f"/tasks/events?since={start}"))
+    assert delta["changed"] == [] and delta["deleted"] == [created["id"]]
+    assert delta["version"] == start + 3
+
+    # EventSource reconnects with the last id it received, which wins over ?since=
+    body = await read_stream(f"/tasks/events?since={start}", headers=[("Last-Event-ID", str(start + 1))])
+    [resumed] = data_lines(body)
+    assert resumed["deleted"] == [created["id"]] and resumed["version"] == start + 3
+
+
+async def test_live_changes_are_pushed():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        reading = asyncio.ensure_future(read_stream("/tasks/events"))
+        while not app.state.taskflow.change_feed._subscribers:
+            await asyncio.sleep(0.001)
+        await client.post("/tasks", json={"title": "Live"})
+
+    [delta] = data_lines(await reading)
+    assert [task["title"] for task in delta["changed"]] == ["Live"]
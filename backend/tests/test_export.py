@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+
+
+def test_export_ndjson(client):
+    client.post("/tasks", json={"title": "First", "assignee": "alice"})
+    client.post("/tasks", json={"title": "Second"})
+
+    response = client.get("/tasks/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [t["title"] for t in lines] == ["First", "Second"]
+    assert lines[0] == client.get("/tasks/1").json()
+
+
+def test_export_csv(client):
+    client.post("/tasks", json={"title": "Comma, inside", "status": "done", "due_date": "2024-05-01T10:00:00"})
+
+    response = client.get("/tasks/export?format=csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Comma, inside"
+    assert rows[0]["status"] == "done"
+    assert rows[0]["due_date"] == "2024-05-01T10:00:00"
+    assert rows[0]["description"] == ""
+
+
+def test_export_with_filters_and_many_chunks(client):
+    for start in (0, 600):
+        client.post("/tasks/batch", json=[{"title": f"Task {i}", "status": "done" if i % 3 == 0 else "todo"}
+                                         for i in range(start, start + 600)])
+
+    response = client.get("/tasks/export?status=done")
+
+    ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+    assert len(ids) == 400
+    assert ids == sorted(ids)
+
+
+def test_export_when_empty(client):
+    assert client.get("/tasks/export").text == ""
+    assert client.get("/tasks/export?format=csv").text.strip() == ",".join(
+        ["title", "description", "status", "priority", "assignee", "due_date", "id", "created_at", "updated_at"]
+    )
@@ -0,0 +1,65 @@
+import json
+
+from src import importer
+
+
+def ndjson(*items):
+    return "\n".join(json.dumps(item) for item in items) + "\n"
+
+
+def test_import_ndjson(client):
+    body = ndjson(*({"title": f"Task {i}", "assignee": "alice"} for i in range(5)))
+
+    response = client.post("/tasks/import?chunk_size=2", content=body)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["lines"], report["imported"], report["failed"], report["chunks"]) == (5, 5, 0, 3)
+    assert [t["title"] for t in client.get("/tasks?assignee=alice").json()] == [f"Task {i}" for i in range(5)]
+
+
+def test_import_reports_bad_lines(client):
+    body = '{"title": "Good"}\n\nnot json\n{"title": ""}\n{"title": "   "}\r\n{"title": "Last"}'
+
+    report = client.post("/tasks/import", content=body).json()
+
+    assert (report["lines"], report["imported"], report["failed"]) == (5, 2, 3)
+    assert [e["line"] for e in report["errors"]] == [3, 4, 5]
+    assert report["errors"][2]["error"] == "Title cannot be empty"
+    assert [t["title"] for t in client.get("/tasks").json()] == ["Good", "Last"]
+
+
+def test_import_streamed_body_split_mid_line(client):
+    body = ndjson({"title": "First"}, {"title": "Second"}).encode()
+
+    def chunks():
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    report = client.post("/tasks/import", content=chunks()).json()
+
+    assert report["imported"] == 2
+
+
+def test_import_rejects_overlong_lines(client, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_LINE_BYTES", 32)
+    body = ndjson({"title": "x" * 100}, {"title": "Short"})
+
+    def chunks():
+        for i in range(0, len(body), 8):
+            yield body[i:i + 8].encode()
+
+    report = client.post("/tasks/import", content=chunks()).json()
+
+    assert (report["imported"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["line"] == 1
+
+
+def test_import_caps_reported_errors(client, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_REPORTED_ERRORS", 2)
+
+    report = client.post("/tasks/import", content="x\n" * 5).json()
+
+    assert report["failed"] == 5
+    assert len(report["errors"]) == 2
+    assert report["errors_truncated"] is True
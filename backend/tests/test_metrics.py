@@ -0,0 +1,81 @@
+"""
+Tests for GET /metrics and the request timing middleware.
+"""
+
+import pytest
+
+from src.app import app
+from src.metrics import UNMATCHED_ROUTE, RequestMetrics, render
+
+
+def sample(text: str, series: str) -> float:
+    """Value of one series line in a Prometheus text payload (0 if absent)."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = RequestMetrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        metrics.observe("/tasks", "GET", 200, seconds)
+
+    text = render(metrics, [])
+    labels = 'route="/tasks",method="GET",status="200"'
+    assert sample(text, f'taskflow_http_request_duration_seconds_bucket{{{labels},le="0.1"}}') == 1
+    assert sample(text, f'taskflow_http_request_duration_seconds_bucket{{{labels},le="1.0"}}') == 3
+    assert sample(text, f'taskflow_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 4
+    assert sample(text, f"taskflow_http_request_duration_seconds_count{{{labels}}}") == 4
+    assert sample(text, f"taskflow_http_request_duration_seconds_sum{{{labels}}}") == 4.05
+
+
+def test_label_values_are_escaped():
+    metrics = RequestMetrics()
+    metrics.observe('/a"b\\c', "GET", 200, 0.01)
+    assert 'route="/a\\"b\\\\c"' in render(metrics, [])
+
+
+def test_metrics_endpoint(client):
+    app.state.taskflow.metrics.reset()
+    task = client.post("/tasks", json={"title": "Measured"}).json()
+    client.get(f"/tasks/{task['id']}")
+    client.get("/tasks/999")
+    client.get("/tasks", params={"status": "todo"})
+    client.get("/tasks", params={"assignee": "nobody@example.com"})
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    # Routes are labelled by template, not by raw path
+    count = "taskflow_http_request_duration_seconds_count"
+    assert sample(text, f'{count}{{route="/tasks/{{task_id}}",method="GET",status="200"}}') == 1
+    assert sample(text, f'{count}{{route="/tasks/{{task_id}}",method="GET",status="404"}}') == 1
+    assert sample(text, f'{count}{{route="/tasks",method="POST",status="201"}}') == 1
+    assert sample(text, f'{count}{{route="{UNMATCHED_ROUTE}",method="GET",status="404"}}') == 1
+    # Only the /metrics request itself is still running
+    assert sample(text, "taskflow_http_requests_in_flight") == 1
+    assert sample(text, "taskflow_tasks") == 1
+    assert sample(text, 'taskflow_json_cache_entries') >= 1
+
+
+def test_metrics_index_lookups(client):
+    from src.repository import InMemoryTaskRepository
+
+    if not isinstance(app.state.taskflow.repo, InMemoryTaskRepository):
+        pytest.skip("databases have no in-process indexes")
+
+    def lookups(result):
+        text = client.get("/metrics").text
+        return sample(text, f'taskflow_store_index_lookups_total{{field="assignee",result="{result}"}}')
+
+    client.post("/tasks", json={"title": "Indexed", "assignee": "alice@example.com"})
+    hits, misses = lookups("hit"), lookups("miss")
+    client.get("/tasks", params={"assignee": "alice@example.com"})
+    client.get("/tasks", params={"assignee": "nobody@example.com"})
+
+    assert lookups("hit") == hits + 1
+    assert lookups("miss") == misses + 1
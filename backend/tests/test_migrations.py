@@ -0,0 +1,149 @@
+"""
+Schema migrations (src/migrations.py) and the indexes they create.
+
+The query plan tests compile the statements the SQL repository really runs
+and ask SQLite how it would execute them (EXPLAIN QUERY PLAN): each API
+filter must be answered by an index search, never by a full table scan.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+
+from src.migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+from src.models import TaskModel
+from src.pagination import TaskOrder, keyset_select
+from src.query import DateRange, TaskSort, filter_select
+from src.schemas import TaskPriority, TaskStatus
+
+# Schema created by db_init.py before the SQL backend was wired in (the
+# first models.py, "git show <first commit>:backend/src/models.py")
+BASELINE_SCHEMA = [
+    "CREATE TABLE tasks (id VARCHAR NOT NULL, title VARCHAR(200) NOT NULL, description VARCHAR(1000), "
+    "status VARCHAR(11) NOT NULL, priority VARCHAR(6) NOT NULL, assignee VARCHAR(100), due_date DATETIME, "
+    "created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, "
+    "updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, PRIMARY KEY (id))",
+    "CREATE INDEX ix_tasks_id ON tasks (id)",
+    "INSERT INTO tasks (id, title, status, priority, assignee) VALUES ('1', 'Old', 'todo', 'high', 'alice')",
+]
+
+
+def schema_of(engine):
+    """Columns and indexes of every table, as comparable sets."""
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {(index["name"], tuple(index["column_names"])) for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if not table.startswith("tasks_fts")
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_is_migrated_once(engine):
+    with engine.begin() as connection:
+        assert schema_version(connection) == 0
+        assert migrate(connection) == [migration.version for migration in MIGRATIONS]
+    with engine.begin() as connection:
+        assert migrate(connection) == []
+        assert schema_version(connection) == SCHEMA_VERSION
+
+
+def test_baseline_database_is_migrated_in_place(engine, tmp_path):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+        migrate(connection)
+
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with fresh.begin() as connection:
+        migrate(connection)
+    assert schema_of(engine) == schema_of(fresh)
+
+    with engine.begin() as connection:
+        row = connection.execute(select(TaskModel.id, TaskModel.title, TaskModel.version)).one()
+        assert tuple(row) == (1, "Old", 0)  # kept, with an integer ID
+        hits = connection.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'old'").all()
+        assert hits == [(1,)]  # indexed for search
+
+        # New rows get the next ID, and never the one of a deleted task
+        connection.exec_driver_sql("INSERT INTO tasks SELECT '2', 'Newest', NULL, 'todo', 'low', NULL, NULL, "
+                                   "created_at, updated_at, 0 FROM tasks")
+        connection.exec_driver_sql("DELETE FROM tasks WHERE id = 2")
+        connection.execute(TaskModel.__table__.insert().values(title="New", status="todo", priority="low"))
+        assert connection.scalar(select(TaskModel.id).where(TaskModel.title == "New")) == 3
+        # The search triggers came back with the rebuilt table
+        hits = connection.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'new'").all()
+        assert hits == [(3,)]
+    fresh.dispose()
+
+
+def test_baseline_ids_that_are_not_integers_stop_the_startup(engine):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO tasks (id, title, status, priority) "
+                                   "VALUES ('3f2a-uuid', 'Imported', 'todo', 'low')")
+
+    with pytest.raises(RuntimeError, match="'3f2a-uuid'"):
+        with engine.begin() as connection:
+            migrate(connection)
+    with engine.connect() as connection:
+        assert schema_version(connection) == 0  # nothing was changed
+
+
+# =============================================================================
+# QUERY PLANS
+# =============================================================================
+
+def query_plan(connection, stmt) -> str:
+    sql = stmt.compile(connection, compile_kwargs={"literal_binds": True})
+    return " | ".join(row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+WEEK = DateRange(datetime(2025, 3, 3), datetime(2025, 3, 10))
+
+
+@pytest.mark.parametrize("stmt, index", [
+    (filter_select(TaskModel, status=TaskStatus.TODO, priority=TaskPriority.HIGH), "ix_tasks_status_priority"),
+    (filter_select(TaskModel, assignee="alice"), "ix_tasks_assignee_status"),
+    (filter_select(TaskModel, assignee="alice", status=TaskStatus.TODO), "ix_tasks_assignee_status"),
+    (filter_select(TaskModel, TaskSort.DUE_DATE, due=WEEK, status=TaskStatus.TODO), "ix_tasks_status_due_date"),
+    (filter_select(TaskModel, TaskSort.DUE_DATE, due=WEEK, priority=TaskPriority.HIGH), "ix_tasks_priority_due_date"),
+    (filter_select(TaskModel, due=WEEK), "ix_tasks_due_date"),
+    (filter_select(TaskModel, created=WEEK), "ix_tasks_created_at"),
+    (keyset_select(TaskModel, TaskOrder.CREATED_AT, (datetime(2025, 3, 3), 7), 51, status=TaskStatus.DONE),
+     "ix_tasks_status_created_at"),
+    (select(TaskModel).where(TaskModel.version > 42).order_by(TaskModel.version, TaskModel.id), "ix_tasks_version"),
+])
+def test_filters_search_an_index(engine, stmt, index):
+    with engine.begin() as connection:
+        migrate(connection)
+        plan = query_plan(connection, stmt)
+
+    assert f"SEARCH tasks USING INDEX {index} " in plan
+    assert "SCAN tasks" not in plan
+
+
+@pytest.mark.parametrize("stmt", [
+    keyset_select(TaskModel, TaskOrder.CREATED_AT, None, 51, status=TaskStatus.TODO),
+    filter_select(TaskModel, TaskSort.DUE_DATE, due=WEEK, status=TaskStatus.TODO),
+    filter_select(TaskModel, TaskSort.DUE_DATE_DESC, due=WEEK, priority=TaskPriority.HIGH),
+    filter_select(TaskModel, TaskSort.CREATED_AT_DESC, created=WEEK),
+])
+def test_index_order_needs_no_sort(engine, stmt):
+    with engine.begin() as connection:
+        migrate(connection)
+        plan = query_plan(connection, stmt)
+
+    # Rows come out of the index already in (date, id) order
+    assert "USE TEMP B-TREE" not in plan
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.database import Base
+from src.models import TaskModel
+from src.pagination import (
+    InvalidCursor, TaskOrder, decode_cursor, encode_cursor, keyset_select, split_page,
+)
+
+
+def collect_pages(client, query=""):
+    """Follow next_cursor until the last page, returning every page's titles."""
+    pages = []
+    url = f"/tasks/page?limit=2{query}"
+    while url:
+        body = client.get(url).json()
+        pages.append([t["title"] for t in body["items"]])
+        cursor = body["next_cursor"]
+        url = f"/tasks/page?limit=2{query}&cursor={cursor}" if cursor else None
+    return pages
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def test_page_when_empty(client):
+    response = client.get("/tasks/page")
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+def test_pages_cover_all_tasks_in_order(client):
+    for i in range(5):
+        client.post("/tasks", json={"title": f"Task {i}"})
+
+    assert collect_pages(client) == [["Task 0", "Task 1"], ["Task 2", "Task 3"], ["Task 4"]]
+
+
+def test_pages_by_created_at(client):
+    for i in range(3):
+        client.post("/tasks", json={"title": f"Task {i}"})
+
+    assert collect_pages(client, "&order_by=created_at") == [["Task 0", "Task 1"], ["Task 2"]]
+
+
+def test_pages_with_filters(client):
+    for i in range(6):
+        client.post("/tasks", json={"title": f"Task {i}", "assignee": "alice" if i % 2 else "bob"})
+
+    assert collect_pages(client, "&assignee=alice") == [["Task 1", "Task 3"], ["Task 5"]]
+
+
+def test_deleted_cursor_task_does_not_break_paging(client):
+    ids = [client.post("/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(4)]
+    first = client.get("/tasks/page?limit=2").json()
+    client.delete(f"/tasks/{ids[1]}")
+
+    response = client.get(f"/tasks/page?limit=2&cursor={first['next_cursor']}")
+
+    assert [t["title"] for t in response.json()["items"]] == ["Task 2", "Task 3"]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/tasks/page?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+def test_cursor_with_a_utc_offset_is_accepted(client):
+    for i in range(3):
+        client.post("/tasks", json={"title": f"Task {i}"})
+    first = client.get("/tasks/page?limit=2&order_by=created_at").json()
+    last = first["items"][-1]
+    created_at = datetime.fromisoformat(last["created_at"]).replace(tzinfo=timezone.utc)
+    # Same instant, written with another offset by a hand-made client
+    shifted = created_at.astimezone(timezone(timedelta(hours=2)))
+    cursor = encode_cursor(TaskOrder.CREATED_AT, (shifted, last["id"]))
+
+    response = client.get("/tasks/page", params={"limit": 2, "order_by": "created_at", "cursor": cursor})
+
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()["items"]] == ["Task 2"]
+
+
+def test_limit_is_bounded(client):
+    assert client.get("/tasks/page?limit=0").status_code == 422
+    assert client.get("/tasks/page?limit=10000").status_code == 422
+
+
+# =============================================================================
+# CURSORS
+# =============================================================================
+
+def test_cursor_round_trip():
+    key = (datetime(2024, 1, 2, 3, 4, 5), 42)
+
+    assert decode_cursor(encode_cursor(TaskOrder.CREATED_AT, key), TaskOrder.CREATED_AT) == key
+    aware = (datetime(2024, 1, 2, 5, 4, 5, tzinfo=timezone(timedelta(hours=2))), 42)
+    assert decode_cursor(encode_cursor(TaskOrder.CREATED_AT, aware), TaskOrder.CREATED_AT) == key
+
+
+def test_cursor_for_another_order_is_rejected():
+    cursor = encode_cursor(TaskOrder.ID, (3,))
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, TaskOrder.CREATED_AT)
+
+
+# =============================================================================
+# SQLALCHEMY
+# =============================================================================
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        for i in range(1, 6):
+            session.add(TaskModel(
+                id=i, title=f"Task {i}", status="done" if i % 2 else "todo",
+                # Reverse creation order so created_at and id orders differ
+                created_at=start - timedelta(days=i), updated_at=start,
+            ))
+        session.commit()
+        yield session
+
+
+def sql_pages(session, order, **filters):
+    pages, after = [], None
+    while True:
+        rows = session.scalars(keyset_select(TaskModel, order, after, 3, **filters)).all()
+        items, cursor = split_page(rows, 2, order)
+        pages.append([row.id for row in items])
+        if cursor is None:
+            return pages
+        after = decode_cursor(cursor, order)
+
+
+def test_sql_pages_by_id(session):
+    assert sql_pages(session, TaskOrder.ID) == [[1, 2], [3, 4], [5]]
+
+
+def test_sql_pages_by_created_at(session):
+    assert sql_pages(session, TaskOrder.CREATED_AT) == [[5, 4], [3, 2], [1]]
+
+
+def test_sql_pages_with_filters(session):
+    assert sql_pages(session, TaskOrder.ID, status="done") == [[1, 3], [5]]
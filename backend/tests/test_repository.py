@@ -0,0 +1,483 @@
+"""
+Contract tests shared by every TaskRepository backend.
+
+Each test runs against the in-memory store (plain, compact and with its
+write-ahead log), SQLite through the threadpool and SQLite through the
+asyncio engine (plain, with the production profile's reader and writer
+engines, and behind the read cache), so every backend is guaranteed to behave the same way
+behind the API.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import is_sqlite_file, make_engines, to_async_url
+from src.pagination import TaskOrder
+from src.persistence import TaskJournal
+from src.query import DateRange, TaskSort
+from src import repository, sql_repository
+from src.repository import (
+    STATS_TTL, AsyncSQLTaskRepository, CachedTaskRepository, InMemoryTaskRepository, SQLTaskRepository,
+    create_repository,
+)
+from src.schemas import TaskCreate, TaskPriority, TaskStatus, TaskUpdate
+
+def make_sqlite_repository(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    return SQLTaskRepository(sessionmaker(bind=engine, autoflush=False))
+
+
+def make_profiled_sqlite_repository(path):
+    """Production SQLite profile: tuned pragmas, one writer, query-only readers."""
+    writer, reader = make_engines(f"sqlite+aiosqlite:///{path}", asynchronous=True)
+    return AsyncSQLTaskRepository(
+        async_sessionmaker(writer, expire_on_commit=False),
+        read_session_factory=async_sessionmaker(reader, expire_on_commit=False),
+    )
+
+
+def make_async_sqlite_repository(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return AsyncSQLTaskRepository(async_sessionmaker(engine, expire_on_commit=False))
+
+
+@pytest.fixture(params=["memory", "memory-compact", "memory-journal", "sqlite", "async-sqlite", "sqlite-profile",
+                        "sqlite-cached"])
+async def repo(request, tmp_path):
+    if request.param == "memory":
+        repository = InMemoryTaskRepository()
+    elif request.param == "memory-compact":
+        repository = InMemoryTaskRepository(compact=True)
+    elif request.param == "memory-journal":
+        repository = InMemoryTaskRepository(TaskJournal(tmp_path / "data", group_ms=0))
+    elif request.param == "sqlite":
+        repository = make_sqlite_repository(tmp_path / "tasks.db")
+    elif request.param == "sqlite-profile":
+        repository = make_profiled_sqlite_repository(tmp_path / "tasks.db")
+    elif request.param == "sqlite-cached":
+        repository = CachedTaskRepository(make_async_sqlite_repository(tmp_path / "tasks.db"))
+    else:
+        repository = make_async_sqlite_repository(tmp_path / "tasks.db")
+    await repository.initialize()
+    yield repository
+    await repository.clear()
+    await repository.close()
+
+
+async def test_create_assigns_ids_and_timestamps(repo):
+    first = await repo.create(TaskCreate(title="First"))
+    second = await repo.create(TaskCreate(title="Second", priority=TaskPriority.HIGH))
+
+    assert (first.id, second.id) == (1, 2)
+    assert first.status == TaskStatus.TODO
+    assert second.priority == TaskPriority.HIGH
+    assert first.created_at == first.updated_at
+
+
+async def test_get_returns_created_task(repo):
+    created = await repo.create(TaskCreate(title="Find me", assignee="alice"))
+
+    assert await repo.get(created.id) == created
+    assert await repo.get(999) is None
+
+
+async def test_filter_combines_criteria(repo):
+    await repo.create(TaskCreate(title="A", assignee="alice"))
+    await repo.create(TaskCreate(title="B", assignee="alice", status=TaskStatus.DONE))
+    await repo.create(TaskCreate(title="C", assignee="bob", status=TaskStatus.DONE))
+
+    assert [t.title for t in await repo.filter()] == ["A", "B", "C"]
+    assert [t.title for t in await repo.filter(status=TaskStatus.DONE, assignee="alice")] == ["B"]
+    assert await repo.filter(assignee="carol") == []
+
+
+async def test_page_seeks_after_key(repo):
+    for i in range(5):
+        await repo.create(TaskCreate(title=f"Task {i}", status=TaskStatus.DONE if i % 2 else TaskStatus.TODO))
+
+    assert [t.id for t in await repo.page(TaskOrder.ID, (2,), 2)] == [3, 4]
+    assert [t.id for t in await repo.page(TaskOrder.ID, None, 10, status=TaskStatus.DONE)] == [2, 4]
+
+
+async def test_update_changes_only_given_fields(repo):
+    created = await repo.create(TaskCreate(title="Original", assignee="alice"))
+
+    updated = await repo.update(created.id, {"status": TaskStatus.DONE})
+
+    assert updated.status == TaskStatus.DONE
+    assert updated.title == "Original"
+    assert updated.assignee == "alice"
+    assert updated.created_at == created.created_at
+    assert updated.updated_at >= created.updated_at
+    assert await repo.get(created.id) == updated
+    assert [t.id for t in await repo.filter(status=TaskStatus.DONE)] == [created.id]
+
+
+async def test_update_missing_task_returns_none(repo):
+    assert await repo.update(999, {"title": "Nope"}) is None
+
+
+async def test_delete(repo):
+    created = await repo.create(TaskCreate(title="Delete me"))
+
+    assert await repo.delete(created.id) is True
+    assert await repo.delete(created.id) is False
+    assert await repo.get(created.id) is None
+    assert await repo.count() == 0
+
+
+async def test_deleted_ids_are_not_reused(repo):
+    first, second = await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B")])
+    await repo.delete(second.id)
+
+    assert (await repo.create(TaskCreate(title="C"))).id == second.id + 1
+
+
+async def test_clear_restarts_ids(repo):
+    await repo.create(TaskCreate(title="Old"))
+    await repo.clear()
+
+    assert await repo.count() == 0
+    assert (await repo.create(TaskCreate(title="New"))).id == 1
+
+
+def test_backend_is_selected_from_database_url(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    assert isinstance(create_repository(), InMemoryTaskRepository)
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    assert isinstance(create_repository(), AsyncSQLTaskRepository)
+
+
+def test_compact_store_is_selected_from_environment(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    assert not create_repository().store.compact
+
+    monkeypatch.setenv("TASKFLOW_COMPACT_STORE", "true")
+    assert create_repository().store.compact
+
+
+def test_several_workers_require_a_database(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError, match="DATABASE_URL"):
+        create_repository()
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    assert isinstance(create_repository(), AsyncSQLTaskRepository)
+
+
+def test_read_cache_is_selected_from_environment(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("TASKFLOW_READ_CACHE_SIZE", "500")
+    monkeypatch.setenv("TASKFLOW_READ_CACHE_TTL", "5")
+
+    repository = create_repository()
+    assert isinstance(repository, CachedTaskRepository)
+    assert isinstance(repository.inner, AsyncSQLTaskRepository)
+    assert (repository.tasks.maxsize, repository.tasks.ttl, repository.channel) == (500, 5.0, None)
+
+    monkeypatch.setenv("TASKFLOW_CACHE_CHANNEL", "postgres")
+    with pytest.raises(RuntimeError, match="PostgreSQL"):
+        create_repository()
+
+
+async def test_concurrent_writes_get_distinct_ids(repo):
+    tasks = await asyncio.gather(*(repo.create(TaskCreate(title=f"Task {i}")) for i in range(20)))
+
+    assert sorted(t.id for t in tasks) == list(range(1, 21))
+    assert await repo.count() == 20
+
+
+def test_async_url_uses_async_drivers():
+    assert to_async_url("postgresql://u:p@db:5432/taskflow") == "postgresql+asyncpg://u:p@db:5432/taskflow"
+    assert to_async_url("sqlite:///./taskflow.db") == "sqlite+aiosqlite:///./taskflow.db"
+
+
+def test_sqlite_profile_splits_readers_and_writer(tmp_path):
+    writer, reader = make_engines(f"sqlite:///{tmp_path / 'tasks.db'}")
+
+    with writer.begin() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        connection.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        connection.exec_driver_sql("INSERT INTO t VALUES (1)")
+    with reader.connect() as connection:
+        assert connection.exec_driver_sql("SELECT x FROM t").scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql("INSERT INTO t VALUES (2)")
+    assert writer.pool.size() == 1
+
+    # A memory database lives in its connection: one engine for everything
+    memory_writer, memory_reader = make_engines("sqlite://")
+    assert memory_writer is memory_reader
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("postgresql://u:p@db/taskflow")
+    assert is_sqlite_file("sqlite+aiosqlite:///./taskflow.db")
+
+
+async def test_create_many(repo):
+    tasks = await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B", assignee="bob")])
+
+    assert [(t.id, t.title) for t in tasks] == [(1, "A"), (2, "B")]
+    assert await repo.get(2) == tasks[1]
+    assert [t.id for t in await repo.filter(assignee="bob")] == [2]
+    assert await repo.create_many([]) == []
+
+
+async def test_update_many(repo):
+    await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B")])
+
+    results = await repo.update_many([
+        (2, {"status": TaskStatus.DONE}),
+        (999, {"title": "Missing"}),
+        (1, {"title": "A2", "assignee": "alice"}),
+    ])
+
+    assert results[1] is None
+    assert (results[0].id, results[0].status, results[0].title) == (2, TaskStatus.DONE, "B")
+    assert (results[2].title, results[2].assignee) == ("A2", "alice")
+    assert await repo.get(1) == results[2]
+    assert [t.id for t in await repo.filter(status=TaskStatus.DONE)] == [2]
+
+
+async def test_delete_many(repo):
+    await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B"), TaskCreate(title="C")])
+
+    assert await repo.delete_many([3, 999, 1]) == [True, False, True]
+    assert [t.id for t in await repo.filter()] == [2]
+
+
+async def test_version_increases_on_every_write(repo):
+    versions = [await repo.version()]
+    task = await repo.create(TaskCreate(title="A"))
+    versions.append(await repo.version())
+    await repo.update(task.id, {"title": "B"})
+    versions.append(await repo.version())
+    await repo.create_many([TaskCreate(title="C")])
+    versions.append(await repo.version())
+    await repo.delete(task.id)
+    versions.append(await repo.version())
+
+    assert versions == sorted(set(versions))
+
+    # Writes that change nothing keep the version
+    await repo.update(999, {"title": "Missing"})
+    await repo.delete(999)
+    assert await repo.version() == versions[-1]
+
+
+async def test_iterate_yields_everything_in_chunks(repo):
+    await repo.create_many([TaskCreate(title=f"Task {i}", assignee="alice" if i % 2 else None)
+                            for i in range(7)])
+
+    chunks = [chunk async for chunk in repo.iterate(chunk_size=3)]
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [t.id for chunk in chunks for t in chunk] == list(range(1, 8))
+
+    filtered = [t.id async for chunk in repo.iterate(chunk_size=2, assignee="alice") for t in chunk]
+    assert filtered == [2, 4, 6]
+
+
+async def test_search_ranks_matches_and_follows_updates(repo):
+    await repo.create_many([
+        TaskCreate(title="Préparer la réunion", description="Ordre du jour"),
+        TaskCreate(title="Compte rendu", description="Envoyer le compte rendu de la réunion"),
+        TaskCreate(title="Courses"),
+    ])
+
+    hits = await repo.search("reunion", None, 10)
+    assert [task.id for _, task in hits] == [1, 2]  # title match first
+    assert hits[0][0] > hits[1][0]
+    assert await repo.search("reunion courses", None, 10) == []
+
+    # Keyset: resume strictly after the last hit
+    assert [task.id for _, task in await repo.search("reunion", (hits[0][0], 1), 10)] == [2]
+
+    await repo.update(3, {"title": "Réunion d'équipe"})
+    await repo.delete(1)
+    assert [task.id for _, task in await repo.search("réunion", None, 10)] == [3, 2]
+
+
+async def test_filter_by_date_ranges_and_sort(repo):
+    start = datetime(2025, 1, 1)
+    await repo.create_many([
+        TaskCreate(title="A", due_date=start + timedelta(days=3)),
+        TaskCreate(title="B"),
+        TaskCreate(title="C", due_date=start + timedelta(days=1), status=TaskStatus.DONE),
+        TaskCreate(title="D", due_date=start + timedelta(days=3)),
+    ])
+
+    def titles(tasks):
+        return [t.title for t in tasks]
+
+    assert titles(await repo.filter(TaskSort.DUE_DATE)) == ["C", "A", "D", "B"]
+    assert titles(await repo.filter(TaskSort.DUE_DATE_DESC)) == ["D", "A", "C", "B"]
+    assert titles(await repo.filter(TaskSort.ID_DESC)) == ["D", "C", "B", "A"]
+    assert titles(await repo.filter(due=DateRange(start + timedelta(days=1), start + timedelta(days=3)))) == ["C"]
+    assert titles(await repo.filter(due=DateRange(since=start + timedelta(days=2)), sort=TaskSort.DUE_DATE_DESC)) == ["D", "A"]
+    assert titles(await repo.filter(due=DateRange(before=start + timedelta(days=5)), status=TaskStatus.TODO)) == ["A", "D"]
+
+    created = [t.created_at for t in await repo.filter()]
+    assert titles(await repo.filter(TaskSort.CREATED_AT_DESC, created=DateRange(since=min(created)))) == ["D", "C", "B", "A"]
+    assert await repo.filter(created=DateRange(before=min(created))) == []
+
+
+async def test_aware_due_dates_are_stored_as_utc(repo):
+    # 10:00 at UTC+1 is 09:00 UTC: before a 09:30 UTC bound on every backend
+    task = await repo.create(TaskCreate(title="Paris", due_date="2020-01-02T10:00:00+01:00"))
+    assert task.due_date == datetime(2020, 1, 2, 9, 0)
+    assert await repo.filter(due=DateRange.of(datetime.fromisoformat("2020-01-02T09:30:00+00:00"), None)) == []
+    assert (await repo.stats(datetime(2020, 1, 2, 9, 30))).overdue == 1
+
+    changes = TaskUpdate(due_date="2020-01-02T12:00:00+02:00").model_dump(exclude_unset=True)
+    assert (await repo.update(task.id, changes)).due_date == datetime(2020, 1, 2, 10, 0)
+    assert (await repo.stats(datetime(2020, 1, 2, 9, 30))).overdue == 0
+
+
+async def test_stats_count_tasks_and_overdue(repo):
+    now = datetime.utcnow()
+    await repo.create_many([
+        TaskCreate(title="A", assignee="alice", due_date=now - timedelta(days=1)),
+        TaskCreate(title="B", assignee="alice", status=TaskStatus.DONE, due_date=now - timedelta(days=1)),
+        TaskCreate(title="C", assignee="bob", priority=TaskPriority.HIGH, due_date=now + timedelta(days=1)),
+        TaskCreate(title="D"),
+    ])
+
+    stats = await repo.stats(now)
+    assert stats.total == 4
+    assert stats.by_status == {TaskStatus.TODO: 3, TaskStatus.IN_PROGRESS: 0, TaskStatus.DONE: 1}
+    assert stats.by_priority == {TaskPriority.LOW: 0, TaskPriority.MEDIUM: 3, TaskPriority.HIGH: 1}
+    assert stats.by_assignee == {"alice": 2, "bob": 1}
+    assert (stats.unassigned, stats.overdue) == (1, 1)
+    assert (await repo.stats(now + timedelta(days=2))).overdue == 2
+
+    # Writes are reflected right away (the SQL cache follows the version)
+    await repo.update(1, {"status": TaskStatus.DONE})
+    await repo.update(3, {"assignee": None})
+    await repo.delete(4)
+    stats = await repo.stats(now)
+    assert (stats.total, stats.overdue, stats.unassigned) == (3, 0, 1)
+    assert stats.by_assignee == {"alice": 2}
+    assert stats.by_status[TaskStatus.DONE] == 2
+
+
+async def test_sql_stats_are_cached_until_a_write(tmp_path):
+    repo = make_sqlite_repository(tmp_path / "tasks.db")
+    await repo.initialize()
+    await repo.create(TaskCreate(title="A"))
+    now = datetime.utcnow()
+
+    first = await repo.stats(now)
+    assert await repo.stats(now + timedelta(seconds=STATS_TTL / 2)) is first
+    assert await repo.stats(now + timedelta(seconds=STATS_TTL)) is not first
+
+    await repo.create(TaskCreate(title="B"))
+    assert (await repo.stats(now)).total == 2
+
+
+async def test_changes_since_a_version(repo):
+    start = await repo.version()
+    await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B"), TaskCreate(title="C")])
+    synced = await repo.changes(start)
+    assert (synced.reset, [t.title for t in synced.changed], synced.deleted) == (False, ["A", "B", "C"], [])
+    assert synced.version == await repo.version()
+
+    await repo.update(1, {"title": "A2"})
+    await repo.delete(2)
+    await repo.create(TaskCreate(title="D"))
+    await repo.update_many([(3, {"status": TaskStatus.DONE}), (999, {"title": "Missing"})])
+
+    delta = await repo.changes(synced.version)
+    assert [t.title for t in delta.changed] == ["A2", "D", "C"]  # oldest change first
+    assert delta.deleted == [2]
+    assert (await repo.changes(delta.version)).changed == []
+
+    # After a clear, only a full reload is correct
+    await repo.clear()
+    await repo.create(TaskCreate(title="E"))
+    reset = await repo.changes(delta.version)
+    assert reset.reset and [t.title for t in reset.changed] == ["E"] and reset.deleted == []
+
+    # A version this store never issued (another database, a wiped store)
+    assert (await repo.changes(reset.version + 100)).reset
+
+
+async def test_old_tombstones_are_compacted(repo, monkeypatch):
+    monkeypatch.setattr(sql_repository, "MAX_TOMBSTONES", 2)
+    if isinstance(repo, InMemoryTaskRepository):
+        monkeypatch.setattr(repo.store, "max_tombstones", 2)
+    await repo.create_many([TaskCreate(title=f"Task {i}") for i in range(6)])
+    start = await repo.version()
+
+    for task_id in range(1, 6):
+        await repo.delete(task_id)
+
+    assert (await repo.changes(start)).reset
+    recent = await repo.changes(start + 3)
+    assert (recent.reset, recent.deleted) == (False, [4, 5])
+
+
+async def test_reused_id_is_reported_changed_not_deleted(tmp_path):
+    # Databases from before AUTOINCREMENT gave the ID of a deleted task to the next one
+    repo = make_sqlite_repository(tmp_path / "tasks.db")
+    await repo.initialize()
+    await repo.create_many([TaskCreate(title="A"), TaskCreate(title="B")])
+    start = await repo.version()
+    await repo.delete(2)
+    with create_engine(f"sqlite:///{tmp_path / 'tasks.db'}").begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO tasks (id, title, status, priority, created_at, updated_at, version) "
+            "VALUES (2, 'Reused', 'todo', 'medium', '2025-01-01', '2025-01-01', 99)"
+        )
+        connection.exec_driver_sql("UPDATE store_meta SET version = 99")
+
+    delta = await repo.changes(start)
+    assert ([t.title for t in delta.changed], delta.deleted) == (["Reused"], [])
+
+
+async def test_versions_of_a_previous_run_are_never_reused():
+    # The in-memory store starts over on every restart (scale to zero)
+    first_run = InMemoryTaskRepository()
+    await first_run.create_many([TaskCreate(title="a"), TaskCreate(title="b")])
+    held = await first_run.version()
+
+    second_run = InMemoryTaskRepository()
+    await second_run.create_many([TaskCreate(title="x"), TaskCreate(title="y")])
+    await second_run.delete(1)
+
+    assert await second_run.version() > held
+    delta = await second_run.changes(held)
+    assert delta.reset and [t.title for t in delta.changed] == ["y"]
+
+
+async def test_existing_database_gets_version_columns(tmp_path):
+    path = tmp_path / "old.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, description VARCHAR(1000), "
+            "status VARCHAR(11) NOT NULL, priority VARCHAR(6) NOT NULL, assignee VARCHAR(100), due_date DATETIME, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        )
+        connection.exec_driver_sql("CREATE TABLE store_meta (id INTEGER PRIMARY KEY, version INTEGER NOT NULL)")
+        connection.exec_driver_sql("INSERT INTO store_meta VALUES (1, 7)")
+        connection.exec_driver_sql(
+            "INSERT INTO tasks VALUES (1, 'Old', NULL, 'todo', 'medium', NULL, NULL, "
+            "'2025-01-01 00:00:00', '2025-01-01 00:00:00')"
+        )
+
+    repo = make_sqlite_repository(path)
+    await repo.initialize()
+
+    assert (await repo.changes(0)).reset
+    assert [t.title for t in (await repo.changes(7)).changed] == []
+    await repo.update(1, {"title": "Updated"})
+    assert [t.title for t in (await repo.changes(7)).changed] == ["Updated"]
@@ -0,0 +1,121 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.repository import SQLTaskRepository
+from src.schemas import TaskCreate
+from src.search import SearchIndex, drop_sql_search, tokenize
+
+
+def titles(client, query):
+    return [t["title"] for t in client.get("/tasks/search", params={"q": query}).json()["items"]]
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Réunion: ÉQUIPE_dev, v2!") == ["reunion", "equipe", "dev", "v2"]
+    assert tokenize("Réunion", fold_accents=False) == ["réunion"]
+    assert tokenize(None) == []
+
+
+def test_index_ranks_title_above_description():
+    index = SearchIndex()
+    index.add(1, "Bug report", "login page")
+    index.add(2, "Login page", "fix the bug")
+    index.add(3, "Unrelated", None)
+
+    assert [task_id for _, task_id in index.search("login", None, 10)] == [2, 1]
+    assert [task_id for _, task_id in index.search("bug login", None, 10)] == [1, 2]
+    assert index.search("login missing", None, 10) == []
+
+
+def test_index_follows_removals():
+    index = SearchIndex()
+    index.add(1, "Alpha", None)
+    index.add(2, "Alpha beta", None)
+    index.remove(1, "Alpha", None)
+
+    assert [task_id for _, task_id in index.search("alpha", None, 10)] == [2]
+    assert len(index) == 1
+    index.clear()
+    assert index.search("alpha", None, 10) == []
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def test_search_endpoint(client):
+    client.post("/tasks", json={"title": "Écrire les tests", "description": "pytest"})
+    client.post("/tasks", json={"title": "Déployer", "description": "après les tests"})
+    client.post("/tasks", json={"title": "Courses"})
+
+    assert titles(client, "TESTS") == ["Écrire les tests", "Déployer"]
+    assert titles(client, "ecrire tests") == ["Écrire les tests"]
+    assert titles(client, "absent") == []
+
+    client.put("/tasks/3", json={"title": "Relire les tests"})
+    assert "Relire les tests" in titles(client, "tests")
+
+
+def test_search_pages_follow_cursor(client):
+    for i in range(5):
+        client.post("/tasks", json={"title": f"Release {i}", "description": "release" if i % 2 else None})
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "release", "limit": 2} | ({"cursor": cursor} if cursor else {})
+        body = client.get("/tasks/search", params=params).json()
+        seen.extend(t["id"] for t in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    # Tasks also matching in their description rank first, ties by ID
+    assert seen == [2, 4, 1, 3, 5]
+
+
+def test_search_rejects_bad_input(client):
+    assert client.get("/tasks/search").status_code == 422
+    assert client.get("/tasks/search", params={"q": "?!"}).status_code == 422
+    assert client.get("/tasks/search", params={"q": "x", "cursor": "nope"}).status_code == 400
+
+
+def test_search_supports_etag(client):
+    client.post("/tasks", json={"title": "Cache"})
+    first = client.get("/tasks/search", params={"q": "cache"})
+
+    again = client.get("/tasks/search", params={"q": "cache"}, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+
+# =============================================================================
+# SQL
+# =============================================================================
+
+async def test_reset_database_searches_a_fresh_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}", connect_args={"check_same_thread": False})
+    repo = SQLTaskRepository(sessionmaker(bind=engine, autoflush=False))
+    await repo.initialize()
+    await repo.create(TaskCreate(title="Before the reset"))
+
+    # Tables dropped without the FTS table (what db_init.py --reset used to do)
+    with engine.begin() as connection:
+        Base.metadata.drop_all(bind=connection)
+    await repo.initialize()
+    await repo.create(TaskCreate(title="After the reset"))
+    assert [task.title for _, task in await repo.search("reset", None, 10)] == ["After the reset"]
+
+    # An index entry whose task is gone is skipped, not a server error
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO tasks_fts(rowid, title) VALUES (42, 'ghost')")
+    assert await repo.search("ghost", None, 10) == []
+
+    with engine.begin() as connection:
+        drop_sql_search(connection)
+        Base.metadata.drop_all(bind=connection)
+        assert connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").all() == []
+    engine.dispose()
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from src.schemas import Task
+from src.serialization import TaskJSONCache
+
+
+def make_task(task_id, title="Task", updated_at=datetime(2024, 1, 1)):
+    return Task(id=task_id, title=title, created_at=datetime(2024, 1, 1), updated_at=updated_at)
+
+
+def test_cached_json_matches_pydantic():
+    cache = TaskJSONCache()
+    task = make_task(1)
+
+    assert cache.dumps(task) == task.model_dump_json().encode()
+    assert cache.dumps(task) == task.model_dump_json().encode()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_modified_task_is_re_encoded():
+    cache = TaskJSONCache()
+    cache.dumps(make_task(1, title="Old"))
+
+    data = cache.dumps(make_task(1, title="New", updated_at=datetime(2024, 1, 1) + timedelta(seconds=1)))
+
+    assert b'"New"' in data
+    assert cache.misses == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TaskJSONCache(maxsize=2)
+    cache.dumps(make_task(1))
+    cache.dumps(make_task(2))
+    cache.dumps(make_task(1))  # 2 becomes least recently used
+    cache.dumps(make_task(3))
+
+    assert len(cache) == 2
+    cache.dumps(make_task(1))
+    cache.dumps(make_task(2))
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_list_endpoint_uses_cached_bytes(client):
+    from src.app import app
+
+    task_json_cache = app.state.taskflow.json_cache
+
+    task_id = client.post("/tasks", json={"title": "Cached", "due_date": "2024-05-01T10:00:00"}).json()["id"]
+    first = client.get("/tasks")
+    second = client.get("/tasks")
+
+    assert first.headers["content-type"] == "application/json"
+    assert first.json() == second.json() == [client.get(f"/tasks/{task_id}").json()]
+    assert task_json_cache.hits >= 2
+
+    client.put(f"/tasks/{task_id}", json={"title": "Changed"})
+    assert client.get("/tasks").json()[0]["title"] == "Changed"
+
+    client.delete(f"/tasks/{task_id}")
+    assert len(task_json_cache) == 0
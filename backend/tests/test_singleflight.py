@@ -0,0 +1,148 @@
+"""
+Request coalescing of GET /tasks (src/singleflight.py).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+class Computation:
+    """A computation that only finishes when released, counting its runs."""
+
+    def __init__(self, result="body"):
+        self.result = result
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    def release_now(self):
+        self.release.set()
+        return self
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_identical_calls_share_one_computation():
+    flights = SingleFlight()
+    compute = Computation()
+
+    calls = [asyncio.ensure_future(flights.do(1, "todo", compute)) for _ in range(10)]
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await asyncio.gather(*calls) == ["body"] * 10
+    assert compute.runs == 1
+    assert (flights.executed, flights.shared) == (1, 9)
+
+    # Reused until the version changes, then recomputed
+    assert await flights.do(1, "todo", compute) == "body"
+    assert await flights.do(2, "todo", compute) == "body"
+    assert compute.runs == 2
+    assert len(flights) == 1
+
+
+async def test_only_the_most_recent_queries_are_kept():
+    flights = SingleFlight(maxsize=2)
+    for status in ("todo", "in_progress", "done", "todo"):
+        await flights.do(1, status, Computation(status).release_now())
+
+    assert len(flights) == 2
+    assert flights.executed == 4  # "todo" had been dropped
+
+
+async def test_kept_bodies_fit_in_the_byte_limit():
+    flights = SingleFlight(max_bytes=10)
+    for key, body in (("a", b"1234"), ("b", b"5678"), ("c", b"90ab")):
+        await flights.do(1, key, Computation(body).release_now())
+    assert len(flights) == 2 and flights.bytes == 8  # "a" was dropped
+
+    # Too large to keep: computed again by the next call
+    large = Computation(b"x" * 11).release_now()
+    await flights.do(1, "large", large)
+    await flights.do(1, "large", large)
+    assert large.runs == 2
+    assert flights.bytes == 8
+
+    await flights.do(2, "a", Computation(b"1").release_now())
+    assert (len(flights), flights.bytes) == (1, 1)
+
+
+async def test_failures_are_shared_but_not_kept():
+    flights = SingleFlight()
+    failing = Computation(RuntimeError("database down"))
+
+    calls = [asyncio.ensure_future(flights.do(1, "todo", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    failing.release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert [str(result) for result in results] == ["database down"] * 3
+    assert failing.runs == 1
+    assert len(flights) == 0  # the next call tries again
+
+
+async def test_cancelled_callers_do_not_cancel_the_others():
+    flights = SingleFlight()
+    compute = Computation()
+    leader = asyncio.ensure_future(flights.do(1, "todo", compute))
+    await asyncio.sleep(0)
+    quitter, follower = (asyncio.ensure_future(flights.do(1, "todo", compute)) for _ in range(2))
+    await asyncio.sleep(0)
+
+    # A waiting caller leaves: the computation goes on for the others
+    quitter.cancel()
+    await asyncio.sleep(0)
+    assert compute.runs == 1
+
+    # The computing caller leaves: the next one in line takes over
+    leader.cancel()
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await follower == "body"
+    assert compute.runs == 2
+    for gone in (leader, quitter):
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+
+
+async def test_concurrent_list_requests_are_coalesced(monkeypatch):
+    from src.app import app
+
+    state = app.state.taskflow
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/tasks", json={"title": "Polled"})
+        flights = state.list_flights
+        before = (flights.executed, flights.shared)
+        scans = 0
+        filter_tasks = state.repo.filter
+
+        async def slow_filter(**query):
+            nonlocal scans
+            scans += 1
+            await asyncio.sleep(0.05)
+            return await filter_tasks(**query)
+
+        monkeypatch.setattr(state.repo, "filter", slow_filter)
+        responses = await asyncio.gather(*(client.get("/tasks", params={"status": "todo"}) for _ in range(20)))
+        assert scans == 1
+        assert {response.text for response in responses} == {responses[0].text}
+
+        # A write bumps the version: the next request sees it
+        await client.post("/tasks", json={"title": "New"})
+        titles = [task["title"] for task in (await client.get("/tasks", params={"status": "todo"})).json()]
+        assert titles == ["Polled", "New"]
+        assert scans == 2
+
+        text = (await client.get("/metrics")).text
+    assert (flights.executed - before[0], flights.shared - before[1]) == (2, 19)
+    assert f'taskflow_list_requests_total{{result="shared"}} {flights.shared}' in text
@@ -0,0 +1,195 @@
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.app import Task, TaskPriority, TaskStatus
+from src.pagination import TaskOrder
+from src.query import DateRange, TaskSort
+from src.records import TaskRecord
+from src.store import ConcurrentTaskStore, TaskStore
+
+
+def make_task(task_id, **fields):
+    now = datetime.utcnow()
+    data = {"title": f"Task {task_id}", "created_at": now, "updated_at": now}
+    data.update(fields)
+    return Task(id=task_id, **data)
+
+
+STORES = {
+    "plain": TaskStore,
+    "concurrent": ConcurrentTaskStore,
+    "compact": lambda: TaskStore(compact=True),
+}
+
+
+@pytest.fixture(params=list(STORES))
+def store(request):
+    store = STORES[request.param]()
+    store.add(make_task(1, status=TaskStatus.TODO, assignee="alice"))
+    store.add(make_task(2, status=TaskStatus.IN_PROGRESS, assignee="alice"))
+    store.add(make_task(3, status=TaskStatus.IN_PROGRESS, assignee="bob",
+                        priority=TaskPriority.HIGH))
+    return store
+
+
+def test_filter_without_criteria_returns_everything(store):
+    assert [t.id for t in store.filter()] == [1, 2, 3]
+
+
+def test_filter_intersects_indexes(store):
+    tasks = store.filter(status=TaskStatus.IN_PROGRESS, assignee="alice")
+
+    assert [t.id for t in tasks] == [2]
+
+
+def test_filter_on_unknown_value_is_empty(store):
+    assert store.filter(assignee="carol") == []
+
+
+def test_replace_moves_task_between_buckets(store):
+    store.replace(make_task(1, status=TaskStatus.DONE, assignee="bob"))
+
+    assert store.filter(status=TaskStatus.TODO) == []
+    assert [t.id for t in store.filter(status=TaskStatus.DONE)] == [1]
+    assert [t.id for t in store.filter(assignee="bob")] == [1, 3]
+
+
+def test_remove_drops_task_from_indexes(store):
+    store.remove(3)
+
+    assert 3 not in store
+    assert store.filter(priority=TaskPriority.HIGH) == []
+    assert store.filter(assignee="bob") == []
+
+
+def test_filter_on_unindexed_field_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.filter(title="Task 1")
+
+
+def test_filter_by_due_date_range_and_sort(store):
+    monday = datetime(2025, 3, 3)
+    store.replace(make_task(1, status=TaskStatus.TODO, assignee="alice", due_date=monday + timedelta(days=7)))
+    store.replace(make_task(2, status=TaskStatus.IN_PROGRESS, assignee="alice", due_date=monday))
+    store.add(make_task(4, due_date=monday + timedelta(days=2, hours=1), assignee="alice"))
+
+    this_week = DateRange(monday, monday + timedelta(days=7))
+    assert [t.id for t in store.filter(due=this_week)] == [2, 4]
+    assert [t.id for t in store.filter(TaskSort.DUE_DATE_DESC, due=this_week)] == [4, 2]
+    assert [t.id for t in store.filter(due=DateRange(before=monday))] == []
+
+    # Tasks without due date last, in both directions
+    assert [t.id for t in store.filter(TaskSort.DUE_DATE)] == [2, 4, 1, 3]
+    assert [t.id for t in store.filter(TaskSort.DUE_DATE_DESC)] == [1, 4, 2, 3]
+    assert [t.id for t in store.filter(TaskSort.DUE_DATE, assignee="alice")] == [2, 4, 1]
+
+    # Moving or removing a due date updates the index
+    store.replace(make_task(4, due_date=None))
+    store.remove(2)
+    assert store.filter(due=this_week) == []
+
+
+def test_filter_by_due_date_normalizes_timezones(store):
+    store.replace(make_task(1, due_date=datetime(2025, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))))
+
+    assert [t.id for t in store.filter(due=DateRange(datetime(2025, 1, 1, 10), datetime(2025, 1, 1, 11)))] == [1]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_filter_ranges_match_a_full_scan(compact):
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    store = TaskStore(compact=compact)
+    for i in range(1, 301):
+        store.add(make_task(
+            i,
+            status=rng.choice(list(TaskStatus)),
+            assignee=rng.choice(["alice", "bob", None]),
+            due_date=start + timedelta(hours=rng.randrange(500)) if rng.random() < 0.7 else None,
+            created_at=start + timedelta(minutes=rng.randrange(1000)),
+        ))
+    tasks = list(store.values())
+
+    for _ in range(100):
+        due = rng.choice([None, DateRange(*sorted(start + timedelta(hours=rng.randrange(500)) for _ in range(2)))])
+        created = rng.choice([None, DateRange(since=start + timedelta(minutes=rng.randrange(1000)))])
+        status = rng.choice([None, TaskStatus.TODO])
+        sort = rng.choice(list(TaskSort))
+
+        expected = [t for t in tasks
+                    if (due is None or t.due_date is not None and due.since <= t.due_date < due.before)
+                    and (created is None or created.since <= t.created_at)
+                    and status in (None, t.status)]
+        if sort.field == "id":
+            expected.sort(key=lambda t: t.id, reverse=sort.descending)
+        else:
+            dated = sorted((t for t in expected if getattr(t, sort.field) is not None),
+                           key=lambda t: (getattr(t, sort.field), t.id), reverse=sort.descending)
+            undated = sorted((t for t in expected if getattr(t, sort.field) is None),
+                             key=lambda t: t.id, reverse=sort.descending)
+            expected = dated + undated
+
+        assert store.filter(sort, due=due, created=created, status=status) == expected
+
+
+def test_changes_keep_recent_deletions_only():
+    store = TaskStore(max_tombstones=2)
+    for task_id in range(1, 7):
+        store.add(make_task(task_id))
+    store.replace(make_task(2, title="Renamed"))
+
+    changes = store.changes(3)
+    assert [task.id for task in changes.changed] == [4, 5, 6, 2]
+    assert (changes.version, changes.reset, changes.deleted) == (7, False, [])
+
+    for task_id in (1, 3, 4, 5, 6):
+        store.remove(task_id)  # the 5th tombstone compacts down to 2
+
+    assert store.tombstone_floor == 10
+    assert store.changes(9).reset
+    assert store.changes(10).deleted == [5, 6]
+    assert store.changes(12).deleted == []
+
+
+def test_page_seeks_after_key(store):
+    tasks = store.page(TaskOrder.ID, (1,), 10)
+
+    assert [t.id for t in tasks] == [2, 3]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_page_with_filters_dense_and_sparse(compact):
+    store = TaskStore(compact=compact)
+    for i in range(1, 101):
+        store.add(make_task(i, assignee="alice" if i % 10 else "bob"))
+
+    # alice owns 90% of the tasks (walk), bob 10% (sort the matches)
+    assert [t.id for t in store.page(TaskOrder.ID, (5,), 3, assignee="alice")] == [6, 7, 8]
+    assert [t.id for t in store.page(TaskOrder.ID, (5,), 3, assignee="bob")] == [10, 20, 30]
+
+
+def test_compact_page_by_creation_date():
+    store = TaskStore(compact=True)
+    start = datetime(2025, 1, 1)
+    for i in range(1, 6):
+        store.add(make_task(i, created_at=start + timedelta(minutes=10 - i)))
+
+    after = (store[4].created_at, 4)
+    assert [t.id for t in store.page(TaskOrder.CREATED_AT, after, 10)] == [3, 2, 1]
+    assert [t.id for t in store.page(TaskOrder.CREATED_AT, after, 10, status=TaskStatus.TODO)] == [3, 2, 1]
+
+
+def test_compact_record_round_trip():
+    due_date = datetime(2025, 6, 1, 12, 30, tzinfo=timezone.utc)
+    task = make_task(7, description="Notes", status=TaskStatus.DONE, priority=TaskPriority.LOW,
+                     assignee="".join(["car", "ol"]), due_date=due_date)
+
+    record = TaskRecord.from_task(task)
+
+    assert record.to_task() == task
+    assert record.to_task().model_dump_json() == task.model_dump_json()
+    assert record.assignee is sys.intern("carol")
+    assert (record.status, record.priority) == (TaskStatus.DONE, TaskPriority.LOW)
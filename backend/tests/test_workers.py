@@ -0,0 +1,100 @@
+"""
+Multi-worker consistency test.
+
+Starts several API processes on the same SQLite file - exactly what
+``uvicorn --workers N`` (or WEB_CONCURRENCY=N) does - and checks that
+writes sent to any of them are visible, identically, from all of them.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WORKERS = 3
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Worker exited early:\n{process.stdout.read()}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{url} did not become healthy")
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Base URLs of WORKERS API processes sharing one database."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'shared.db'}")
+    env.pop("WEB_CONCURRENCY", None)
+    ports = [free_port() for _ in range(WORKERS)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.app:app", "--host", "127.0.0.1",
+             "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        for port in ports
+    ]
+    try:
+        urls = [f"http://127.0.0.1:{port}" for port in ports]
+        for url, process in zip(urls, processes):
+            wait_until_healthy(url, process)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def test_workers_share_tasks_ids_and_versions(workers):
+    # Interleaved concurrent creates on every worker
+    def create(i):
+        url = workers[i % WORKERS]
+        response = httpx.post(f"{url}/tasks", json={"title": f"Task {i}"}, timeout=30)
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        ids = list(pool.map(create, range(60)))
+    batch = httpx.post(f"{workers[0]}/tasks/batch", json=[{"title": f"Batch {i}"} for i in range(20)])
+    ids += [result["id"] for result in batch.json()["results"]]
+
+    # IDs are allocated by the database: no collisions between workers
+    assert len(set(ids)) == 80
+
+    # Every worker sees the same tasks under the same ETag
+    listings = [httpx.get(f"{url}/tasks") for url in workers]
+    assert all(sorted(t["id"] for t in r.json()) == sorted(ids) for r in listings)
+    assert len({r.headers["etag"] for r in listings}) == 1
+    etag = listings[0].headers["etag"]
+
+    # A write on one worker invalidates what the others serve
+    task_id = ids[0]
+    httpx.put(f"{workers[1]}/tasks/{task_id}", json={"status": "done"})
+    assert httpx.get(f"{workers[2]}/tasks/{task_id}").json()["status"] == "done"
+    assert httpx.get(f"{workers[0]}/tasks", headers={"If-None-Match": etag}).status_code == 200
+
+    httpx.delete(f"{workers[2]}/tasks/{task_id}")
+    assert httpx.get(f"{workers[0]}/tasks/{task_id}").status_code == 404
+    assert all(httpx.get(f"{url}/health").json()["tasks_count"] == 79 for url in workers)
@@ -1,10 +1,25 @@
 import { useState, useEffect } from 'react';
 import { api } from './api/api';
-import { Task, TaskCreate } from './types/index';
+import { Task, TaskChanges, TaskCreate } from './types/index';
 import { SimpleTaskList } from './components/SimpleTaskList';
 import { TaskForm } from './components/TaskForm';
 import './App.css';
 
+// Apply a delta of the server (GET /tasks/changes, /tasks/events) to the task list
+function applyChanges(tasks: Task[], changes: TaskChanges): Task[] {
+  if (changes.reset) {
+    return [...changes.changed].sort((a, b) => a.id - b.id);
+  }
+  const changed = new Map(changes.changed.map(task => [task.id, task]));
+  const gone = new Set(changes.deleted);
+  // Our own writes are already in the list: replace rather than duplicate
+  const kept = tasks
+    .filter(task => !gone.has(task.id))
+    .map(task => changed.get(task.id) ?? task);
+  const known = new Set(kept.map(task => task.id));
+  return [...kept, ...changes.changed.filter(task => !known.has(task.id))];
+}
+
 function App() {
   const [tasks, setTasks] = useState<Task[]>([]);
   const [isLoading, setIsLoading] = useState(true);
@@ -12,17 +27,35 @@ function App() {
   const [editingTask, setEditingTask] = useState<Task | null>(null);
 
   useEffect(() => {
-    fetchTasks();
+    let closed = false;
+    let unsubscribe = () => {};
+    fetchTasks().then(version => {
+      // Changes made by other users arrive over the event stream, starting
+      // from the version just loaded so that nothing is missed in between
+      if (version !== null && !closed) {
+        unsubscribe = api.subscribeToChanges(
+          version,
+          (changes) => setTasks(current => applyChanges(current, changes)),
+        );
+      }
+    });
+    return () => {
+      closed = true;
+      unsubscribe();
+    };
   }, []);
 
-  const fetchTasks = async () => {
+  // Load every task; returns the store version they were read at
+  const fetchTasks = async (): Promise<number | null> => {
     try {
       setIsLoading(true);
-      const data = await api.getTasks();
-      setTasks(data);
+      const snapshot = await api.getTaskChanges(0);
+      setTasks(applyChanges([], { ...snapshot, reset: true }));
       setError(null);
+      return snapshot.version;
     } catch (err) {
       setError(err as Error);
+      return null;
     } finally {
       setIsLoading(false);
     }
@@ -31,7 +64,8 @@ function App() {
   const handleCreateTask = async (taskData: TaskCreate) => {
     try {
       const newTask = await api.createTask(taskData);
-      setTasks([...tasks, newTask]);
+      // The event stream may have brought it already
+      setTasks(current => current.some(task => task.id === newTask.id) ? current : [...current, newTask]);
     } catch (err) {
       console.error('Failed to create task:', err);
     }
@@ -40,7 +74,7 @@ function App() {
   const handleUpdateTask = async (taskId: number, updates: Partial<TaskCreate>) => {
     try {
       const updatedTask = await api.updateTask(taskId, updates);
-      setTasks(tasks.map(task => task.id === taskId ? updatedTask : task));
+      setTasks(current => current.map(task => task.id === taskId ? updatedTask : task));
       setEditingTask(null);
     } catch (err) {
       console.error('Failed to update task:', err);
@@ -50,7 +84,7 @@ function App() {
   const handleDeleteTask = async (taskId: number) => {
     try {
       await api.deleteTask(taskId);
-      setTasks(tasks.filter(task => task.id !== taskId));
+      setTasks(current => current.filter(task => task.id !== taskId));
     } catch (err) {
       console.error('Failed to delete task:', err);
     }
@@ -123,4 +123,48 @@ describe('API Module', () => {
       })
     );
   });
+
+  /**
+   * Test 6 : Vérifier la pagination par curseur
+   */
+  it('fetches a page of tasks with a cursor', async () => {
+    const mockFetch = vi.fn(() =>
+      Promise.resolve({
+        ok: true,
+        json: () => Promise.resolve({
+          items: [{ id: 3, title: 'Page 2', status: 'todo' }],
+          next_cursor: null,
+        }),
+      })
+    );
+    (globalThis as any).fetch = mockFetch;
+
+    const page = await api.getTasksPage({ limit: 2, cursor: 'abc' });
+
+    expect(page.items).toHaveLength(1);
+    expect(page.next_cursor).toBeNull();
+    expect(mockFetch).toHaveBeenCalledWith('/api/tasks/page?limit=2&cursor=abc', expect.anything());
+  });
+
+  /**
+   * Test 7 : Vérifier l'abonnement aux changements (Server-Sent Events)
+   */
+  it('subscribes to task changes', () => {
+    const sources: any[] = [];
+    (globalThis as any).EventSource = vi.fn(function (this: any, url: string) {
+      this.url = url;
+      this.close = vi.fn();
+      sources.push(this);
+    });
+    const onChanges = vi.fn();
+
+    const unsubscribe = api.subscribeToChanges(7, onChanges);
+    const source = sources[0];
+    source.onmessage({ data: '{"version": 8, "reset": false, "changed": [], "deleted": [3]}' });
+    unsubscribe();
+
+    expect(source.url).toBe('/api/tasks/events?since=7');
+    expect(onChanges).toHaveBeenCalledWith({ version: 8, reset: false, changed: [], deleted: [3] });
+    expect(source.close).toHaveBeenCalled();
+  });
 });
@@ -1,4 +1,5 @@
-import { Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority } from '../types/index';
+import { Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority, TaskPage, TaskPageQuery,
+  TaskBatchUpdate, BatchResponse, TaskChanges } from '../types/index';
 
 // API Base URL - use environment variable in production or proxy in development
 const API_BASE = import.meta.env.VITE_API_URL || '/api';
@@ -41,6 +42,25 @@ export const api = {
     return apiRequest<Task[]>(endpoint);
   },
 
+  // Get one page of tasks - pass the previous page's next_cursor to continue
+  async getTasksPage(query: TaskPageQuery = {}): Promise<TaskPage> {
+    const params = new URLSearchParams();
+    if (query.status) params.append('status', query.status);
+    if (query.priority) params.append('priority', query.priority);
+    if (query.assignee) params.append('assignee', query.assignee);
+    if (query.orderBy) params.append('order_by', query.orderBy);
+    if (query.limit) params.append('limit', String(query.limit));
+    if (query.cursor) params.append('cursor', query.cursor);
+
+    const queryString = params.toString();
+    return apiRequest<TaskPage>(`/tasks/page${queryString ? `?${queryString}` : ''}`);
+  },
+
+  // Tasks changed and IDs deleted since a store version (0 = everything)
+  async getTaskChanges(since: number): Promise<TaskChanges> {
+    return apiRequest<TaskChanges>(`/tasks/changes?since=${since}`);
+  },
+
   // Get single task
   async getTask(taskId: number): Promise<Task> {
     return apiRequest<Task>(`/tasks/${taskId}`);
@@ -62,6 +82,41 @@ export const api = {
     });
   },
 
+  // Create several tasks in one request
+  async createTasks(tasks: TaskCreate[]): Promise<BatchResponse> {
+    return apiRequest<BatchResponse>('/tasks/batch', {
+      method: 'POST',
+      body: JSON.stringify(tasks),
+    });
+  },
+
+  // Update several tasks in one request (e.g. multi-select actions)
+  async updateTasks(updates: TaskBatchUpdate[]): Promise<BatchResponse> {
+    return apiRequest<BatchResponse>('/tasks/batch', {
+      method: 'PATCH',
+      body: JSON.stringify(updates),
+    });
+  },
+
+  // Delete several tasks in one request
+  async deleteTasks(taskIds: number[]): Promise<BatchResponse> {
+    return apiRequest<BatchResponse>('/tasks/batch', {
+      method: 'DELETE',
+      body: JSON.stringify(taskIds),
+    });
+  },
+
+  // Receive task changes as they happen instead of re-polling /tasks.
+  // `since` is the version of the tasks already loaded (getTaskChanges), so
+  // nothing written in between is missed; EventSource reconnects on its own
+  // and resumes after the last version received.
+  // Returns a function that closes the subscription.
+  subscribeToChanges(since: number, onChanges: (changes: TaskChanges) => void): () => void {
+    const source = new EventSource(`${API_BASE}/tasks/events?since=${since}`);
+    source.onmessage = (message) => onChanges(JSON.parse(message.data));
+    return () => source.close();
+  },
+
   // Delete task
   async deleteTask(taskId: number): Promise<void> {
     const url = `${API_BASE}/tasks/${taskId}`;
@@ -32,4 +32,49 @@ export interface TaskUpdate {
   priority?: TaskPriority;
   assignee?: string;
   due_date?: string;
-}
\ No newline at end of file
+}
+
+export type TaskOrder = "id" | "created_at";
+
+// One page of tasks from GET /tasks/page (keyset pagination)
+export interface TaskPage {
+  items: Task[];
+  next_cursor: string | null; // null on the last page
+}
+
+export interface TaskPageQuery {
+  status?: TaskStatus;
+  priority?: TaskPriority;
+  assignee?: string;
+  orderBy?: TaskOrder;
+  limit?: number;
+  cursor?: string;
+}
+
+// Batch endpoints (/tasks/batch): one result per item, in request order
+export interface TaskBatchUpdate extends TaskUpdate {
+  id: number;
+}
+
+export interface BatchItemResult {
+  index: number;
+  status: number; // 201/200/204 on success, 404/422 on failure
+  id?: number;
+  task?: Task;
+  error?: unknown;
+}
+
+export interface BatchResponse {
+  succeeded: number;
+  failed: number;
+  results: BatchItemResult[];
+}
+
+// Delta returned by GET /tasks/changes?since=<version>, and pushed by
+// GET /tasks/events (Server-Sent Events)
+export interface TaskChanges {
+  version: number; // pass as `since` on the next sync
+  reset: boolean; // true: `changed` holds every task, replace the local copy
+  changed: Task[];
+  deleted: number[];
+}